@@ -0,0 +1,72 @@
+"""Time to first token for flat /api/generate prompts vs. structured /api/chat.
+
+The fake server simulates Ollama's prompt cache, so only the templated
+prompt suffix not shared with the previous turn is charged for prefill.
+"""
+
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fake_ollama import PromptCache
+from benchmarks.fixtures import generate_paragraphs
+from benchmarks.harness import BenchEnvironment
+
+PREFILL_RATE = 20_000  # prompt characters per second
+
+
+def run_conversation(env: BenchEnvironment, engine, messages: List[str]) -> Dict[str, Any]:
+    before = env.server.prefill_stats
+    engine.create_session()
+
+    ttft = []
+    for message in messages:
+        start = time.perf_counter()
+        first = None
+        for _ in engine.chat(message, stream=True):
+            if first is None:
+                first = time.perf_counter() - start
+        ttft.append(first)
+
+    after = env.server.prefill_stats
+    cached = after["cached_chars"] - before["cached_chars"]
+    prefilled = after["prefill_chars"] - before["prefill_chars"]
+    return {
+        "turns": len(ttft),
+        "mean_ttft_seconds": statistics.fmean(ttft),
+        "last_turns_ttft_seconds": statistics.fmean(ttft[-max(1, len(ttft) // 5):]),
+        "prefill_chars": prefilled,
+        "cached_fraction": cached / (cached + prefilled) if cached + prefilled else 0.0,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.core.chat_engine import ChatEngine
+    from src.core.ollama_chat import OllamaChatClient
+
+    settings = env.settings
+    saved = (settings.prefill_rate, settings.token_rate, settings.response_tokens, settings.prefix_cache)
+    settings.prefill_rate = PREFILL_RATE
+    settings.token_rate = 0
+    settings.response_tokens = 48
+    settings.prefix_cache = True
+    # Separate slots so background history summaries don't evict the chat
+    saved_cache = env.server._server.cache
+    env.server._server.cache = PromptCache(slots=4)
+
+    try:
+        messages = generate_paragraphs(env.scale(40, 12) * 40, seed=11, words_per_paragraph=40)
+        results = {}
+
+        generate = ChatEngine()
+        generate.chat_client = None
+        results["generate_api"] = run_conversation(env, generate, messages)
+
+        chat = ChatEngine()
+        chat.chat_client = OllamaChatClient()
+        results["chat_api"] = run_conversation(env, chat, messages)
+    finally:
+        settings.prefill_rate, settings.token_rate, settings.response_tokens, settings.prefix_cache = saved
+        env.server._server.cache = saved_cache
+
+    return results
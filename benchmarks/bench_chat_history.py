@@ -0,0 +1,60 @@
+"""Time to first token across a long chat, budgeted history vs. full history.
+
+The fake server charges prefill time per prompt character, so prompt
+growth shows up directly as TTFT growth.
+"""
+
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fixtures import generate_paragraphs
+from benchmarks.harness import BenchEnvironment
+
+PREFILL_RATE = 50_000  # prompt characters per second
+
+
+def run_conversation(engine, messages: List[str]) -> Dict[str, Any]:
+    engine.create_session()
+    ttft = []
+    for message in messages:
+        start = time.perf_counter()
+        first = None
+        for _ in engine.chat(message, stream=True):
+            if first is None:
+                first = time.perf_counter() - start
+        ttft.append(first)
+
+    window = max(1, len(ttft) // 10)
+    return {
+        "turns": len(ttft),
+        "first_turns_ttft_seconds": statistics.fmean(ttft[:window]),
+        "last_turns_ttft_seconds": statistics.fmean(ttft[-window:]),
+        "max_ttft_seconds": max(ttft),
+        "last_prompt_tokens": engine.history.last_prompt_tokens,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.core.chat_engine import ChatEngine
+    from src.core.history_manager import HistoryManager
+
+    saved = (env.settings.prefill_rate, env.settings.token_rate, env.settings.response_tokens)
+    env.settings.prefill_rate = PREFILL_RATE
+    env.settings.token_rate = 0
+    env.settings.response_tokens = 48
+
+    try:
+        messages = generate_paragraphs(env.scale(200, 40) * 60, seed=5, words_per_paragraph=60)
+
+        budgeted = ChatEngine()
+        results = {"budgeted": run_conversation(budgeted, messages)}
+
+        # Previous behaviour: full recent history, no budget and no summary
+        full = ChatEngine()
+        full.history = HistoryManager(full.llm, token_budget=10**9, summarize=False)
+        results["full_history"] = run_conversation(full, messages)
+    finally:
+        env.settings.prefill_rate, env.settings.token_rate, env.settings.response_tokens = saved
+
+    return results
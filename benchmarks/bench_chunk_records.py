@@ -0,0 +1,80 @@
+"""Chunk representation: per-chunk pydantic models with copied text vs. offsets.
+
+Times chunking plus building the chunk records a Document carries, and
+measures their memory with tracemalloc. Results are scaled to 10k chunks.
+"""
+
+import gc
+import hashlib
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from benchmarks.fixtures import generate_paragraphs
+from benchmarks.harness import BenchEnvironment
+
+PER_CHUNKS = 10_000
+
+
+def measure(build: Callable[[], Any], num_chunks: int, runs: int = 3) -> Dict[str, float]:
+    scale = PER_CHUNKS / num_chunks
+    seconds = float("inf")
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        build()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    records = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+
+    return {
+        "seconds": seconds * scale,
+        "peak_mb": peak / 2**20 * scale,
+        "retained_mb": retained / 2**20 * scale,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.models.document import DocumentChunk, DocumentChunks
+    from src.utils.chunking import chunk_spans, create_text_splitter
+
+    # Long paragraphs, so chunks are split mid-paragraph and overlap
+    text = "\n\n".join(generate_paragraphs(env.scale(1_000_000, 100_000), words_per_paragraph=400))
+    doc_id = hashlib.md5(b"bench/chunks.txt").hexdigest()
+
+    def pydantic_records():
+        # Text copied into one model per chunk, with its own metadata dict
+        chunks = create_text_splitter().split_text(text)
+        return [
+            DocumentChunk(
+                chunk_id=hashlib.md5(f"{doc_id}_{i}".encode()).hexdigest(),
+                text=chunk,
+                chunk_index=i,
+                source_file="chunks.txt",
+                metadata={"total_chunks": len(chunks)},
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+
+    def offset_records():
+        return DocumentChunks(text, doc_id, "chunks.txt", chunk_spans(text))
+
+    num_chunks = len(offset_records())
+    compact = offset_records()
+    ingest_view = measure(lambda: (compact.texts(), compact.ids()), num_chunks)
+
+    return {
+        "chars": len(text),
+        "text_mb": len(text) / 2**20,
+        "chunks": num_chunks,
+        "per_chunks": PER_CHUNKS,
+        "pydantic": measure(pydantic_records, num_chunks),
+        "offsets": measure(offset_records, num_chunks),
+        # Texts and ids materialized for embedding and storage
+        "offsets_texts_and_ids": ingest_view,
+    }
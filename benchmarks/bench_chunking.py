@@ -0,0 +1,22 @@
+"""Chunking throughput on generated plain text."""
+
+from typing import Any, Dict
+
+from benchmarks.fixtures import generate_text
+from benchmarks.harness import BenchEnvironment, best_of
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.utils.chunking import chunk_text
+
+    text = generate_text(env.scale(200_000, 20_000))
+    chunks = chunk_text(text)
+    seconds = best_of(lambda: chunk_text(text))
+
+    return {
+        "chars": len(text),
+        "chunks": len(chunks),
+        "seconds": seconds,
+        "chars_per_second": len(text) / seconds,
+        "chunks_per_second": len(chunks) / seconds,
+    }
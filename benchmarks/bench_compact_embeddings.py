@@ -0,0 +1,166 @@
+"""Recall and memory of compact embedding storage vs. full float32.
+
+Indexes a fixed synthetic corpus in ChromaDB at full precision and with
+truncated dimensions (through CompactIndex, with and without full-precision
+rescoring), and evaluates int8 scalar quantization by brute force. Recall@k
+is measured against exact full-precision search on a fixed query set.
+
+The synthetic embeddings have per-dimension variance decaying like
+1/rank, as in Matryoshka-trained models, whose leading dimensions carry
+most of the signal; real models will differ in how far they truncate.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.harness import BenchEnvironment
+
+DIM = 768
+K = 5
+SEED = 11
+# Largest batch ChromaDB accepts in one add
+ADD_BATCH = 5000
+
+
+def make_vectors(num_docs: int, num_queries: int):
+    """Clustered unit vectors and queries that are noisy copies of some of them."""
+    import numpy as np
+
+    rng = np.random.default_rng(SEED)
+    scales = 1 / np.sqrt(np.arange(1, DIM + 1))
+    centers = rng.normal(size=(max(num_docs // 20, 1), DIM)) * scales
+    docs = centers[rng.integers(len(centers), size=num_docs)] + 0.5 * rng.normal(size=(num_docs, DIM)) * scales
+    queries = docs[rng.choice(num_docs, num_queries, replace=False)]
+    queries = queries + 0.5 * rng.normal(size=queries.shape) * scales
+    docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return docs.astype(np.float32), queries.astype(np.float32)
+
+
+def exact_top_k(docs, queries, k: int) -> List[List[int]]:
+    import numpy as np
+
+    distances = (queries ** 2).sum(1)[:, None] - 2 * queries @ docs.T + (docs ** 2).sum(1)[None, :]
+    return np.argsort(distances, axis=1)[:, :k].tolist()
+
+
+def recall(found: Sequence[Sequence[int]], truth: Sequence[Sequence[int]]) -> float:
+    return sum(len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)) / len(truth)
+
+
+def hnsw_mb(path: Path) -> float:
+    """Size of the persisted HNSW index (vectors and graph), without the SQLite files."""
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file() and ".sqlite" not in f.name) / 2**20
+
+
+def chroma_collection(path: Path):
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+    return client.get_or_create_collection("bench")
+
+
+def index(collection, ids: List[str], vectors) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(ids), ADD_BATCH):
+        collection.add(ids=ids[i:i + ADD_BATCH], embeddings=vectors[i:i + ADD_BATCH])
+    return time.perf_counter() - start
+
+
+def run_float(root: Path, ids: List[str], docs, queries, truth) -> Dict[str, Any]:
+    collection = chroma_collection(root / "float")
+    index_seconds = index(collection, ids, docs.tolist())
+
+    start = time.perf_counter()
+    results = collection.query(query_embeddings=queries.tolist(), n_results=K, include=[])
+    query_seconds = time.perf_counter() - start
+
+    found = [[int(i) for i in row] for row in results["ids"]]
+    return {
+        "recall_at_k": recall(found, truth),
+        "vector_mb": docs.shape[0] * DIM * 4 / 2**20,
+        "hnsw_mb": hnsw_mb(root / "float"),
+        "index_seconds": index_seconds,
+        "query_seconds": query_seconds / len(queries),
+    }
+
+
+def run_truncated(root: Path, ids: List[str], docs, queries, truth, dimensions: int) -> Dict[str, Any]:
+    from src.vector_store.compact import CompactIndex, FullEmbeddingStore
+
+    path = root / f"truncated_{dimensions}"
+    compact = CompactIndex(dimensions, store=FullEmbeddingStore(path / "full_embeddings.sqlite"))
+    collection = chroma_collection(path)
+
+    full = docs.tolist()
+    start = time.perf_counter()
+    truncated = compact.index_vectors(ids, full)
+    index_seconds = index(collection, ids, truncated) + time.perf_counter() - start
+
+    plain, rescored = [], []
+    start = time.perf_counter()
+    for query in queries.tolist():
+        results = collection.query(
+            query_embeddings=[compact.query_vector(query)], n_results=compact.candidates(K), include=["distances"]
+        )
+        candidates = results["ids"][0]
+        order = compact.rescore(query, candidates, list(results["distances"][0]), K)
+        plain.append([int(i) for i in candidates[:K]])
+        rescored.append([int(candidates[i]) for i in order])
+    query_seconds = time.perf_counter() - start
+    compact.store._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    return {
+        "recall_at_k_no_rescore": recall(plain, truth),
+        "recall_at_k": recall(rescored, truth),
+        "vector_mb": docs.shape[0] * dimensions * 4 / 2**20,
+        "hnsw_mb": hnsw_mb(path),
+        "side_store_mb": (path / "full_embeddings.sqlite").stat().st_size / 2**20,
+        "index_seconds": index_seconds,
+        "query_seconds": query_seconds / len(queries),
+    }
+
+
+def run_int8(docs, queries, truth) -> Dict[str, Any]:
+    """Per-dimension scalar quantization to int8, brute-force search, then rescoring."""
+    import numpy as np
+
+    low, high = docs.min(0), docs.max(0)
+    scale = (high - low) / 255
+    codes = np.round((docs - low) / scale).astype(np.uint8)
+    decoded = codes * scale + low
+
+    found = exact_top_k(decoded, queries, K * 4)
+    rescored = []
+    for query, candidates in zip(queries, found):
+        distances = ((docs[candidates] - query) ** 2).sum(1)
+        rescored.append([candidates[i] for i in np.argsort(distances)[:K]])
+    return {
+        "recall_at_k_no_rescore": recall([f[:K] for f in found], truth),
+        "recall_at_k": recall(rescored, truth),
+        "vector_mb": codes.nbytes / 2**20,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    num_docs = env.scale(20_000, 2_000)
+    num_queries = env.scale(200, 50)
+    docs, queries = make_vectors(num_docs, num_queries)
+    truth = exact_top_k(docs, queries, K)
+    ids = [str(i) for i in range(num_docs)]
+    root = env.root / "compact_embeddings"
+
+    return {
+        "docs": num_docs,
+        "queries": num_queries,
+        "dim": DIM,
+        "k": K,
+        "float32": run_float(root, ids, docs, queries, truth),
+        **{
+            f"truncated_{dimensions}": run_truncated(root, ids, docs, queries, truth, dimensions)
+            for dimensions in (384, 256, 128)
+        },
+        "int8_brute_force": run_int8(docs, queries, truth),
+    }
@@ -0,0 +1,49 @@
+"""DOCX extraction: python-docx object model vs. streaming XML parser.
+
+Measures wall time and peak traced memory on a long generated document
+with a table every few paragraphs.
+"""
+
+import tracemalloc
+from typing import Any, Dict
+
+from benchmarks.fixtures import write_docx
+from benchmarks.harness import BenchEnvironment, best_of
+
+
+def python_docx_text(path) -> str:
+    """The previous DOCXLoader: all paragraphs, then all tables."""
+    from docx import Document as DocxDocument
+
+    doc = DocxDocument(path)
+    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = [cell.text for cell in row.cells if cell.text.strip()]
+            if row_text:
+                paragraphs.append(" | ".join(row_text))
+    return "\n\n".join(paragraphs)
+
+
+def measure(extract) -> Dict[str, float]:
+    seconds = best_of(extract, runs=2)
+    tracemalloc.start()
+    text = extract()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"chars": len(text), "seconds": seconds, "peak_mb": peak / 2**20}
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.loaders.docx_loader import DOCXLoader
+
+    # ~500 words per page
+    num_words = env.scale(250_000, 20_000)
+    path = write_docx(env.fixtures_dir / "contract.docx", num_words, table_every=5)
+
+    return {
+        "words": num_words,
+        "file_mb": path.stat().st_size / 2**20,
+        "python_docx": measure(lambda: python_docx_text(path)),
+        "streaming": measure(DOCXLoader(path).extract_text),
+    }
@@ -0,0 +1,61 @@
+"""End-to-end ingestion: load, chunk, embed (fake Ollama) and store.
+
+Runs once with an empty embedding cache, then rebuilds the index (clear and
+ingest the same corpus again), which the persistent cache should serve.
+"""
+
+from typing import Any, Dict
+
+from benchmarks.fixtures import write_fixture
+from benchmarks.harness import BenchEnvironment, stopwatch
+
+
+def ingest_corpus(env: BenchEnvironment, num_docs: int, num_words: int) -> int:
+    """Index a generated corpus and return the number of chunks written."""
+    from src.core.document_processor import DocumentProcessor
+    from src.vector_store.chroma_store import vector_store
+
+    chunks = 0
+    for i in range(num_docs):
+        file_type = ".md" if i % 2 else ".txt"
+        path = write_fixture(env.fixtures_dir, file_type, num_words, seed=1000 + i)
+        document = DocumentProcessor.load_document(str(path))
+        vector_store.add_document(document)
+        chunks += len(document.chunks)
+    return chunks
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.vector_store.chroma_store import vector_store
+    from src.vector_store.embeddings import embedding_service
+
+    cache = embedding_service.cache
+    vector_store.clear_all()
+    if cache:
+        cache.clear()
+    num_docs = env.scale(20, 4)
+    num_words = env.scale(5_000, 2_000)
+
+    with stopwatch() as timing:
+        chunks = ingest_corpus(env, num_docs, num_words)
+    results: Dict[str, Any] = {
+        "documents": num_docs,
+        "chunks": chunks,
+        "seconds": timing["wall_seconds"],
+        "cpu_seconds": timing["cpu_seconds"],
+        "chunks_per_second": chunks / timing["wall_seconds"],
+    }
+
+    if cache:
+        vector_store.clear_all()
+        hits, misses = cache.hits, cache.misses
+        with stopwatch() as timing:
+            ingest_corpus(env, num_docs, num_words)
+        lookups = cache.hits - hits + cache.misses - misses
+        results["rebuild"] = {
+            "seconds": timing["wall_seconds"],
+            "chunks_per_second": chunks / timing["wall_seconds"],
+            "cache_hit_rate": (cache.hits - hits) / lookups if lookups else 0.0,
+            "cache_mb": cache.stats()["size_mb"],
+        }
+    return results
@@ -0,0 +1,42 @@
+"""Per-loader text extraction speed on generated fixtures."""
+
+from pathlib import Path
+from typing import Any, Dict
+
+from benchmarks.fixtures import WRITERS, write_fixture
+from benchmarks.harness import BenchEnvironment, best_of
+
+
+def measure(path: Path) -> Dict[str, float]:
+    from src.core.document_processor import DocumentProcessor
+
+    loader = DocumentProcessor.get_loader(path)
+    text = loader.extract_text()
+    seconds = best_of(loader.extract_text)
+    size_mb = path.stat().st_size / (1024 * 1024)
+
+    return {
+        "file_mb": size_mb,
+        "chars": len(text),
+        "seconds": seconds,
+        "mb_per_second": size_mb / seconds,
+        "chars_per_second": len(text) / seconds,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    num_words = env.scale(50_000, 5_000)
+    results = {}
+
+    for file_type in WRITERS:
+        path = write_fixture(env.fixtures_dir, file_type, num_words)
+        results[file_type.lstrip(".")] = measure(path)
+
+    # A mostly-ASCII file with Windows-1252 punctuation near the end, as in
+    # exported logs: decoding as UTF-8 only fails late in the file
+    path = write_fixture(env.fixtures_dir, ".txt", num_words)
+    legacy = path.with_name("legacy_cp1252.txt")
+    legacy.write_bytes(path.read_bytes() + "\n“quoted” – end\n".encode("cp1252"))
+    results["txt_cp1252"] = measure(legacy)
+
+    return results
@@ -0,0 +1,50 @@
+"""Query latency distribution for retrieval alone and full RAG answers."""
+
+import random
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_ingest import ingest_corpus
+from benchmarks.fixtures import VOCABULARY
+from benchmarks.harness import BenchEnvironment, percentiles
+
+
+def make_questions(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        "What does the document say about " + " ".join(rng.choice(VOCABULARY) for _ in range(4)) + "?"
+        for _ in range(count)
+    ]
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.core.rag_engine import rag_engine
+    from src.vector_store.chroma_store import vector_store
+
+    if vector_store.get_document_info()["total_chunks"] == 0:
+        ingest_corpus(env, env.scale(10, 4), 2_000)
+
+    questions = make_questions(env.scale(50, 10))
+
+    retrieval = []
+    for question in questions:
+        start = time.perf_counter()
+        vector_store.query(question)
+        retrieval.append(time.perf_counter() - start)
+
+    first_token = []
+    total = []
+    for question in questions:
+        start = time.perf_counter()
+        first = None
+        for _ in rag_engine.query(question, stream=True):
+            if first is None:
+                first = time.perf_counter() - start
+        total.append(time.perf_counter() - start)
+        first_token.append(first or total[-1])
+
+    return {
+        "retrieval": percentiles(retrieval),
+        "rag_first_token": percentiles(first_token),
+        "rag_total": percentiles(total),
+    }
@@ -0,0 +1,95 @@
+"""Cross-encoder reranking: rerank latency vs. prompt tokens saved.
+
+Answers the same questions from the top RETRIEVAL_TOP_K vector search
+results and from RERANK_CANDIDATES candidates reranked down to
+RERANK_TOP_K, and reports rerank latency per candidate count, prompt size
+and time to first token. The fake server charges prefill time per prompt
+character, so a shorter prompt shows up as TTFT saved.
+
+Needs sentence-transformers and the cross-encoder (RERANK_MODEL), which is
+downloaded on first use; without the package the benchmark is skipped.
+"""
+
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_ingest import ingest_corpus
+from benchmarks.bench_query import make_questions
+from benchmarks.harness import BenchEnvironment, percentiles
+
+PREFILL_RATE = 20_000  # prompt characters per second
+CANDIDATE_COUNTS = (10, 20, 40)
+
+
+def answer(rag_engine, questions: List[str], top_k: int) -> Dict[str, Any]:
+    from src.utils.tokens import estimate_tokens
+
+    prompt_tokens = []
+    first_token = []
+    for question in questions:
+        results = rag_engine.retrieve(question, top_k=top_k)
+        prompt = rag_engine._build_prompt(question, rag_engine._build_context(results), results)
+        prompt_tokens.append(estimate_tokens(prompt))
+
+        start = time.perf_counter()
+        first = None
+        for _ in rag_engine.query(question, top_k=top_k, stream=True):
+            if first is None:
+                first = time.perf_counter() - start
+        first_token.append(first or time.perf_counter() - start)
+
+    return {
+        "chunks": top_k,
+        "prompt_tokens": statistics.fmean(prompt_tokens),
+        "first_token": percentiles(first_token),
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        return {"skipped": "sentence-transformers is not installed"}
+
+    from src.core.rag_engine import rag_engine
+    from src.core.reranker import Reranker
+    from src.utils.config import config
+    from src.vector_store.chroma_store import vector_store
+
+    if vector_store.count() == 0:
+        ingest_corpus(env, env.scale(10, 4), 2_000)
+    questions = make_questions(env.scale(30, 5))
+
+    reranker = Reranker()
+    start = time.perf_counter()
+    reranker.warmup()
+    results: Dict[str, Any] = {"model": reranker.model_name, "load_seconds": time.perf_counter() - start}
+
+    # Scoring cost grows with the number of candidates
+    latency = {}
+    for count in CANDIDATE_COUNTS:
+        samples = []
+        for question in questions:
+            texts = [match["text"] for match in vector_store.query(question, top_k=count)]
+            start = time.perf_counter()
+            reranker.score(question, texts)
+            samples.append(time.perf_counter() - start)
+        latency[f"candidates_{count}"] = percentiles(samples)
+    results["rerank_latency"] = latency
+
+    saved_prefill = env.settings.prefill_rate
+    saved_reranker = rag_engine.reranker
+    env.settings.prefill_rate = PREFILL_RATE
+    try:
+        rag_engine.reranker = None
+        results["vector_search"] = answer(rag_engine, questions, config.retrieval_top_k)
+        rag_engine.reranker = reranker
+        results["reranked"] = answer(rag_engine, questions, config.rerank_top_k)
+    finally:
+        env.settings.prefill_rate = saved_prefill
+        rag_engine.reranker = saved_reranker
+
+    results["reranked"]["candidates"] = config.rerank_candidates
+    results["prompt_tokens_saved"] = results["vector_search"]["prompt_tokens"] - results["reranked"]["prompt_tokens"]
+    return results
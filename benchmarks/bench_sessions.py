@@ -0,0 +1,70 @@
+"""Session store backends: per-turn save latency, load and list times.
+
+Each backend stores the same set of growing conversations. A second store
+instance (standing in for another API worker) reads every session back, so
+the numbers include what cross-worker continuity costs.
+"""
+
+import time
+from typing import Any, Dict
+
+from benchmarks.fake_redis import FakeRedisServer
+from benchmarks.harness import BenchEnvironment, percentiles
+
+
+def run_backend(backend: str, num_sessions: int, turns: int) -> Dict[str, Any]:
+    from src.core.session_store import create_session_store
+    from src.models.chat import ChatSession
+
+    store = create_session_store(backend)
+    # The in-memory backend can't be shared; everything else gets a second instance
+    other = store if backend == "memory" else create_session_store(backend)
+    store.clear_all_sessions()
+
+    sessions = [ChatSession(session_id=f"bench-{i}") for i in range(num_sessions)]
+    save_times = []
+    for turn in range(turns):
+        for session in sessions:
+            session.add_message("user", f"Question {turn} about the quarterly report and its figures.")
+            session.add_message("assistant", f"Answer {turn}: " + "the figures are in line with the plan. " * 8)
+            start = time.perf_counter()
+            store.save_session(session)
+            save_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for session in sessions:
+        assert other.get_message_count(session.session_id) == len(session.messages)
+    count_seconds = (time.perf_counter() - start) / num_sessions
+
+    start = time.perf_counter()
+    for session in sessions:
+        other.load_session(session.session_id)
+    load_seconds = (time.perf_counter() - start) / num_sessions
+
+    start = time.perf_counter()
+    other.list_sessions(limit=20)
+    list_seconds = time.perf_counter() - start
+
+    store.clear_all_sessions()
+    return {
+        "save": percentiles(save_times),
+        "message_count_seconds": count_seconds,
+        "load_seconds": load_seconds,
+        "list_page_seconds": list_seconds,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.utils.config import config
+
+    num_sessions = env.scale(50, 10)
+    turns = env.scale(40, 10)
+
+    results = {}
+    with FakeRedisServer() as redis_server:
+        config.session_redis_url = redis_server.url
+
+        for backend in ("memory", "file", "sqlite", "redis"):
+            results[backend] = run_backend(backend, num_sessions, turns)
+
+    return results
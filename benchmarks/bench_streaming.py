@@ -0,0 +1,97 @@
+"""Streaming overhead: per-token SSE events and terminal writes vs. coalesced.
+
+Tokens are produced at a fixed rate, as a model would stream them, and CPU
+time is measured per stream (sleeping between tokens is not counted).
+"""
+
+import io
+import json
+import time
+from typing import Any, Callable, Dict, Iterator
+
+from benchmarks.harness import BenchEnvironment
+
+TOKEN_RATE = 1000  # tokens per second
+
+
+def token_stream(num_tokens: int, rate: float = TOKEN_RATE) -> Iterator[str]:
+    words = "the figures are in line with the plan for the quarter".split()
+    start = time.monotonic()
+    for i in range(num_tokens):
+        delay = start + i / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield " " + words[i % len(words)]
+
+
+def measure(consume: Callable[[Iterator[str]], int], num_tokens: int) -> Dict[str, Any]:
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    events = consume(token_stream(num_tokens))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        "events": events,
+        "cpu_seconds": cpu,
+        "event_rate": events / wall,  # events per second (neutral: fewer is the goal)
+        "cpu_per_token_seconds": cpu / num_tokens,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from rich.console import Console
+    from src.cli import formatters as fmt
+    from src.utils.streaming import coalesce, sse_event
+
+    num_tokens = env.scale(3_000, 500)
+    session_id = "7b1e4c52-8d6f-4f0e-9b61-2a7c1f3d9e80"
+
+    def sse_per_token(tokens):
+        events = 0
+        for chunk in tokens:
+            f"data: {json.dumps({'chunk': chunk, 'session_id': session_id})}\n\n".encode()
+            events += 1
+        return events
+
+    def sse_coalesced(tokens):
+        events = 0
+        for chunk in coalesce(tokens):
+            sse_event({"chunk": chunk, "session_id": session_id})
+            events += 1
+        return events
+
+    # Render into an in-memory "terminal" so output speed isn't measured;
+    # CLI events are terminal writes
+    class CountingIO(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            CountingIO.writes += 1
+            return super().write(text)
+
+    console = Console(file=CountingIO(), force_terminal=True, width=120)
+
+    def cli_per_token(tokens):
+        CountingIO.writes = 0
+        for chunk in tokens:
+            console.print(chunk, end="")
+        return CountingIO.writes
+
+    def cli_coalesced(tokens):
+        CountingIO.writes = 0
+        saved = fmt.console
+        fmt.console = console
+        try:
+            fmt.stream_chat_response(tokens)
+        finally:
+            fmt.console = saved
+        return CountingIO.writes
+
+    return {
+        "tokens": num_tokens,
+        "token_rate": TOKEN_RATE,
+        "sse_per_token": measure(sse_per_token, num_tokens),
+        "sse_coalesced": measure(sse_coalesced, num_tokens),
+        "cli_per_token": measure(cli_per_token, num_tokens),
+        "cli_coalesced": measure(cli_coalesced, num_tokens),
+    }
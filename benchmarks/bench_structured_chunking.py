@@ -0,0 +1,60 @@
+"""Flat vs. heading-aware chunking of Markdown.
+
+Counts chunks that mix sections (run across a heading with only part of a
+section on one side) or cut a fenced code block in two, on the Kubernetes
+guide and on generated Markdown, and times both chunkers. Whole sections
+packed together don't count as mixed.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.fixtures import generate_markdown
+from benchmarks.harness import BenchEnvironment, best_of
+
+GUIDE = Path(__file__).resolve().parent.parent / "test_docs" / "kubernetes_guide.md"
+
+
+def chunk_stats(text: str, spans: List[Tuple[int, int]]) -> Dict[str, Any]:
+    from src.utils.chunking import markdown_sections
+
+    # Section bounds without surrounding whitespace, as chunks are stripped;
+    # headings inside code blocks ("# comment") don't count
+    sections = [(section.start, len(text[:section.end].rstrip())) for section in markdown_sections(text)]
+    starts = {start for start, _ in sections}
+    ends = {end for _, end in sections}
+    mixed = 0
+    split_fences = 0
+    for start, end in spans:
+        crosses = any(start < heading < end for heading, _ in sections)
+        if crosses and (start not in starts or end not in ends):
+            mixed += 1
+        if len(re.findall(r"^ {0,3}(?:```|~~~)", text[start:end], re.MULTILINE)) % 2:
+            split_fences += 1
+    return {
+        "chunks": len(spans),
+        "chunks_mixing_sections": mixed,
+        "chunks_splitting_code_blocks": split_fences,
+        "mean_chunk_chars": sum(end - start for start, end in spans) / max(len(spans), 1),
+    }
+
+
+def compare(text: str) -> Dict[str, Any]:
+    from src.utils.chunking import chunk_sections, chunk_spans
+
+    return {
+        "flat": {**chunk_stats(text, chunk_spans(text)), "seconds": best_of(lambda: chunk_spans(text))},
+        "structured": {
+            **chunk_stats(text, chunk_sections(text)[0]),
+            "seconds": best_of(lambda: chunk_sections(text)),
+        },
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    if GUIDE.exists():
+        results["kubernetes_guide"] = compare(GUIDE.read_text(encoding="utf-8"))
+    results["generated"] = compare(generate_markdown(env.scale(200_000, 20_000), paragraphs_per_section=2))
+    return results
@@ -0,0 +1,26 @@
+"""Summarizer wall time for short (direct) and long (map-reduce) inputs."""
+
+from typing import Any, Dict
+
+from benchmarks.fixtures import generate_text
+from benchmarks.harness import BenchEnvironment, stopwatch
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.core.summarizer import summarizer
+
+    results = {}
+    for name, num_words in (("short", 500), ("long", env.scale(10_000, 3_000))):
+        text = generate_text(num_words, seed=99)
+        calls_before = env.server.request_counts.get("/api/generate", 0)
+
+        with stopwatch() as timing:
+            summarizer.summarize_text(text)
+
+        results[name] = {
+            "words": num_words,
+            "seconds": timing["wall_seconds"],
+            "llm_calls": env.server.request_counts.get("/api/generate", 0) - calls_before,
+        }
+
+    return results
@@ -0,0 +1,44 @@
+"""Directory sync: full initial index vs. incremental re-syncs."""
+
+import os
+from typing import Any, Dict
+
+from benchmarks.fixtures import write_fixture
+from benchmarks.harness import BenchEnvironment
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    from src.core.index_sync import IndexManifest, IndexSync
+    from src.vector_store.chroma_store import vector_store
+
+    vector_store.clear_all()
+    corpus = env.root / "sync_corpus"
+    corpus.mkdir()
+    num_files = env.scale(100, 20)
+    paths = [write_fixture(corpus, ".md" if i % 2 else ".txt", 1_000, seed=2000 + i) for i in range(num_files)]
+
+    sync = IndexSync(str(corpus), manifest=IndexManifest(env.root / "sync_manifest.json"))
+    initial = sync.sync()
+    unchanged = sync.sync()
+
+    # Touch every file (mtime changes, content doesn't): hashed, not re-embedded
+    for path in paths:
+        os.utime(path)
+    touched = sync.sync()
+
+    # Modify a few files and delete one
+    for path in paths[:max(1, num_files // 50)]:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n\nAn appended paragraph about the revised figures.\n")
+    paths[-1].unlink()
+    incremental = sync.sync()
+
+    return {
+        "files": num_files,
+        "initial_seconds": initial.seconds,
+        "unchanged_seconds": unchanged.seconds,
+        "touched_seconds": touched.seconds,
+        "incremental_seconds": incremental.seconds,
+        "incremental_updated": incremental.updated,
+        "incremental_removed": incremental.removed,
+    }
@@ -0,0 +1,118 @@
+"""Vector store service overhead: embedded ChromaDB vs. the Unix socket service.
+
+Uses random embeddings so only storage and search are timed. The service
+runs in its own process, as it would next to several API workers.
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.harness import BenchEnvironment, percentiles
+
+DIM = 768
+QUERY_BATCH = 8
+THREADS = 4
+
+
+def random_vectors(count: int, rng: random.Random) -> List[List[float]]:
+    return [[rng.uniform(-1, 1) for _ in range(DIM)] for _ in range(count)]
+
+
+def start_service(env: BenchEnvironment) -> subprocess.Popen:
+    """Run `docai index-server` in a child process and wait until it answers."""
+    from src.vector_store.service import VectorServiceClient
+
+    socket_path = env.root / "vector_store.sock"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.main", "index-server", "--socket", str(socket_path)],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**os.environ, "VECTOR_STORE_PATH": str(env.root / "service_db")},
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            VectorServiceClient(socket_path).ping()
+            return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("Vector store service did not start")
+            time.sleep(0.1)
+
+
+def run_collection(collection, num_chunks: int, num_queries: int) -> Dict[str, Any]:
+    rng = random.Random(5)
+    vectors = random_vectors(num_chunks, rng)
+    documents = [f"chunk {i}" for i in range(num_chunks)]
+    metadatas = [{"doc_id": f"doc-{i // 50}", "chunk_index": i % 50} for i in range(num_chunks)]
+
+    start = time.perf_counter()
+    for offset in range(0, num_chunks, 50):
+        collection.add(
+            ids=[f"c{i}" for i in range(offset, offset + 50)],
+            embeddings=vectors[offset:offset + 50],
+            documents=documents[offset:offset + 50],
+            metadatas=metadatas[offset:offset + 50],
+        )
+    add_seconds = time.perf_counter() - start
+
+    queries = random_vectors(num_queries, rng)
+    single = []
+    for query in queries:
+        start = time.perf_counter()
+        collection.query(query_embeddings=[query], n_results=5)
+        single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, num_queries, QUERY_BATCH):
+        collection.query(query_embeddings=queries[offset:offset + QUERY_BATCH], n_results=5)
+    batched_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(lambda q: collection.query(query_embeddings=[q], n_results=5), queries))
+    threaded_seconds = time.perf_counter() - start
+
+    return {
+        "add_chunks_per_second": num_chunks / add_seconds,
+        "query": percentiles(single),
+        "batched_queries_per_second": num_queries / batched_seconds,
+        "threaded_queries_per_second": num_queries / threaded_seconds,
+    }
+
+
+def run(env: BenchEnvironment) -> Dict[str, Any]:
+    import chromadb
+    from chromadb.config import Settings
+    from src.vector_store.service import VectorServiceClient, encode_frame, OP_ADD
+
+    num_chunks = env.scale(5_000, 500)
+    num_queries = env.scale(400, 80)
+
+    embedded = chromadb.PersistentClient(
+        path=str(env.root / "embedded_db"),
+        settings=Settings(anonymized_telemetry=False),
+    )
+    results = {"embedded": run_collection(embedded.get_or_create_collection("bench"), num_chunks, num_queries)}
+
+    process = start_service(env)
+    try:
+        client = VectorServiceClient(env.root / "vector_store.sock")
+        results["service"] = run_collection(client.get_or_create_collection("bench"), num_chunks, num_queries)
+    finally:
+        process.terminate()
+        process.wait()
+
+    # Wire size of one 50-chunk write: binary frame vs. the same request as JSON
+    vectors = random_vectors(50, random.Random(1))
+    payload = {"collection": "bench", "ids": [f"c{i}" for i in range(50)]}
+    results["frame_bytes"] = len(encode_frame(OP_ADD, payload, vectors))
+    results["json_request_bytes"] = len(json.dumps({**payload, "embeddings": vectors}).encode())
+    return results
@@ -0,0 +1,69 @@
+"""
+Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+
+import json
+import sys
+from typing import Any, Dict, Optional
+
+import click
+
+
+def flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results into dotted metric names."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def direction(metric: str) -> Optional[int]:
+    """Return +1 if higher is better, -1 if lower is better, None if neutral."""
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.endswith("_per_second") or leaf.startswith("recall") or leaf.endswith("_saved"):
+        return 1
+    if leaf.endswith("seconds") or leaf.endswith("_bytes") or leaf.endswith("_mb"):
+        return -1
+    return None
+
+
+@click.command()
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False))
+@click.option("--threshold", default=10.0, help="Regression threshold in percent")
+def main(baseline, current, threshold):
+    """Print per-metric changes and exit non-zero on regressions."""
+    with open(baseline) as f:
+        base = flatten(json.load(f)["results"])
+    with open(current) as f:
+        curr = flatten(json.load(f)["results"])
+
+    regressions = 0
+    for metric in sorted(set(base) & set(curr)):
+        better = direction(metric)
+        if better is None or base[metric] == 0:
+            continue
+
+        change = (curr[metric] - base[metric]) / abs(base[metric]) * 100
+        regressed = change * better < -threshold
+        regressions += regressed
+        marker = "REGRESSION" if regressed else ""
+        click.echo(f"{metric:60s} {base[metric]:>14.6g} -> {curr[metric]:>14.6g} {change:+7.1f}% {marker}")
+
+    for metric in sorted(set(base) ^ set(curr)):
+        click.echo(f"{metric:60s} only in {'baseline' if metric in base else 'current'}")
+
+    if regressions:
+        click.echo(f"\n{regressions} metric(s) regressed by more than {threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
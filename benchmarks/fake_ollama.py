@@ -0,0 +1,369 @@
+"""
+Stand-in Ollama HTTP server for benchmarks.
+
+Implements the subset of the Ollama API used by DocAI (/api/generate,
+/api/chat, /api/embeddings, /api/embed, /api/tags) with deterministic
+output and configurable latency, so the full pipeline can be timed without
+a GPU. Optionally simulates the server's prompt (KV) cache: prefill is only
+charged for the part of the templated prompt not shared with a cached slot,
+and the model is "reloaded" when keep_alive has expired.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+WORD_RE = re.compile(r"\w+")
+
+RESPONSE_WORDS = (
+    "The documents describe how the system is configured and which components "
+    "are involved in processing requests across the cluster"
+).split()
+
+
+@dataclass
+class FakeOllamaSettings:
+    """Behaviour knobs for the fake server."""
+
+    embedding_dim: int = 768
+    embedding_latency: float = 0.0  # seconds per embedding request
+    latency: float = 0.05  # seconds before the first token
+    prefill_rate: float = 0.0  # prompt characters per second (0 = free prefill)
+    token_rate: float = 200.0  # generated tokens per second (0 = unthrottled)
+    response_tokens: int = 64
+    prefix_cache: bool = False  # only charge prefill for uncached prompt characters
+    cache_slots: int = 1  # cached sequences kept (like OLLAMA_NUM_PARALLEL)
+    load_time: float = 0.0  # seconds to load the model after keep_alive expiry
+
+
+def parse_keep_alive(value: Union[str, int, float, None], default: float = 300.0) -> float:
+    """Convert an Ollama keep_alive value to seconds (negative = forever)."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)(ms|s|m|h)?", value.strip())
+    if not match:
+        return default
+    return float(match.group(1)) * units[match.group(2) or "s"]
+
+
+class PromptCache:
+    """Simulated KV cache: a few slots holding the last templated sequence."""
+
+    def __init__(self, slots: int):
+        self.slots: List[str] = [""] * max(1, slots)
+        self.last_used: List[float] = [0.0] * len(self.slots)
+        self.lock = threading.Lock()
+
+    # Minimum shared fraction of a cached sequence to reuse its slot
+    SIMILARITY = 0.5
+
+    def acquire(self, sequence: str) -> tuple:
+        """Pick the slot sharing the longest prefix; return (slot, cached chars)."""
+        with self.lock:
+            shared = [len(os.path.commonprefix([cached, sequence])) for cached in self.slots]
+            best = max(range(len(self.slots)), key=lambda i: shared[i])
+            if shared[best] < self.SIMILARITY * len(self.slots[best]) or shared[best] == 0:
+                # Nothing reusable: evict the least recently used slot
+                best = min(range(len(self.slots)), key=lambda i: self.last_used[i])
+                shared[best] = len(os.path.commonprefix([self.slots[best], sequence]))
+            self.last_used[best] = time.monotonic()
+            return best, shared[best]
+
+    def store(self, slot: int, sequence: str):
+        with self.lock:
+            self.slots[slot] = sequence
+            self.last_used[slot] = time.monotonic()
+
+    def clear(self):
+        with self.lock:
+            self.slots = [""] * len(self.slots)
+
+
+def deterministic_embedding(text: str, dim: int) -> List[float]:
+    """Feature-hashed bag-of-words embedding, stable across runs.
+
+    Texts sharing words get similar vectors, so retrieval behaves
+    plausibly while staying fully deterministic.
+    """
+    vector = [0.0] * dim
+    for word in WORD_RE.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dim
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[index] += sign
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        vector[0] = 1.0
+        return vector
+    return [v / norm for v in vector]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, lines: Iterator[Dict[str, Any]]):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = 0
+        try:
+            for line in lines:
+                data = json.dumps(line).encode() + b"\n"
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                tokens += not line.get("done")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away: stop generating, like Ollama does
+            self.close_connection = True
+            self.server.record_generation(tokens, aborted=True)
+        else:
+            self.server.record_generation(tokens, aborted=False)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path in ("", "/api/version"):
+            self._send_json({"version": "0.0.0-fake"})
+        elif path == "/api/tags":
+            self._send_json({"models": []})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        payload = self._read_json()
+        settings = self.server.settings
+        self.server.record(path)
+
+        if path == "/api/embeddings":
+            time.sleep(settings.embedding_latency)
+            self._send_json({
+                "embedding": deterministic_embedding(payload.get("prompt", ""), settings.embedding_dim)
+            })
+        elif path == "/api/embed":
+            inputs = payload.get("input", "")
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            time.sleep(settings.embedding_latency)
+            self._send_json({
+                "embeddings": [deterministic_embedding(t, settings.embedding_dim) for t in inputs]
+            })
+        elif path == "/api/generate":
+            self._generate(payload)
+        elif path == "/api/chat":
+            self._chat(payload)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _num_tokens(self, payload: Dict[str, Any]) -> int:
+        settings = self.server.settings
+        num_predict = (payload.get("options") or {}).get("num_predict")
+        if num_predict and num_predict > 0:
+            return min(num_predict, settings.response_tokens)
+        return settings.response_tokens
+
+    def _token_stream(self, sequence: str, num_tokens: int, keep_alive: Optional[str]) -> Iterator[str]:
+        """Yield response tokens with the configured load, prefill and decode timing.
+
+        sequence is the templated prompt; with prefix_cache enabled only
+        the part not shared with a cached slot is charged for prefill.
+        """
+        settings = self.server.settings
+        delay = settings.latency + self.server.load_model(keep_alive)
+
+        slot, cached = 0, 0
+        if settings.prefix_cache:
+            slot, cached = self.server.cache.acquire(sequence)
+        uncached = len(sequence) - cached
+        self.server.record_prefill(cached, uncached)
+        if settings.prefill_rate:
+            delay += uncached / settings.prefill_rate
+        time.sleep(delay)
+
+        interval = 1.0 / settings.token_rate if settings.token_rate else 0.0
+        response = []
+        for i in range(num_tokens):
+            if i and interval:
+                time.sleep(interval)
+            word = RESPONSE_WORDS[i % len(RESPONSE_WORDS)]
+            token = word if i == 0 else f" {word}"
+            response.append(token)
+            yield token
+
+        if settings.prefix_cache:
+            self.server.cache.store(slot, sequence + "".join(response))
+
+    def _generate(self, payload: Dict[str, Any]):
+        # /api/generate wraps the whole prompt in a single user turn
+        sequence = f"<|user|>{payload.get('prompt', '')}<|assistant|>"
+        tokens = self._token_stream(sequence, self._num_tokens(payload), payload.get("keep_alive"))
+        model = payload.get("model", "fake")
+
+        if payload.get("stream", True):
+            def lines():
+                for token in tokens:
+                    yield {"model": model, "response": token, "done": False}
+                yield {"model": model, "response": "", "done": True}
+
+            self._send_stream(lines())
+        else:
+            self._send_json({"model": model, "response": "".join(tokens), "done": True})
+
+    def _chat(self, payload: Dict[str, Any]):
+        messages = payload.get("messages") or []
+        sequence = "".join(f"<|{m.get('role')}|>{m.get('content', '')}" for m in messages) + "<|assistant|>"
+        tokens = self._token_stream(sequence, self._num_tokens(payload), payload.get("keep_alive"))
+        model = payload.get("model", "fake")
+
+        if payload.get("stream", True):
+            def lines():
+                for token in tokens:
+                    yield {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+                yield {"model": model, "message": {"role": "assistant", "content": ""}, "done": True}
+
+            self._send_stream(lines())
+        else:
+            self._send_json({
+                "model": model,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "done": True,
+            })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, settings: FakeOllamaSettings):
+        super().__init__(address, _Handler)
+        self.settings = settings
+        self.request_counts: Dict[str, int] = {}
+        self.prefill_stats = {"cached_chars": 0, "prefill_chars": 0, "model_loads": 0}
+        self.generation_stats = {"completed": 0, "aborted": 0, "tokens": 0}
+        self.cache = PromptCache(settings.cache_slots)
+        self._lock = threading.Lock()
+        self._model_expires_at: Optional[float] = None
+
+    def record(self, path: str):
+        with self._lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+
+    def record_prefill(self, cached: int, uncached: int):
+        with self._lock:
+            self.prefill_stats["cached_chars"] += cached
+            self.prefill_stats["prefill_chars"] += uncached
+
+    def record_generation(self, tokens: int, aborted: bool):
+        with self._lock:
+            self.generation_stats["aborted" if aborted else "completed"] += 1
+            self.generation_stats["tokens"] += tokens
+
+    def load_model(self, keep_alive: Optional[str]) -> float:
+        """Return the load delay for this request and extend the keep-alive."""
+        now = time.monotonic()
+        ttl = parse_keep_alive(keep_alive)
+        with self._lock:
+            expired = self._model_expires_at is None or (0 <= self._model_expires_at < now)
+            self._model_expires_at = -1.0 if ttl < 0 else now + ttl
+            if not expired:
+                return 0.0
+            self.prefill_stats["model_loads"] += 1
+        # A reloaded model starts with an empty KV cache
+        self.cache.clear()
+        return self.settings.load_time
+
+
+class FakeOllamaServer:
+    """Run the fake Ollama API on a background thread.
+
+    Usage:
+        with FakeOllamaServer(FakeOllamaSettings(token_rate=100)) as server:
+            os.environ["OLLAMA_BASE_URL"] = server.url
+    """
+
+    def __init__(self, settings: FakeOllamaSettings = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or FakeOllamaSettings()
+        self._server = _Server((host, port), self.settings)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_counts(self) -> Dict[str, int]:
+        return dict(self._server.request_counts)
+
+    @property
+    def prefill_stats(self) -> Dict[str, int]:
+        return dict(self._server.prefill_stats)
+
+    @property
+    def generation_stats(self) -> Dict[str, int]:
+        """Streamed generations completed/aborted by client disconnect, and tokens sent."""
+        return dict(self._server.generation_stats)
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import click
+
+    @click.command()
+    @click.option("--port", default=11435, help="Port to listen on")
+    @click.option("--token-rate", default=200.0, help="Generated tokens per second")
+    @click.option("--latency", default=0.05, help="Seconds before the first token")
+    @click.option("--prefill-rate", default=0.0, help="Prompt characters per second (0 = free)")
+    @click.option("--prefix-cache", is_flag=True, help="Simulate the server's prompt cache")
+    def main(port, token_rate, latency, prefill_rate, prefix_cache):
+        """Serve the fake Ollama API until interrupted."""
+        settings = FakeOllamaSettings(
+            token_rate=token_rate, latency=latency, prefill_rate=prefill_rate, prefix_cache=prefix_cache
+        )
+        server = FakeOllamaServer(settings, port=port)
+        click.echo(f"Fake Ollama listening on {server.url}")
+        server._server.serve_forever()
+
+    main()
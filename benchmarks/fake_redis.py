@@ -0,0 +1,303 @@
+"""
+Stand-in Redis server for benchmarks and local testing.
+
+Speaks RESP2 and implements the commands used by the Redis session backend
+(strings are not needed; hashes, lists, sorted sets, DEL/EXISTS/KEYS and
+MULTI/EXEC pipelines with WATCH), keeping everything in memory. Good enough to run
+``SESSION_BACKEND=redis`` without a real Redis.
+"""
+
+import fnmatch
+import socketserver
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class RespError(Exception):
+    """Error reply sent back to the client."""
+
+
+# Commands that modify the key in their first argument (DEL: all arguments)
+WRITE_COMMANDS = {"HSET", "RPUSH", "ZADD", "ZREM"}
+
+
+class _Store:
+    """Keyspace shared by all connections; one lock serializes commands."""
+
+    def __init__(self):
+        self.data: Dict[bytes, Any] = {}
+        self.lock = threading.Lock()
+        self.command_counts: Dict[str, int] = {}
+        # Write counters for WATCH; FLUSHDB bumps the epoch instead
+        self.versions: Dict[bytes, int] = {}
+        self.epoch = 0
+
+    def version(self, key: bytes) -> tuple:
+        return self.epoch, self.versions.get(key, 0)
+
+    def _touch(self, *keys: bytes):
+        for key in keys:
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _get(self, key: bytes, kind: type, create: bool = False):
+        value = self.data.get(key)
+        if value is None:
+            if not create:
+                return None
+            value = self.data[key] = kind()
+        if not isinstance(value, kind):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def execute(self, args: List[bytes]) -> Any:
+        name = args[0].decode().upper()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise RespError(f"ERR unknown command '{name}'")
+        self.command_counts[name] = self.command_counts.get(name, 0) + 1
+        result = handler(*args[1:])
+        if name in WRITE_COMMANDS:
+            self._touch(args[1])
+        elif name == "DEL":
+            self._touch(*args[1:])
+        elif name == "FLUSHDB":
+            self.epoch += 1
+        # Drop an emptied container, like Redis does
+        if len(args) > 1 and args[1] in self.data and not self.data[args[1]]:
+            del self.data[args[1]]
+        return result
+
+    # Connection / keyspace
+    def cmd_ping(self, *args):
+        return args[0] if args else "PONG"
+
+    def cmd_select(self, index):
+        return "OK"
+
+    def cmd_client(self, *args):
+        return "OK"
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        return "OK"
+
+    def cmd_del(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def cmd_exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    def cmd_keys(self, pattern):
+        return [key for key in self.data if fnmatch.fnmatchcase(key.decode(), pattern.decode())]
+
+    # Hashes
+    def cmd_hset(self, key, *pairs):
+        if not pairs or len(pairs) % 2:
+            raise RespError("ERR wrong number of arguments for 'hset' command")
+        hash_ = self._get(key, dict, create=True)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in hash_
+            hash_[field] = value
+        return added
+
+    def cmd_hget(self, key, field):
+        hash_ = self._get(key, dict) or {}
+        return hash_.get(field)
+
+    def cmd_hmget(self, key, *fields):
+        hash_ = self._get(key, dict) or {}
+        return [hash_.get(field) for field in fields]
+
+    def cmd_hgetall(self, key):
+        hash_ = self._get(key, dict) or {}
+        return [item for pair in hash_.items() for item in pair]
+
+    # Lists
+    def cmd_rpush(self, key, *values):
+        list_ = self._get(key, list, create=True)
+        list_.extend(values)
+        return len(list_)
+
+    def cmd_llen(self, key):
+        return len(self._get(key, list) or [])
+
+    def cmd_lrange(self, key, start, stop):
+        list_ = self._get(key, list) or []
+        start, stop = int(start), int(stop)
+        if start < 0:
+            start = max(len(list_) + start, 0)
+        stop = len(list_) + stop if stop < 0 else stop
+        return list_[start:stop + 1]
+
+    # Sorted sets
+    def cmd_zadd(self, key, *pairs):
+        zset = self._get(key, dict, create=True)
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def cmd_zrem(self, key, *members):
+        zset = self._get(key, dict) or {}
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    def cmd_zcard(self, key):
+        return len(self._get(key, dict) or {})
+
+    def _zrange(self, key, start, stop, reverse: bool):
+        zset = self._get(key, dict) or {}
+        members = sorted(zset, key=lambda m: (zset[m], m), reverse=reverse)
+        start, stop = int(start), int(stop)
+        if start < 0:
+            start = max(len(members) + start, 0)
+        stop = len(members) + stop if stop < 0 else stop
+        return members[start:stop + 1]
+
+    def cmd_zrange(self, key, start, stop):
+        return self._zrange(key, start, stop, reverse=False)
+
+    def cmd_zrevrange(self, key, start, stop):
+        return self._zrange(key, start, stop, reverse=True)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. from telnet/redis-cli)
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _encode(self, value: Any) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, RespError):
+            return f"-{value}\r\n".encode()
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        if isinstance(value, bool) or isinstance(value, int):
+            return f":{int(value)}\r\n".encode()
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(self._encode(v) for v in value)
+        raise TypeError(f"Cannot encode {type(value).__name__}")
+
+    def _call(self, args: List[bytes]) -> Any:
+        """Execute one command (lock held), turning failures into error replies."""
+        try:
+            return self.server.store.execute(args)
+        except RespError as e:
+            return e
+        except (TypeError, ValueError):
+            return RespError(f"ERR wrong arguments for '{args[0].decode()}' command")
+
+    def handle(self):
+        queued: Optional[List[List[bytes]]] = None
+        # WATCHed key -> its version when watched
+        watched: Dict[bytes, tuple] = {}
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+
+            name = args[0].upper()
+            store = self.server.store
+            if name == b"MULTI":
+                queued, reply = [], "OK"
+            elif name == b"WATCH" and queued is None:
+                with store.lock:
+                    watched.update((key, store.version(key)) for key in args[1:])
+                reply = "OK"
+            elif name == b"UNWATCH" and queued is None:
+                watched, reply = {}, "OK"
+            elif name == b"EXEC" and queued is not None:
+                # Run the whole transaction under one lock acquisition,
+                # unless a WATCHed key was written since (nil reply)
+                with store.lock:
+                    if any(store.version(key) != version for key, version in watched.items()):
+                        reply = None
+                    else:
+                        reply = [self._call(command) for command in queued]
+                queued, watched = None, {}
+            elif name == b"DISCARD" and queued is not None:
+                queued, watched, reply = None, {}, "OK"
+            elif queued is not None:
+                queued.append(args)
+                reply = "QUEUED"
+            else:
+                with self.server.store.lock:
+                    reply = self._call(args)
+
+            self.wfile.write(self._encode(reply))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _Handler)
+        self.store = _Store()
+
+
+class FakeRedisServer:
+    """Run the fake Redis server on a background thread.
+
+    Usage:
+        with FakeRedisServer() as server:
+            os.environ["SESSION_REDIS_URL"] = server.url
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _Server((host, port))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    @property
+    def command_counts(self) -> Dict[str, int]:
+        return dict(self._server.store.command_counts)
+
+    def start(self) -> "FakeRedisServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeRedisServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import click
+
+    @click.command()
+    @click.option("--port", default=6380, help="Port to listen on")
+    def main(port):
+        """Serve the fake Redis until interrupted."""
+        server = FakeRedisServer(port=port)
+        click.echo(f"Fake Redis listening on {server.url}")
+        server._server.serve_forever()
+
+    main()
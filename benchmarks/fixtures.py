@@ -0,0 +1,159 @@
+"""
+Deterministic benchmark fixtures.
+
+Generates TXT, MD, PDF and DOCX files of a given size from a seeded
+vocabulary so results are comparable between commits.
+"""
+
+import random
+from pathlib import Path
+from typing import List
+
+VOCABULARY = (
+    "kubernetes pod deployment service replica node cluster container image "
+    "volume namespace ingress controller scheduler network policy secret config "
+    "model training dataset feature label gradient loss accuracy validation "
+    "regression classification neural layer embedding vector index query "
+    "document chunk retrieval context answer summary the a of to and in is "
+    "for with on by this that from are be as it can which"
+).split()
+
+
+def generate_paragraphs(num_words: int, seed: int = 42, words_per_paragraph: int = 120) -> List[str]:
+    """Generate pseudo-random paragraphs totalling roughly num_words words."""
+    rng = random.Random(seed)
+    paragraphs = []
+    remaining = num_words
+
+    while remaining > 0:
+        count = min(words_per_paragraph, remaining)
+        words = [rng.choice(VOCABULARY) for _ in range(count)]
+        sentences = []
+        for start in range(0, len(words), 15):
+            sentence = " ".join(words[start:start + 15])
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        paragraphs.append(" ".join(sentences))
+        remaining -= count
+
+    return paragraphs
+
+
+def generate_text(num_words: int, seed: int = 42) -> str:
+    """Generate plain text of roughly num_words words."""
+    return "\n\n".join(generate_paragraphs(num_words, seed))
+
+
+def generate_markdown(num_words: int, seed: int = 42, paragraphs_per_section: int = 4) -> str:
+    """Generate Markdown with headings, paragraphs and code blocks."""
+    paragraphs = generate_paragraphs(num_words, seed)
+    parts = ["# Benchmark Guide"]
+
+    for i, paragraph in enumerate(paragraphs):
+        if i % paragraphs_per_section == 0:
+            parts.append(f"## Section {i // paragraphs_per_section + 1}")
+        parts.append(paragraph)
+        if i % paragraphs_per_section == paragraphs_per_section - 1:
+            parts.append(f"```bash\nkubectl get pods -n section-{i}\n```")
+
+    return "\n\n".join(parts)
+
+
+def write_txt(path: Path, num_words: int, seed: int = 42) -> Path:
+    path.write_text(generate_text(num_words, seed), encoding="utf-8")
+    return path
+
+
+def write_md(path: Path, num_words: int, seed: int = 42) -> Path:
+    path.write_text(generate_markdown(num_words, seed), encoding="utf-8")
+    return path
+
+
+def write_docx(path: Path, num_words: int, seed: int = 42, table_every: int = 10) -> Path:
+    """Write a DOCX with headings, paragraphs and periodic tables."""
+    from docx import Document as DocxDocument
+
+    doc = DocxDocument()
+    doc.add_heading("Benchmark Document", level=1)
+    rng = random.Random(seed)
+
+    for i, paragraph in enumerate(generate_paragraphs(num_words, seed)):
+        if i % table_every == 0:
+            doc.add_heading(f"Section {i // table_every + 1}", level=2)
+        doc.add_paragraph(paragraph)
+        if i % table_every == table_every - 1:
+            table = doc.add_table(rows=4, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = " ".join(rng.choice(VOCABULARY) for _ in range(3))
+
+    doc.save(str(path))
+    return path
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, num_words: int, seed: int = 42, lines_per_page: int = 45, chars_per_line: int = 90) -> Path:
+    """Write a minimal multi-page text PDF without third-party writers."""
+    lines: List[str] = []
+    for paragraph in generate_paragraphs(num_words, seed):
+        line = ""
+        for word in paragraph.split():
+            if len(line) + len(word) + 1 > chars_per_line:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+        lines.append("")
+
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    # Object layout: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects: List[bytes] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id, page_lines in zip(page_ids, pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 750 Td"]
+        ops.extend(f"({_pdf_escape(line)}) '" for line in page_lines)
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+
+    path.write_bytes(bytes(out))
+    return path
+
+
+WRITERS = {
+    ".txt": write_txt,
+    ".md": write_md,
+    ".pdf": write_pdf,
+    ".docx": write_docx,
+}
+
+
+def write_fixture(directory: Path, file_type: str, num_words: int, seed: int = 42) -> Path:
+    """Write a fixture of the given type into directory and return its path."""
+    path = directory / f"bench_{num_words}w_{seed}{file_type}"
+    return WRITERS[file_type](path, num_words, seed)
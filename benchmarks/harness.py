@@ -0,0 +1,106 @@
+"""
+Shared benchmark harness: environment setup, timing and statistics.
+"""
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.fake_ollama import FakeOllamaServer, FakeOllamaSettings
+
+
+@dataclass
+class BenchEnvironment:
+    """Isolated environment for a benchmark run.
+
+    Starts the fake Ollama server and points DocAI at it together with an
+    embedded ChromaDB and session store in a temporary directory. Must be
+    entered before any ``src`` module is imported, since configuration is
+    read once at import time.
+    """
+
+    settings: FakeOllamaSettings = field(default_factory=FakeOllamaSettings)
+    quick: bool = False
+    root: Optional[Path] = None
+    server: Optional[FakeOllamaServer] = None
+    fixtures_dir: Optional[Path] = None
+
+    def __enter__(self) -> "BenchEnvironment":
+        self.root = Path(tempfile.mkdtemp(prefix="docai-bench-"))
+        self.fixtures_dir = self.root / "fixtures"
+        self.fixtures_dir.mkdir()
+        self.server = FakeOllamaServer(self.settings).start()
+
+        os.environ.update({
+            "OLLAMA_BASE_URL": self.server.url,
+            "CHROMA_HOST": "",
+            "VECTOR_STORE_PATH": str(self.root / "vector_db"),
+            "EMBEDDING_CACHE_PATH": str(self.root / "embedding_cache.sqlite"),
+            "SESSION_STORAGE_PATH": str(self.root / "sessions"),
+            "SESSION_SQLITE_PATH": str(self.root / "sessions.db"),
+            "COLLECTION_NAME": "bench",
+        })
+        return self
+
+    def __exit__(self, *exc):
+        if self.server:
+            self.server.stop()
+        if self.root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def scale(self, full: int, quick: int) -> int:
+        """Pick a workload size depending on quick mode."""
+        return quick if self.quick else full
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) as mean and p50/p95/p99."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    return {
+        "count": len(ordered),
+        "mean_seconds": statistics.fmean(ordered),
+        "p50_seconds": pick(0.50),
+        "p95_seconds": pick(0.95),
+        "p99_seconds": pick(0.99),
+    }
+
+
+@contextmanager
+def stopwatch() -> Iterator[Dict[str, float]]:
+    """Measure wall and CPU time of the enclosed block."""
+    result: Dict[str, float] = {}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield result
+    finally:
+        result["wall_seconds"] = time.perf_counter() - wall_start
+        result["cpu_seconds"] = time.process_time() - cpu_start
+
+
+def repeat(fn: Callable[[], Any], runs: int) -> List[float]:
+    """Run fn several times and return the wall time of each run."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def best_of(fn: Callable[[], Any], runs: int = 3) -> float:
+    """Return the fastest wall time over several runs."""
+    return min(repeat(fn, runs))
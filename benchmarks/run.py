@@ -0,0 +1,101 @@
+"""
+Run the DocAI component benchmark suite.
+
+Usage:
+    python -m benchmarks.run --output bench/results.json
+    python -m benchmarks.run --quick --only chunking --only loaders
+"""
+
+import importlib
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+from benchmarks.fake_ollama import FakeOllamaSettings
+from benchmarks.harness import BenchEnvironment
+
+# Benchmark name -> module exposing run(env) -> dict, in execution order
+BENCHMARKS = {
+    "chunking": "benchmarks.bench_chunking",
+    "chunk_records": "benchmarks.bench_chunk_records",
+    "structured_chunking": "benchmarks.bench_structured_chunking",
+    "loaders": "benchmarks.bench_loaders",
+    "docx": "benchmarks.bench_docx",
+    "ingest": "benchmarks.bench_ingest",
+    "query": "benchmarks.bench_query",
+    "compact_embeddings": "benchmarks.bench_compact_embeddings",
+    "rerank": "benchmarks.bench_rerank",
+    "summarizer": "benchmarks.bench_summarizer",
+    "chat_history": "benchmarks.bench_chat_history",
+    "chat_api": "benchmarks.bench_chat_api",
+    "streaming": "benchmarks.bench_streaming",
+    "sync": "benchmarks.bench_sync",
+    "sessions": "benchmarks.bench_sessions",
+    "vector_service": "benchmarks.bench_vector_service",
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+@click.command()
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None, help="Write JSON results to this file")
+@click.option("--only", multiple=True, type=click.Choice(list(BENCHMARKS)), help="Run only these benchmarks (repeatable)")
+@click.option("--quick", is_flag=True, help="Use small workloads for a fast smoke run")
+@click.option("--token-rate", default=200.0, help="Fake Ollama generated tokens per second")
+@click.option("--latency", default=0.05, help="Fake Ollama seconds before the first token")
+@click.option("--prefill-rate", default=0.0, help="Fake Ollama prompt characters per second (0 = free)")
+@click.option("--embedding-latency", default=0.0, help="Fake Ollama seconds per embedding request")
+def main(output, only, quick, token_rate, latency, prefill_rate, embedding_latency):
+    """Run benchmarks against a fake Ollama server and embedded ChromaDB."""
+    settings = FakeOllamaSettings(
+        token_rate=token_rate,
+        latency=latency,
+        prefill_rate=prefill_rate,
+        embedding_latency=embedding_latency,
+    )
+    selected = [name for name in BENCHMARKS if not only or name in only]
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "fake_ollama": settings.__dict__,
+        },
+        "results": {},
+    }
+
+    with BenchEnvironment(settings=settings, quick=quick) as env:
+        for name in selected:
+            click.echo(f"Running {name}...", err=True)
+            module = importlib.import_module(BENCHMARKS[name])
+            start = time.perf_counter()
+            report["results"][name] = module.run(env)
+            click.echo(f"  done in {time.perf_counter() - start:.1f}s", err=True)
+
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        Path(output).write_text(text)
+        click.echo(f"Results written to {output}", err=True)
+    else:
+        click.echo(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,22 +5,44 @@ Provides HTTP endpoints for document processing and chat functionality.
 Run with: uvicorn src.api:app --host 0.0.0.0 --port 8080
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, UploadFile, File, Request
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import asyncio
 import tempfile
+import threading
 import shutil
-import json
+import uuid
 
 from src.core.chat_engine import ChatEngine
 from src.core.rag_engine import rag_engine
+from src.core.session_manager import session_manager
 from src.core.summarizer import summarizer
 from src.core.extractor import extractor
 from src.core.document_processor import DocumentProcessor
+from src.core.warmup import readiness, readiness_executor
 from src.vector_store.chroma_store import vector_store
+from src.vector_store.filters import build_where_filter, end_of_day
+from src.vector_store.namespaces import InvalidNamespace, resolve_namespace
+from src.utils.metrics import ACTIVE_SESSIONS, render_metrics
+from src.utils.config import config
+from src.utils.scheduler import SchedulerBusy, scheduler
+from src.utils.streaming import GenerationGuard, coalesce, resolve_limit, sse_event
+from src.utils.tracing import begin_trace, reset_trace, current_trace
+
+
+def generation_limits(max_tokens: Optional[int], timeout: Optional[float]) -> tuple[Optional[int], Optional[float]]:
+    """Resolve (max_tokens, timeout_seconds) for a request; None = unlimited."""
+    max_tokens = resolve_limit(max_tokens, config.generation_max_tokens)
+    return (int(max_tokens) if max_tokens else None), resolve_limit(timeout, config.generation_timeout_seconds)
 
 
 # Pydantic Models for API
@@ -28,6 +50,12 @@ class ChatRequest(BaseModel):
     message: str = Field(..., description="User message")
     session_id: Optional[str] = Field(None, description="Session ID for conversation continuity")
     stream: bool = Field(False, description="Enable streaming response")
+    max_tokens: Optional[int] = Field(None, ge=1, description="Maximum response length in tokens")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Stop a streamed response after this many seconds")
+
+    def limits(self) -> tuple[Optional[int], Optional[float]]:
+        """Requested limits, capped by the configured ones."""
+        return generation_limits(self.max_tokens, self.timeout_seconds)
 
 
 class ChatResponse(BaseModel):
@@ -38,6 +66,29 @@ class ChatResponse(BaseModel):
 class QueryRequest(BaseModel):
     question: str = Field(..., description="Question to ask about documents")
     stream: bool = Field(False, description="Enable streaming response")
+    doc_ids: Optional[List[str]] = Field(None, description="Only search these document IDs")
+    source_files: Optional[List[str]] = Field(None, description="Only search these source file names")
+    file_types: Optional[List[str]] = Field(None, description="Only search these file types (e.g. pdf, .md)")
+    ingested_after: Optional[datetime] = Field(None, description="Only search documents ingested at or after this time")
+    ingested_before: Optional[datetime] = Field(None, description="Only search documents ingested at or before this time (a date includes that whole day)")
+    max_tokens: Optional[int] = Field(None, ge=1, description="Maximum answer length in tokens")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Stop a streamed answer after this many seconds")
+
+    _ingested_before_end_of_day = field_validator("ingested_before", mode="before")(end_of_day)
+
+    def limits(self) -> tuple[Optional[int], Optional[float]]:
+        """Requested limits, capped by the configured ones."""
+        return generation_limits(self.max_tokens, self.timeout_seconds)
+
+    def to_filter(self) -> Optional[Dict[str, Any]]:
+        """Build the vector store filter for the requested scope."""
+        return build_where_filter(
+            doc_ids=self.doc_ids,
+            source_files=self.source_files,
+            file_types=self.file_types,
+            ingested_after=self.ingested_after,
+            ingested_before=self.ingested_before,
+        )
 
 
 class QueryResponse(BaseModel):
@@ -53,12 +104,42 @@ class DocumentInfo(BaseModel):
     doc_id: str
     file_name: str
     chunks: int
+    removed_chunks: int = 0
 
 
 class VectorStoreInfo(BaseModel):
+    namespace: str
     total_chunks: int
     unique_documents: int
     document_files: List[str]
+    documents: List[Dict[str, Any]] = []
+    # Chunks without file_type/ingested_at, which those filters never match
+    unscoped_chunks: int = 0
+
+
+class NamespaceInfo(BaseModel):
+    namespace: str
+    chunks: int
+
+
+def request_namespace(
+    x_namespace: Optional[str] = Header(None, description="Namespace (document collection); default if omitted"),
+) -> str:
+    """The namespace a request works in, from its X-Namespace header."""
+    try:
+        return resolve_namespace(x_namespace)
+    except InvalidNamespace as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm models and indexes in the background; /readyz waits for it."""
+    if config.warmup_on_startup:
+        threading.Thread(target=readiness.warm_up, name="warmup", daemon=True).start()
+    else:
+        readiness.warm.set()
+    yield
 
 
 # Initialize FastAPI app
@@ -66,6 +147,7 @@ app = FastAPI(
     title="DocAI API",
     description="AI-powered document processing and chat API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for web clients
@@ -75,25 +157,143 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "Server-Timing"],
 )
 
-# In-memory session storage (use Redis in production)
-chat_sessions: Dict[str, ChatEngine] = {}
+
+class TraceMiddleware:
+    """Trace each request and report span timings.
+
+    Non-streaming responses get a Server-Timing header; streamed responses
+    report timings in their final SSE event instead, since headers are sent
+    before generation starts.
+
+    Written as plain ASGI rather than with @app.middleware("http"): that
+    wrapper doesn't pass client disconnects on to streaming responses, so
+    an abandoned stream would keep generating.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = begin_trace(
+            f"{scope['method']} {scope['path']}",
+            trace_id=Headers(scope=scope).get("x-trace-id"),
+        )
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timings(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Trace-Id"] = trace.trace_id
+                if not headers.get("content-type", "").startswith("text/event-stream"):
+                    headers["Server-Timing"] = trace.server_timing()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            reset_trace(token)
+            trace.finish()
+
+
+app.add_middleware(TraceMiddleware)
+
+
+async def stream_events(guard: GenerationGuard, **fields):
+    """Stream a guarded generation as SSE events, ending with the done event.
+
+    Chunks are read in a worker thread so generation doesn't block the event
+    loop. When the client disconnects, Starlette cancels this generator and
+    the guard stops the generation upstream. If the model queue gives up
+    before the first chunk, the stream ends with an error event instead.
+    """
+    try:
+        async for chunk in iterate_in_threadpool(coalesce(guard)):
+            yield sse_event({"chunk": chunk, **fields})
+        yield done_event(**fields)
+    except SchedulerBusy as e:
+        yield sse_event({"error": str(e), "retry_after": e.retry_after, **fields})
+    finally:
+        guard.cancel()
+
+
+def done_event(**fields) -> bytes:
+    """Build the final SSE event, including span timings when traced."""
+    trace = current_trace()
+    if trace:
+        fields["trace_id"] = trace.trace_id
+        fields["timings"] = trace.totals()
+    return sse_event({"done": True, **fields})
+
+
+def busy(e: SchedulerBusy) -> HTTPException:
+    """429 with Retry-After for a request the LLM queue can't take."""
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def admit(component: str):
+    """Answer 429 with Retry-After when the LLM queue is over its latency budget."""
+    try:
+        scheduler.admit(component)
+    except SchedulerBusy as e:
+        raise busy(e)
+
+
+# Sessions live in the shared session store (SESSION_BACKEND), so any worker
+# can continue a conversation. Engines are cached per worker and reload their
+# session at the start of a turn when another worker has added messages since;
+# each engine runs one turn at a time.
+MAX_CACHED_ENGINES = 1000
+session_store = session_manager
+chat_sessions: "OrderedDict[str, ChatEngine]" = OrderedDict()
+chat_sessions_lock = threading.Lock()
+ACTIVE_SESSIONS.set_function(lambda: session_store.count_sessions())
 
 
 # Helper functions
 def get_or_create_session(session_id: Optional[str] = None) -> tuple[str, ChatEngine]:
     """Get existing session or create new one."""
-    if session_id and session_id in chat_sessions:
-        return session_id, chat_sessions[session_id]
-
-    engine = ChatEngine()
+    if session_id and session_store.get_message_count(session_id) is not None:
+        with chat_sessions_lock:
+            engine = chat_sessions.get(session_id)
+            if engine is not None:
+                chat_sessions.move_to_end(session_id)
+                return session_id, engine
+        # Not cached on this worker; load outside the lock
+        session = session_store.load_session(session_id)
+        if session is not None:
+            engine = ChatEngine(store=session_store)
+            engine.open_session(session)
+            return session_id, _cache_engine(session_id, engine)
+
+    engine = ChatEngine(store=session_store)
     session = engine.create_session()
-    chat_sessions[session.session_id] = engine
-    return session.session_id, engine
+    return session.session_id, _cache_engine(session.session_id, engine)
+
+
+def _cache_engine(session_id: str, engine: ChatEngine) -> ChatEngine:
+    """Cache an engine, or return the one a concurrent request cached first."""
+    with chat_sessions_lock:
+        engine = chat_sessions.setdefault(session_id, engine)
+        chat_sessions.move_to_end(session_id)
+        while len(chat_sessions) > MAX_CACHED_ENGINES:
+            chat_sessions.popitem(last=False)
+    return engine
 
 
 # API Endpoints
+#
+# Endpoints that call models or the vector store are plain `def`, so FastAPI
+# runs them in its threadpool: scheduler slots and ChromaDB calls block, and
+# must never block the event loop, which streams and probes depend on.
 
 @app.get("/")
 async def root():
@@ -108,13 +308,33 @@ async def root():
             "documents": "/documents",
             "summarize": "/summarize/{file_name}",
             "extract": "/extract/{file_name}",
+            "namespaces": "/namespaces",
+            "metrics": "/metrics",
         }
     }
 
 
+@app.get("/livez")
+async def liveness():
+    """Liveness probe: the process is serving. Checks nothing else."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readiness_probe():
+    """Readiness probe: warmup finished and dependencies answer (cached checks).
+
+    Returns 503 until the instance should receive traffic.
+    """
+    ready, details = await asyncio.get_running_loop().run_in_executor(readiness_executor, readiness.check)
+    if not ready:
+        return JSONResponse(status_code=503, content={"status": "not ready", **details})
+    return {"status": "ready", **details}
+
+
 @app.get("/health")
-async def health_check():
-    """Health check endpoint."""
+def health_check():
+    """Health check with document counts (reads all metadata; probes should use /readyz)."""
     try:
         # Test vector store connection
         info = vector_store.get_document_info()
@@ -127,67 +347,102 @@ async def health_check():
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+def chat(request: ChatRequest):
     """
     Chat with AI without document context.
 
     - **message**: User message
     - **session_id**: Optional session ID for conversation continuity
     - **stream**: Enable streaming (returns text/event-stream)
+
+    Returns 429 with Retry-After when the model queue is too long.
     """
+    admit("chat")
     try:
         session_id, engine = get_or_create_session(request.session_id)
+        max_tokens, timeout = request.limits()
 
         if request.stream:
-            async def generate():
-                response_text = ""
-                for chunk in engine.chat(request.message, stream=True):
-                    response_text += chunk
-                    yield f"data: {json.dumps({'chunk': chunk, 'session_id': session_id})}\n\n"
-                yield f"data: {json.dumps({'done': True, 'session_id': session_id})}\n\n"
-
-            return StreamingResponse(generate(), media_type="text/event-stream")
+            guard = GenerationGuard(
+                engine.chat(request.message, stream=True, max_tokens=max_tokens),
+                "chat",
+                timeout=timeout,
+            )
+            return StreamingResponse(
+                stream_events(guard, session_id=session_id),
+                media_type="text/event-stream",
+            )
         else:
-            response = engine.chat(request.message, stream=False)
+            response = engine.chat(request.message, stream=False, max_tokens=max_tokens)
             return ChatResponse(response=response, session_id=session_id)
 
+    except SchedulerBusy as e:
+        raise busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/query", response_model=QueryResponse)
-async def query_documents(request: QueryRequest):
+def query_documents(
+    request: QueryRequest,
+    http_request: Request,
+    namespace: str = Depends(request_namespace),
+):
     """
     Query indexed documents using RAG.
 
     - **question**: Question to ask about your documents
     - **stream**: Enable streaming response
+    - **doc_ids** / **source_files** / **file_types**: Optional scope filters
+    - **ingested_after** / **ingested_before**: Optional ingest date range
+    - **X-Namespace** header: Only search this namespace
+
+    Returns 429 with Retry-After when the model queue is too long.
     """
+    admit("rag")
     try:
         # Check if documents are indexed
-        info = vector_store.get_document_info()
-        if info["total_chunks"] == 0:
+        if vector_store.count(namespace) == 0:
             raise HTTPException(
                 status_code=400,
-                detail="No documents indexed. Upload documents first using POST /documents"
+                detail=f"No documents indexed in namespace '{namespace}'. Upload documents first using POST /documents"
             )
 
-        if request.stream:
-            async def generate():
-                for chunk in rag_engine.query(request.question, stream=True):
-                    yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-                yield f"data: {json.dumps({'done': True})}\n\n"
+        filter_dict = request.to_filter()
+        max_tokens, timeout = request.limits()
+        retrieved: List[Dict[str, Any]] = []
+        guard = GenerationGuard(
+            rag_engine.query(
+                request.question,
+                stream=True,
+                filter_dict=filter_dict,
+                max_tokens=max_tokens,
+                # Clients take turns for the model
+                flow=http_request.client.host if http_request.client else None,
+                namespace=namespace,
+                retrieved=retrieved,
+            ),
+            "rag",
+            timeout=timeout,
+        )
 
-            return StreamingResponse(generate(), media_type="text/event-stream")
+        if request.stream:
+            return StreamingResponse(stream_events(guard), media_type="text/event-stream")
         else:
             # For non-streaming, we need to consume the generator
             answer = ""
-            for chunk in rag_engine.query(request.question, stream=True):
+            for chunk in guard:
                 answer += chunk
 
-            # Get source information
-            retrieved = vector_store.query(request.question, top_k=5)
+            # Sources are the chunks the answer was generated from
             sources = [
                 {
                     "file": r["metadata"].get("source_file", "unknown"),
@@ -200,62 +455,109 @@ async def query_documents(request: QueryRequest):
 
     except HTTPException:
         raise
+    except SchedulerBusy as e:
+        raise busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def index_upload(file: UploadFile, doc_id: str, namespace: str) -> DocumentInfo:
+    """Index an uploaded file under doc_id, replacing any previous version."""
+    # Keep the original file name so sources show it instead of a temp name
+    file_name = Path(file.filename).name
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir) / file_name
+        with open(tmp_path, "wb") as tmp:
+            shutil.copyfileobj(file.file, tmp)
+
+        # Process document
+        document = DocumentProcessor.load_document(str(tmp_path), doc_id=doc_id)
+
+    # Add to vector store (upsert: a replacement overwrites the old chunks)
+    removed = vector_store.upsert_document(document, namespace)
+
+    return DocumentInfo(
+        doc_id=document.doc_id,
+        file_name=file_name,
+        chunks=len(document.chunks),
+        removed_chunks=removed,
+    )
+
+
 @app.post("/documents", response_model=DocumentInfo)
-async def upload_document(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
-):
+def upload_document(file: UploadFile = File(...), namespace: str = Depends(request_namespace)):
     """
     Upload and index a document.
 
-    Supported formats: PDF, TXT, MD, DOCX
+    Supported formats: PDF, TXT, MD, DOCX. Every upload gets a new document
+    ID, even for a file name already indexed; use PUT /documents/{doc_id} to
+    replace a document. The X-Namespace header picks the namespace it is
+    indexed in.
     """
     try:
-        # Save uploaded file to temp location
-        suffix = Path(file.filename).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-
-        # Process document
-        document = DocumentProcessor.load_document(tmp_path)
-
-        # Add to vector store
-        vector_store.add_document(document)
+        return index_upload(file, str(uuid.uuid4()), namespace)
+    except SchedulerBusy as e:
+        raise busy(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process document: {str(e)}")
 
-        # Clean up temp file in background
-        background_tasks.add_task(lambda: Path(tmp_path).unlink(missing_ok=True))
 
-        return DocumentInfo(
-            doc_id=document.doc_id,
-            file_name=file.filename,
-            chunks=len(document.chunks)
-        )
+@app.put("/documents/{doc_id}", response_model=DocumentInfo)
+def replace_document(doc_id: str, file: UploadFile = File(...), namespace: str = Depends(request_namespace)):
+    """
+    Replace an indexed document with a new file.
 
+    The new chunks are upserted before surplus old chunks are removed, so
+    the document stays searchable throughout. Only this document is
+    re-embedded.
+    """
+    if not vector_store.get_chunk_ids(doc_id, namespace):
+        raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        return index_upload(file, doc_id, namespace)
+    except SchedulerBusy as e:
+        raise busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process document: {str(e)}")
 
 
 @app.get("/documents", response_model=VectorStoreInfo)
-async def list_documents():
-    """List all indexed documents."""
+def list_documents(namespace: str = Depends(request_namespace)):
+    """List all documents indexed in a namespace."""
     try:
-        info = vector_store.get_document_info()
-        return VectorStoreInfo(**info)
+        info = vector_store.get_document_info(namespace)
+        return VectorStoreInfo(namespace=namespace, **info)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.delete("/documents/{doc_id}")
+def delete_document(doc_id: str, namespace: str = Depends(request_namespace)):
+    """Delete one indexed document."""
+    try:
+        deleted = vector_store.delete_document(doc_id, namespace)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"message": f"Document {doc_id} deleted", "chunks": deleted}
+
+
 @app.delete("/documents")
-async def clear_documents():
-    """Clear all indexed documents."""
+def clear_documents(namespace: str = Depends(request_namespace)):
+    """Clear all documents in a namespace."""
+    try:
+        vector_store.clear_all(namespace)
+        return {"message": f"All documents in namespace '{namespace}' cleared successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/namespaces", response_model=List[NamespaceInfo])
+def list_namespaces():
+    """List namespaces with the number of chunks indexed in each."""
     try:
-        vector_store.clear_all()
-        return {"message": "All documents cleared successfully"}
+        return [NamespaceInfo(**stats) for stats in vector_store.namespace_stats()]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -301,10 +603,12 @@ async def extract_entities(file_name: str):
 
 
 @app.delete("/sessions/{session_id}")
-async def delete_session(session_id: str):
+def delete_session(session_id: str):
     """Delete a chat session."""
-    if session_id in chat_sessions:
-        del chat_sessions[session_id]
+    with chat_sessions_lock:
+        chat_sessions.pop(session_id, None)
+    if session_store.get_message_count(session_id) is not None:
+        session_store.delete_session(session_id)
         return {"message": f"Session {session_id} deleted"}
     raise HTTPException(status_code=404, detail="Session not found")
 
@@ -1,19 +1,56 @@
 import click
+from datetime import datetime
 from pathlib import Path
 from src.core.chat_engine import ChatEngine
 from src.core.rag_engine import rag_engine
 from src.core.summarizer import summarizer
 from src.core.extractor import extractor
 from src.core.document_processor import DocumentProcessor
+from src.core.index_sync import IndexSync
 from src.vector_store.chroma_store import vector_store
+from src.vector_store.filters import build_where_filter, end_of_day
+from src.vector_store.namespaces import InvalidNamespace, resolve_namespace
+from src.vector_store.service import VectorStoreServer
 from src.cli import formatters as fmt
 from src.cli.prompts import get_user_input, confirm
+from src.utils.config import config
+from src.utils.tracing import start_trace, current_trace
+
+
+def validate_namespace(ctx, param, value):
+    try:
+        return resolve_namespace(value)
+    except InvalidNamespace as e:
+        raise click.BadParameter(str(e))
+
+
+class UntilDateTime(click.DateTime):
+    """click.DateTime where a date-only value means the end of that day."""
+
+    def convert(self, value, param, ctx):
+        bound = end_of_day(value)
+        if isinstance(bound, datetime):
+            return bound
+        return super().convert(value, param, ctx)
+
+
+def current_namespace() -> str:
+    """Namespace selected with the group's --namespace option."""
+    return click.get_current_context().find_root().params["namespace"]
 
 
 @click.group()
-def cli():
+@click.option(
+    "--namespace", "--collection", "-n", "namespace",
+    envvar="DOCAI_NAMESPACE",
+    callback=validate_namespace,
+    help="Document namespace to work in (default: the default namespace)",
+)
+@click.pass_context
+def cli(ctx, namespace):
     """DocAI - AI-powered document processing and chat CLI."""
-    pass
+    # Trace the whole command; spans are recorded by the core components
+    ctx.with_resource(start_trace(f"cli {ctx.invoked_subcommand}"))
 
 
 @cli.command()
@@ -58,8 +95,8 @@ def add(file_path):
             # Load and process document
             document = DocumentProcessor.load_document(file_path)
 
-            # Add to vector store
-            vector_store.add_document(document)
+            # Add to vector store (re-adding a file replaces its chunks)
+            vector_store.upsert_document(document, current_namespace())
 
         fmt.print_success(f"Added '{Path(file_path).name}' to the knowledge base.")
         fmt.print_info(f"Document ID: {document.doc_id}")
@@ -69,22 +106,120 @@ def add(file_path):
         fmt.print_error(f"Failed to add document: {e}")
 
 
+@cli.command()
+@click.argument("doc_id")
+@click.argument("file_path", type=click.Path(exists=True))
+def replace(doc_id, file_path):
+    """Replace indexed document DOC_ID with FILE_PATH."""
+    try:
+        if not vector_store.get_chunk_ids(doc_id, current_namespace()):
+            fmt.print_error(f"Document not found: {doc_id}")
+            return
+
+        with fmt.create_progress() as progress:
+            progress.add_task("Processing document...", total=None)
+            document = DocumentProcessor.load_document(file_path, doc_id=doc_id)
+            removed = vector_store.upsert_document(document, current_namespace())
+
+        fmt.print_success(f"Replaced document {doc_id} with '{Path(file_path).name}'.")
+        fmt.print_info(f"Chunks indexed: {len(document.chunks)} ({removed} surplus chunks removed)")
+
+    except Exception as e:
+        fmt.print_error(f"Failed to replace document: {e}")
+
+
+@cli.command()
+@click.argument("doc_id")
+def remove(doc_id):
+    """Remove one document (by ID, see `list`) from the vector store."""
+    try:
+        deleted = vector_store.delete_document(doc_id, current_namespace())
+        if deleted:
+            fmt.print_success(f"Removed document {doc_id} ({deleted} chunks).")
+        else:
+            fmt.print_error(f"Document not found: {doc_id}")
+    except Exception as e:
+        fmt.print_error(f"Failed to remove document: {e}")
+
+
+@cli.command()
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--no-recursive", is_flag=True, help="Don't descend into subdirectories")
+def sync(directory, no_recursive):
+    """Index new and changed files in DIRECTORY and drop removed ones."""
+    try:
+        with fmt.create_progress() as progress:
+            progress.add_task("Syncing documents...", total=None)
+            result = IndexSync(directory, recursive=not no_recursive, namespace=current_namespace()).sync()
+        fmt.print_sync_result(result)
+    except Exception as e:
+        fmt.print_error(f"Failed to sync documents: {e}")
+
+
+@cli.command()
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--debounce", type=float, help="Seconds without changes before syncing (default: WATCH_DEBOUNCE_SECONDS)")
+@click.option("--no-recursive", is_flag=True, help="Don't descend into subdirectories")
+def watch(directory, debounce, no_recursive):
+    """Keep the index in sync with DIRECTORY as files change."""
+    fmt.print_info(f"Watching {Path(directory).resolve()} (Ctrl+C to stop)")
+
+    def on_sync(result):
+        if result.changed or result.failed:
+            fmt.print_sync_result(result)
+
+    sync = IndexSync(directory, recursive=not no_recursive, namespace=current_namespace())
+    sync.watch(debounce=debounce, on_sync=on_sync)
+
+
 @cli.command()
 @click.argument("question")
-def query(question):
+@click.option("--doc-id", "doc_ids", multiple=True, help="Only search this document ID (repeatable)")
+@click.option("--source", "source_files", multiple=True, help="Only search this source file name (repeatable)")
+@click.option("--file-type", "file_types", multiple=True, help="Only search this file type, e.g. pdf (repeatable)")
+@click.option("--since", type=click.DateTime(), default=None, help="Only search documents ingested on or after this date")
+@click.option("--until", type=UntilDateTime(), default=None, help="Only search documents ingested at or before this date (inclusive) or time")
+@click.option("--profile", is_flag=True, help="Print a timing breakdown after the answer")
+def query(question, doc_ids, source_files, file_types, since, until, profile):
     """Query the knowledge base using RAG."""
     try:
         # Check if any documents are indexed
-        info = vector_store.get_document_info()
+        namespace = current_namespace()
+        info = vector_store.get_document_info(namespace)
         if info["total_chunks"] == 0:
             fmt.print_warning("No documents indexed. Use 'docai add <file>' first.")
             return
 
+        filter_dict = build_where_filter(
+            doc_ids=doc_ids,
+            source_files=source_files,
+            file_types=file_types,
+            ingested_after=since,
+            ingested_before=until,
+        )
+
         fmt.print_header("RAG Query")
-        fmt.print_info(f"Searching across {info['unique_documents']} document(s)...\n")
+        if info["unscoped_chunks"] and (file_types or since or until):
+            fmt.print_warning(
+                f"{info['unscoped_chunks']} chunk(s) were indexed without file type/date metadata and "
+                "never match --file-type/--since/--until; re-add those documents to include them."
+            )
+        if filter_dict:
+            fmt.print_info("Searching within the requested scope...\n")
+        else:
+            fmt.print_info(f"Searching across {info['unique_documents']} document(s)...\n")
 
         # Stream response
-        fmt.stream_chat_response(rag_engine.query(question, stream=True))
+        fmt.stream_chat_response(
+            rag_engine.query(question, stream=True, filter_dict=filter_dict, namespace=namespace)
+        )
+
+        if profile:
+            trace = current_trace()
+            if trace:
+                fmt.print_trace(trace.to_dict())
+            else:
+                fmt.print_warning("Tracing is disabled (TRACING_ENABLED=false); no profile available.")
 
     except Exception as e:
         fmt.print_error(f"Query failed: {e}")
@@ -125,14 +260,19 @@ def extract(file_path):
 def list():
     """List all indexed documents."""
     try:
-        info = vector_store.get_document_info()
+        info = vector_store.get_document_info(current_namespace())
 
         fmt.print_header("Indexed Documents")
         fmt.print_info(f"Total documents: {info['unique_documents']}")
         fmt.print_info(f"Total chunks: {info['total_chunks']}\n")
-
-        if info["document_files"]:
-            fmt.print_document_list(info["document_files"])
+        if info["unscoped_chunks"]:
+            fmt.print_warning(
+                f"{info['unscoped_chunks']} chunk(s) have no file type/date metadata; "
+                "re-add their documents to make them match --file-type/--since/--until.\n"
+            )
+
+        if info["documents"]:
+            fmt.print_document_list(info["documents"])
         else:
             fmt.print_warning("No documents indexed yet.")
 
@@ -140,12 +280,23 @@ def list():
         fmt.print_error(f"Failed to list documents: {e}")
 
 
+@cli.command()
+def namespaces():
+    """List namespaces and their number of chunks."""
+    try:
+        fmt.print_header("Namespaces")
+        for stats in vector_store.namespace_stats():
+            fmt.print_info(f"{stats['namespace']}: {stats['chunks']} chunks")
+    except Exception as e:
+        fmt.print_error(f"Failed to list namespaces: {e}")
+
+
 @cli.command()
 def clear():
     """Clear all documents from the vector store."""
     if confirm("Are you sure you want to clear all indexed documents?"):
         try:
-            vector_store.clear_all()
+            vector_store.clear_all(current_namespace())
             fmt.print_success("All documents cleared from the knowledge base.")
         except Exception as e:
             fmt.print_error(f"Failed to clear documents: {e}")
@@ -153,5 +304,18 @@ def clear():
         fmt.print_info("Operation cancelled.")
 
 
+@cli.command("index-server")
+@click.option("--socket", "socket_path", type=click.Path(), help="Unix socket path (default: VECTOR_STORE_SOCKET)")
+def index_server(socket_path):
+    """Run the shared vector store service for API workers."""
+    socket_path = socket_path or config.vector_store_socket or "./data/vector_store.sock"
+    server = VectorStoreServer(Path(socket_path))
+    fmt.print_success(f"Vector store service listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
 if __name__ == "__main__":
     cli()
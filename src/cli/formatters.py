@@ -4,6 +4,7 @@ from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from typing import List, Dict, Any
+from src.utils.streaming import coalesce
 
 console = Console()
 
@@ -33,7 +34,7 @@ def print_header(title: str):
     console.print(f"\n[bold cyan]{title}[/bold cyan]\n")
 
 
-def print_document_list(documents: List[str]):
+def print_document_list(documents: List[Dict[str, Any]]):
     """Print a list of indexed documents."""
     if not documents:
         print_info("No documents indexed yet.")
@@ -41,9 +42,11 @@ def print_document_list(documents: List[str]):
 
     table = Table(title="Indexed Documents")
     table.add_column("Filename", style="cyan")
+    table.add_column("Document ID")
+    table.add_column("Chunks", justify="right")
 
     for doc in documents:
-        table.add_row(doc)
+        table.add_row(doc["source_file"] or "", doc["doc_id"], str(doc["chunks"]))
 
     console.print(table)
 
@@ -86,13 +89,45 @@ def print_chat_message(role: str, content: str):
 
 
 def stream_chat_response(chunks):
-    """Stream chat response chunks."""
+    """Stream chat response chunks.
+
+    Chunks are coalesced per flush window and written straight to the
+    terminal, skipping rich's markup parsing and flushing once per window
+    instead of once per token.
+    """
     console.print("\n[bold green]Assistant:[/bold green] ", end="")
-    for chunk in chunks:
-        console.print(chunk, end="")
+    out = console.file
+    for text in coalesce(chunks):
+        out.write(text)
+        out.flush()
     console.print()  # New line after streaming
 
 
+def print_trace(trace: Dict[str, Any]):
+    """Print a span timing breakdown for a trace."""
+    table = Table(title=f"Profile (trace {trace['trace_id'][:8]})")
+    table.add_column("Span", style="cyan")
+    table.add_column("Start (ms)", justify="right")
+    table.add_column("Duration (ms)", justify="right")
+
+    for span in sorted(trace["spans"], key=lambda s: s["start_ms"]):
+        table.add_row(span["name"], f"{span['start_ms']:.1f}", f"{span['duration_ms']:.1f}")
+    table.add_row("[bold]total[/bold]", "", f"[bold]{trace['total_ms']:.1f}[/bold]")
+
+    console.print()
+    console.print(table)
+
+
+def print_sync_result(result):
+    """Print the outcome of a directory sync."""
+    print_success(
+        f"Synced in {result.seconds:.2f}s: {result.added} added, {result.updated} updated, "
+        f"{result.removed} removed, {result.unchanged} unchanged ({result.chunks_added} chunks indexed)"
+    )
+    for path, error in result.failed.items():
+        print_error(f"{path}: {error}")
+
+
 def create_progress():
     """Create a progress indicator."""
     return Progress(
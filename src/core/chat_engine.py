@@ -1,28 +1,83 @@
-from typing import Generator, List, Optional
+from typing import Dict, Generator, List, Optional, Union
 from langchain_community.llms import Ollama
+from src.core.history_manager import HistoryManager
+from src.core.ollama_chat import OllamaChatClient
+from src.core.session_store import BaseSessionStore
 from src.models.chat import ChatSession, ChatMessage
 from src.utils.config import config
+from src.utils.metrics import observe_llm_stream, observe_llm_call, LLM_PROMPT_TOKENS
+from src.utils.scheduler import scheduler
+import threading
 import uuid
 
 
 class ChatEngine:
     """Engine for general chat without document context."""
 
-    def __init__(self):
+    def __init__(self, store: Optional[BaseSessionStore] = None):
         self.llm = Ollama(
             base_url=config.ollama_base_url,
             model=config.ollama_chat_model,
+            timeout=int(config.generation_timeout_seconds) or None,
         )
+        self.chat_client = OllamaChatClient() if config.chat_api == "chat" else None
+        self.history = HistoryManager(self.llm)
+        self.store = store
         self.current_session: Optional[ChatSession] = None
+        # One turn at a time per session. A plain Lock rather than an RLock:
+        # a streamed turn may be resumed, and so released, on another thread.
+        self._turn_lock = threading.Lock()
 
     def create_session(self) -> ChatSession:
         """Create a new chat session."""
         session_id = str(uuid.uuid4())
         self.current_session = ChatSession(session_id=session_id)
+        self.history.reset()
         return self.current_session
 
-    def chat(self, message: str, stream: bool = True) -> str:
-        """Send a message and get a response."""
+    def open_session(self, session: ChatSession):
+        """Continue an existing (e.g. stored) session."""
+        self.current_session = session
+        self.history.reset()
+
+    def _persist(self):
+        """Save the current session to the store, if one is attached."""
+        if self.store and self.current_session:
+            self.store.save_session(self.current_session)
+
+    def chat(
+        self,
+        message: str,
+        stream: bool = True,
+        max_tokens: Optional[int] = None,
+    ) -> Union[str, Generator[str, None, None]]:
+        """Send a message and get a response.
+
+        Returns a generator of response chunks when streaming, otherwise
+        the full response string. `max_tokens` caps the response length
+        (default: GENERATION_MAX_TOKENS).
+        """
+        max_tokens = max_tokens or config.generation_max_tokens or None
+        if stream:
+            return self._stream_response(message, max_tokens)
+
+        with self._turn_lock:
+            prompt, prompt_tokens = self._begin_turn(message)
+            session_id = self.current_session.session_id
+            with scheduler.slot("chat", flow=session_id), observe_llm_call("chat"):
+                if self.chat_client:
+                    response = self.chat_client.invoke(prompt, session_id, max_tokens)
+                elif max_tokens:
+                    response = self.llm.invoke(prompt, num_predict=max_tokens)
+                else:
+                    response = self.llm.invoke(prompt)
+            self.current_session.add_message("assistant", response, prompt_tokens=prompt_tokens)
+            self._persist()
+        return response
+
+    def _begin_turn(self, message: str):
+        """Add the user message and build the prompt. Call with the turn lock held."""
+        self._refresh()
         if not self.current_session:
             self.create_session()
 
@@ -30,42 +85,75 @@ class ChatEngine:
         self.current_session.add_message("user", message)
 
         # Build prompt with conversation history
-        prompt = self._build_prompt()
-
-        # Get response
-        if stream:
-            response = ""
-            for chunk in self.llm.stream(prompt):
-                response += chunk
-                yield chunk
-            self.current_session.add_message("assistant", response)
+        if self.chat_client:
+            prompt = self.history.build_messages(self.current_session, config.chat_system_prompt)
         else:
-            response = self.llm.invoke(prompt)
-            self.current_session.add_message("assistant", response)
-            return response
+            prompt = self._build_prompt()
+        prompt_tokens = self.history.last_prompt_tokens
+        LLM_PROMPT_TOKENS.labels(component="chat").observe(prompt_tokens)
+        return prompt, prompt_tokens
 
-    def _build_prompt(self) -> str:
-        """Build prompt from conversation history."""
-        if not self.current_session or not self.current_session.messages:
-            return ""
+    def _refresh(self):
+        """Reload the session if another worker has continued it since."""
+        if not (self.store and self.current_session):
+            return
+        session_id = self.current_session.session_id
+        stored_count = self.store.get_message_count(session_id)
+        if stored_count is not None and stored_count != len(self.current_session.messages):
+            session = self.store.load_session(session_id)
+            if session is not None:
+                self.open_session(session)
 
-        # Get recent history
-        recent_messages = self.current_session.get_history(
-            max_messages=config.max_session_history
-        )
+    def _stream_response(
+        self, message: str, max_tokens: Optional[int] = None
+    ) -> Generator[str, None, None]:
+        """Stream a response and record it in the session once complete.
 
-        # Format messages
-        prompt_parts = []
-        for msg in recent_messages:
-            role_label = "User" if msg.role == "user" else "Assistant"
-            prompt_parts.append(f"{role_label}: {msg.content}")
+        The turn starts on the first `next()`, so a stream that is never
+        consumed leaves the session untouched. Closing the generator early
+        (e.g. the client disconnected) aborts the upstream request and keeps
+        the partial answer in the session.
+        """
+        with self._turn_lock:
+            yield from self._stream_turn(message, max_tokens)
+
+    def _stream_turn(
+        self, message: str, max_tokens: Optional[int]
+    ) -> Generator[str, None, None]:
+        prompt, prompt_tokens = self._begin_turn(message)
+        session_id = self.current_session.session_id
+        if self.chat_client:
+            upstream = self.chat_client.stream(prompt, session_id, max_tokens)
+        else:
+            # Streamed through OllamaChatClient so a GenerationGuard can abort it
+            upstream = OllamaChatClient().generate_stream(prompt, session_id, max_tokens)
 
-        return "\n\n".join(prompt_parts)
+        # Sessions take turns for the model's slots
+        stream = scheduler.stream(observe_llm_stream(upstream, "chat"), "chat", flow=session_id)
+        response = ""
+        try:
+            for chunk in stream:
+                response += chunk
+                yield chunk
+        except GeneratorExit:
+            stream.close()
+            if response:
+                self.current_session.add_message("assistant", response, prompt_tokens=prompt_tokens)
+                self._persist()
+            raise
+        self.current_session.add_message("assistant", response, prompt_tokens=prompt_tokens)
+        self._persist()
+
+    def _build_prompt(self) -> str:
+        """Build a token-budgeted prompt from conversation history."""
+        return self.history.build_prompt(self.current_session)
 
     def clear_history(self):
         """Clear conversation history."""
         if self.current_session:
             self.current_session.clear_history()
+            self.history.reset()
+            self._persist()
 
     def get_session(self) -> Optional[ChatSession]:
         """Get current chat session."""
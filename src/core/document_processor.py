@@ -1,13 +1,15 @@
 from pathlib import Path
 from typing import Optional
-import hashlib
 from src.loaders.base_loader import BaseLoader
 from src.loaders.pdf_loader import PDFLoader
 from src.loaders.text_loader import TextLoader
 from src.loaders.docx_loader import DOCXLoader
-from src.models.document import Document, DocumentChunk
-from src.utils.chunking import chunk_text
+from src.models.document import Document, DocumentChunks
+from src.utils.chunking import chunk_sections, chunk_spans
+from src.utils.config import config
 from src.utils.validators import validate_document
+from src.utils.metrics import observe, LOADER_PARSE_SECONDS, CHUNKING_SECONDS, CHUNKS_CREATED
+from src.utils.tracing import span
 
 
 class DocumentProcessor:
@@ -20,6 +22,10 @@ class DocumentProcessor:
         ".docx": DOCXLoader,
     }
 
+    # File types chunked along their headings (DOCX heading styles are
+    # extracted as Markdown headings)
+    STRUCTURED_TYPES = {".md", ".docx"}
+
     @classmethod
     def get_loader(cls, file_path: Path) -> BaseLoader:
         """Get the appropriate loader for a file type."""
@@ -32,26 +38,30 @@ class DocumentProcessor:
         return loader_class(file_path)
 
     @classmethod
-    def load_document(cls, file_path: str) -> Document:
-        """Load a document from a file path."""
+    def load_document(cls, file_path: str, doc_id: Optional[str] = None) -> Document:
+        """Load a document from a file path.
+
+        `doc_id` overrides the id derived from the path, e.g. to replace a
+        stored document with a file loaded from somewhere else.
+        """
         path = validate_document(file_path)
         loader = cls.get_loader(path)
-        document = loader.load()
-
-        # Create chunks
-        chunks = chunk_text(document.content)
-        document.chunks = []
-
-        for i, chunk_text_content in enumerate(chunks):
-            chunk_id = hashlib.md5(f"{document.doc_id}_{i}".encode()).hexdigest()
-            chunk = DocumentChunk(
-                chunk_id=chunk_id,
-                text=chunk_text_content,
-                chunk_index=i,
-                source_file=document.metadata.filename,
-                metadata={"total_chunks": len(chunks)},
-            )
-            document.chunks.append(chunk)
+        with span("parse"), observe(LOADER_PARSE_SECONDS, file_type=path.suffix.lower()):
+            document = loader.load()
+        if doc_id:
+            document.doc_id = doc_id
+
+        # Create chunks (offsets into the content, not copies of it)
+        heading_paths = None
+        with span("chunking"), observe(CHUNKING_SECONDS):
+            if config.structured_chunking and path.suffix.lower() in cls.STRUCTURED_TYPES:
+                spans, heading_paths = chunk_sections(document.content)
+            else:
+                spans = chunk_spans(document.content)
+        CHUNKS_CREATED.inc(len(spans))
+        document.chunks = DocumentChunks(
+            document.content, document.doc_id, document.metadata.filename, spans, heading_paths
+        )
 
         return document
 
@@ -60,4 +70,5 @@ class DocumentProcessor:
         """Extract text from a document without full processing."""
         path = validate_document(file_path)
         loader = cls.get_loader(path)
-        return loader.extract_text()
+        with span("parse"), observe(LOADER_PARSE_SECONDS, file_type=path.suffix.lower()):
+            return loader.extract_text()
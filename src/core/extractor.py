@@ -4,6 +4,8 @@ from langchain_community.llms import Ollama
 from src.core.document_processor import DocumentProcessor
 from src.models.extraction import ExtractionResult, Entity, Keyword
 from src.utils.config import config
+from src.utils.metrics import observe_llm_call
+from src.utils.scheduler import scheduler
 
 
 class Extractor:
@@ -15,6 +17,11 @@ class Extractor:
             model=config.ollama_chat_model,
         )
 
+    def _invoke(self, prompt: str) -> str:
+        """Invoke the LLM (as a batch job) and record generation metrics."""
+        with scheduler.slot("extractor"), observe_llm_call("extractor"):
+            return self.llm.invoke(prompt)
+
     def extract_from_file(self, file_path: str) -> ExtractionResult:
         """Extract information from a document file."""
         text = DocumentProcessor.extract_text(file_path)
@@ -55,7 +62,7 @@ Text:
 
 Entities (JSON):"""
 
-        response = self.llm.invoke(prompt)
+        response = self._invoke(prompt)
 
         # Parse JSON response
         try:
@@ -83,7 +90,7 @@ Text:
 
 Keywords (JSON):"""
 
-        response = self.llm.invoke(prompt)
+        response = self._invoke(prompt)
 
         # Parse JSON response
         try:
@@ -108,7 +115,7 @@ Text:
 
 Key points:"""
 
-        response = self.llm.invoke(prompt)
+        response = self._invoke(prompt)
 
         # Split response into lines and clean
         points = []
@@ -0,0 +1,241 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.models.chat import ChatSession, ChatMessage
+from src.utils.config import config
+from src.utils.metrics import observe_llm_call
+from src.utils.scheduler import scheduler
+from src.utils.tokens import estimate_tokens
+
+# Shared worker for background summaries; one at a time keeps them off the
+# critical path without competing with interactive generations
+_summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+
+# When the window overflows, trim it to this fraction of the limits so the
+# prompt prefix then stays unchanged for several turns
+LOW_WATERMARK = 0.75
+
+# Session metadata key holding the rolling summary, so it is persisted with
+# the session and survives reloads on any worker
+SUMMARY_KEY = "history_summary"
+
+
+class HistoryManager:
+    """Build token-budgeted chat prompts from a session's history.
+
+    Recent messages are kept verbatim as long as they fit in the token
+    budget. Older messages are folded into a rolling summary generated in
+    the background and stored in the session's metadata, so the prompt size
+    (and prefill time) stays bounded however long the conversation gets,
+    also after the session is reloaded. Messages the summary doesn't cover
+    yet stay in the prompt as far as the budget allows.
+
+    The window start only moves when the budget overflows. Rendered
+    messages are cached between turns; build_prompt also caches the flat
+    prompt prefix and extends it incrementally.
+    """
+
+    def __init__(self, llm, token_budget: Optional[int] = None, summarize: Optional[bool] = None):
+        self.llm = llm
+        self.token_budget = token_budget or config.history_token_budget
+        self.summarize = config.history_summary_enabled if summarize is None else summarize
+        self._lock = threading.RLock()
+        self._generation = 0
+        self.reset()
+
+    def reset(self):
+        """Forget cached renders and the rolling summary."""
+        with self._lock:
+            self._rendered: List[str] = []
+            self._tokens: List[int] = []
+            self._chat_messages: List[Dict[str, str]] = []
+            self._first_message: Optional[ChatMessage] = None
+            self._summary = ""
+            self._summary_upto = 0
+            self._summary_pending = False
+            # Invalidates summaries still running for the previous history
+            self._generation += 1
+            self._start = 0
+            self._prefix_end = 0
+            self._prefix = ""
+        self.last_prompt_tokens = 0
+
+    @staticmethod
+    def _render(message: ChatMessage) -> str:
+        role_label = "User" if message.role == "user" else "Assistant"
+        return f"{role_label}: {message.content}"
+
+    def _sync(self, session: ChatSession):
+        """Render messages added since the last call."""
+        messages = session.messages
+        first = messages[0] if messages else None
+        if len(messages) < len(self._rendered) or first is not self._first_message:
+            # New, reloaded, cleared or replaced history
+            self.reset()
+            self._first_message = first
+            self._load_summary(session)
+
+        for message in messages[len(self._rendered):]:
+            rendered = self._render(message)
+            self._rendered.append(rendered)
+            self._tokens.append(estimate_tokens(rendered))
+            self._chat_messages.append({"role": message.role, "content": message.content})
+
+    def _load_summary(self, session: ChatSession):
+        """Restore the summary stored with the session, if it still matches its messages."""
+        stored = session.metadata.get(SUMMARY_KEY)
+        if not stored:
+            return
+        upto = stored.get("upto", 0)
+        messages = session.messages
+        if 0 < upto <= len(messages) and messages[upto - 1].timestamp.isoformat() == stored.get("last"):
+            self._summary = stored.get("text", "")
+            self._summary_upto = upto
+
+    def _window_start(self, summary_tokens: int) -> int:
+        """Index of the oldest message kept verbatim in the prompt."""
+        count = len(self._rendered)
+        start = min(max(self._start, self._summary_upto), count - 1)
+        budget = max(self.token_budget - summary_tokens, 0)
+        used = sum(self._tokens[start:])
+
+        if used <= budget and count - start <= config.max_session_history:
+            return start
+
+        target_tokens = int(budget * LOW_WATERMARK)
+        target_messages = max(1, int(config.max_session_history * LOW_WATERMARK))
+        while start < count - 1 and (used > target_tokens or count - start > target_messages):
+            used -= self._tokens[start]
+            start += 1
+
+        return start
+
+    def _uncovered_start(self, start: int, summary_tokens: int) -> int:
+        """Extend the window back over messages the summary doesn't cover yet.
+
+        Only as far as the full budget allows: the oldest uncovered messages
+        are left out rather than sending an unbounded prompt while the
+        summary catches up.
+        """
+        budget = max(self.token_budget - summary_tokens, 0)
+        used = sum(self._tokens[start:])
+        while start > self._summary_upto and len(self._rendered) - start < config.max_session_history:
+            if used + self._tokens[start - 1] > budget:
+                break
+            start -= 1
+            used += self._tokens[start]
+        return start
+
+    def _prepare(self, session: ChatSession, reserved_tokens: int = 0) -> Tuple[str, int]:
+        """Sync the cache and return (summary block, window start).
+
+        Must be called with the lock held.
+        """
+        self._sync(session)
+        summary = self._summary
+        summary_block = f"Summary of the earlier conversation:\n{summary}" if summary else ""
+        reserved_tokens += estimate_tokens(summary_block)
+        start = self._window_start(reserved_tokens)
+
+        if self.summarize and start > self._summary_upto:
+            if not self._summary_pending:
+                self._schedule_summary(session, start)
+            start = self._uncovered_start(start, reserved_tokens)
+
+        return summary_block, start
+
+    def build_prompt(self, session: ChatSession) -> str:
+        """Build a flat completion prompt for the next assistant turn."""
+        if not session or not session.messages:
+            return ""
+
+        with self._lock:
+            summary_block, start = self._prepare(session)
+            end = len(self._rendered)
+            if start == self._start and 0 < self._prefix_end <= end:
+                # Same window start as last turn: extend the cached prefix
+                new_parts = self._rendered[self._prefix_end:end]
+                body = "\n\n".join(filter(None, [self._prefix] + new_parts))
+            else:
+                body = "\n\n".join(self._rendered[start:end])
+
+            self._start = start
+            self._prefix_end = end
+            self._prefix = body
+
+        prompt = f"{summary_block}\n\n{body}" if summary_block else body
+        self.last_prompt_tokens = estimate_tokens(prompt)
+        return prompt
+
+    def build_messages(self, session: ChatSession, system_prompt: str = "") -> List[Dict[str, str]]:
+        """Build structured chat messages for the next assistant turn.
+
+        The system message (system prompt plus rolling summary) comes first
+        and only changes when the summary is updated, and the window start
+        only moves on budget overflow, so consecutive turns share a long
+        identical prefix that the server can serve from its KV cache.
+        """
+        if not session or not session.messages:
+            return []
+
+        with self._lock:
+            summary_block, start = self._prepare(session, estimate_tokens(system_prompt))
+            self._start = start
+            self._prefix_end = 0
+            window = self._chat_messages[start:]
+
+        system = "\n\n".join(filter(None, [system_prompt, summary_block]))
+        messages = ([{"role": "system", "content": system}] if system else []) + window
+        self.last_prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        return messages
+
+    def _schedule_summary(self, session: ChatSession, upto: int):
+        """Fold messages up to `upto` into the rolling summary on the background worker.
+
+        The result is also stored in the session's metadata, which the
+        session's next save persists.
+        """
+        self._summary_pending = True
+        generation = self._generation
+        previous = self._summary
+        transcript = "\n\n".join(self._rendered[self._summary_upto:upto])
+        last = session.messages[upto - 1].timestamp.isoformat()
+
+        def run():
+            try:
+                summary = self._summarize(previous, transcript)
+            except Exception:
+                summary = None
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self._summary_pending = False
+                if summary is not None:
+                    self._summary = summary.strip()
+                    self._summary_upto = upto
+                    # Replaced rather than mutated: a save may be serializing it
+                    session.metadata = {
+                        **session.metadata,
+                        SUMMARY_KEY: {"text": self._summary, "upto": upto, "last": last},
+                    }
+
+        _summary_executor.submit(run)
+
+    def _summarize(self, previous: str, transcript: str) -> str:
+        prompt = f"""Update the running summary of a conversation with the new messages below.
+Keep facts, names, decisions and open questions; drop pleasantries. Reply with the summary only.
+
+Current summary:
+{previous or "(none)"}
+
+New messages:
+{transcript}
+
+Updated summary:"""
+
+        with scheduler.slot("history_summary"), observe_llm_call("history_summary"):
+            return self.llm.invoke(prompt)
+
+    def get_summary(self) -> str:
+        """Current rolling summary of messages outside the prompt window."""
+        return self._summary
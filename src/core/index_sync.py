@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel, Field
+from src.core.document_processor import DocumentProcessor
+from src.vector_store.chroma_store import vector_store
+from src.vector_store.namespaces import DEFAULT_NAMESPACE, resolve_namespace
+from src.utils.config import config
+from src.utils.validators import validate_file_extension
+
+# Filesystem events that can change what is indexed (watchdog also reports
+# opened/closed_no_write, which our own reads would trigger)
+CHANGE_EVENTS = {"created", "modified", "deleted", "moved", "closed"}
+
+
+def state_paths() -> List[str]:
+    """Files and directories the app writes to itself (indexes, caches, sessions).
+
+    Changes under them must not trigger a sync when a watched directory
+    contains them, or every sync and chat would trigger another one.
+    """
+    paths = [
+        config.vector_store_path,
+        config.embedding_cache_path,
+        config.session_storage_path,
+        config.session_sqlite_path,
+        config.vector_store_socket,
+        config.trace_log_path,
+        # Every namespace's manifest (sync_manifest.json, sync_manifest-<ns>.json)
+        Path(config.sync_manifest_path).with_suffix(""),
+    ]
+    return [str(Path(path).resolve()) for path in paths if path]
+
+
+def is_under(path: str, roots: List[str]) -> bool:
+    """Whether path is one of roots, inside one, or a sidecar of one (-wal, .tmp)."""
+    return any(path == root or path.startswith((root + os.sep, root + ".", root + "-")) for root in roots)
+
+
+def file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SyncResult(BaseModel):
+    """Outcome of one directory sync."""
+
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    chunks_added: int = 0
+    failed: Dict[str, str] = Field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def manifest_path(namespace: Optional[str] = None) -> Path:
+    """Manifest of a namespace: SYNC_MANIFEST_PATH, suffixed outside the default namespace."""
+    path = Path(config.sync_manifest_path)
+    namespace = resolve_namespace(namespace)
+    if namespace == DEFAULT_NAMESPACE:
+        return path
+    return path.with_name(f"{path.stem}-{namespace}{path.suffix}")
+
+
+class IndexManifest:
+    """Record of every file indexed by sync: path -> size, mtime, hash, doc_id."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or manifest_path())
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self.files = json.loads(self.path.read_text(encoding="utf-8")).get("files", {})
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": 1, "files": self.files}), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+class IndexSync:
+    """Keep the vector store in sync with a directory of documents.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read; otherwise the content hash decides whether the file is
+    re-ingested, so touching a file doesn't re-embed it. Removed files have
+    their chunks deleted. Each namespace has its own manifest.
+    """
+
+    SAVE_EVERY = 25  # files ingested between manifest checkpoints
+
+    def __init__(
+        self,
+        directory: str,
+        manifest: Optional[IndexManifest] = None,
+        recursive: bool = True,
+        namespace: Optional[str] = None,
+    ):
+        self.directory = Path(directory).resolve()
+        self.namespace = resolve_namespace(namespace)
+        self.manifest = manifest or IndexManifest(manifest_path(self.namespace))
+        self.recursive = recursive
+        self._lock = threading.Lock()
+        self._ignored = [str(self.manifest.path.resolve())] + state_paths()
+
+    def _is_candidate(self, path: Path) -> bool:
+        # Skip hidden files, editor/Office lock files and our own data
+        return (
+            validate_file_extension(path)
+            and not path.name.startswith((".", "~$"))
+            and not is_under(str(path), self._ignored)
+        )
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Stat every supported file under the directory."""
+        files = {}
+        for path in self.directory.glob("**/*" if self.recursive else "*"):
+            if self._is_candidate(path) and path.is_file():
+                files[str(path)] = path.stat()
+        return files
+
+    def _tracked(self) -> List[str]:
+        """Manifest entries that belong to this directory."""
+        prefix = str(self.directory) + os.sep
+        return [p for p in self.manifest.files if p.startswith(prefix)]
+
+    def sync(self) -> SyncResult:
+        """Ingest new and modified files and drop removed ones."""
+        with self._lock:
+            start = time.perf_counter()
+            result = SyncResult()
+            current = self._scan()
+            ingested = 0
+
+            for path, stat in sorted(current.items()):
+                entry = self.manifest.files.get(path)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    result.unchanged += 1
+                    continue
+
+                try:
+                    digest = file_hash(Path(path))
+                    if entry and entry["sha256"] == digest:
+                        # Touched but not changed
+                        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                        result.unchanged += 1
+                        continue
+
+                    document = DocumentProcessor.load_document(path)
+                    if document.chunks:
+                        vector_store.upsert_document(document, self.namespace)
+                    elif entry:
+                        vector_store.delete_document(entry["doc_id"], self.namespace)
+                except Exception as e:
+                    result.failed[path] = str(e)
+                    continue
+
+                self.manifest.files[path] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": digest,
+                    "doc_id": document.doc_id,
+                    "chunks": len(document.chunks),
+                }
+                if entry:
+                    result.updated += 1
+                else:
+                    result.added += 1
+                result.chunks_added += len(document.chunks)
+
+                ingested += 1
+                if ingested % self.SAVE_EVERY == 0:
+                    self.manifest.save()
+
+            for path in self._tracked():
+                if path not in current:
+                    try:
+                        vector_store.delete_document(self.manifest.files[path]["doc_id"], self.namespace)
+                    except Exception as e:
+                        result.failed[path] = str(e)
+                        continue
+                    del self.manifest.files[path]
+                    result.removed += 1
+
+            self.manifest.save()
+            result.seconds = time.perf_counter() - start
+            return result
+
+    def watch(
+        self,
+        debounce: Optional[float] = None,
+        on_sync: Optional[Callable[[SyncResult], None]] = None,
+        stop: Optional[threading.Event] = None,
+    ):
+        """Sync now, then again after every burst of filesystem changes.
+
+        A sync starts once no change has been seen for `debounce` seconds,
+        so copying a whole folder in triggers one sync instead of hundreds.
+        Blocks until `stop` is set.
+        """
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        debounce = config.watch_debounce_seconds if debounce is None else debounce
+        stop = stop or threading.Event()
+        changed = threading.Event()
+        last_change = [0.0]
+        ignored = self._ignored
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in CHANGE_EVENTS:
+                    return
+                # A directory's "modified" just echoes a change to a file in it
+                if event.is_directory and event.event_type == "modified":
+                    return
+                # A move counts if either end is outside our own data
+                paths = [str(event.src_path), str(getattr(event, "dest_path", "") or "")]
+                if all(not path or is_under(path, ignored) for path in paths):
+                    return
+                last_change[0] = time.monotonic()
+                changed.set()
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self.directory), recursive=self.recursive)
+        observer.start()
+        try:
+            result = self.sync()
+            if on_sync:
+                on_sync(result)
+
+            while not stop.is_set():
+                if not changed.wait(timeout=0.5):
+                    continue
+                quiet = time.monotonic() - last_change[0]
+                if quiet < debounce:
+                    stop.wait(debounce - quiet)
+                    continue
+
+                changed.clear()
+                result = self.sync()
+                if on_sync:
+                    on_sync(result)
+        finally:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,150 @@
+import hashlib
+import socket
+import threading
+from typing import Any, Dict, Generator, List, Optional
+import httpx
+from ollama import Client
+from src.utils.config import config
+from src.utils.streaming import on_abort
+
+
+def _register_abort(event: str, info: Dict[str, Any]):
+    """httpcore trace hook: let a guarded generation shut down its connection."""
+    if event == "connection.connect_tcp.complete":
+        sock = info["return_value"].get_extra_info("socket")
+        if sock is not None:
+            # Wakes a blocked read and tells the server the client is gone
+            on_abort(lambda: sock.shutdown(socket.SHUT_RDWR))
+
+
+class AbortableTransport(httpx.HTTPTransport):
+    """HTTP transport for streamed generations that can be aborted mid-read.
+
+    Connections aren't kept alive, so each generation has a connection of
+    its own that can be shut down (see GenerationGuard) without affecting
+    other requests; a local TCP connect costs far less than a generation.
+    """
+
+    def __init__(self):
+        super().__init__(limits=httpx.Limits(max_keepalive_connections=0))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["trace"] = _register_abort
+        return super().handle_request(request)
+
+
+class OllamaChatClient:
+    """Client for Ollama's structured /api/chat endpoint.
+
+    Sends role-tagged messages instead of a flattened prompt so the server
+    can reuse its KV cache for the unchanged conversation prefix, passes
+    keep_alive so the model stays loaded between turns, and pins each
+    session to one Ollama host (when several are configured) so consecutive
+    turns land where their prefix is already cached.
+    """
+
+    _clients: Dict[str, Client] = {}
+    _stream_clients: Dict[str, Client] = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(self, model: Optional[str] = None, keep_alive: Optional[str] = None):
+        self.model = model or config.ollama_chat_model
+        self.keep_alive = keep_alive or config.ollama_keep_alive
+        self.hosts = config.ollama_chat_hosts or [config.ollama_base_url]
+
+    def host_for(self, session_id: Optional[str]) -> str:
+        """Pick the host for a session using rendezvous hashing.
+
+        Adding or removing a host only remaps the sessions that hashed to it.
+        """
+        if not session_id or len(self.hosts) == 1:
+            return self.hosts[0]
+        return max(
+            self.hosts,
+            key=lambda host: hashlib.md5(f"{session_id}:{host}".encode()).digest(),
+        )
+
+    @classmethod
+    def _client(cls, host: str, stream: bool = False) -> Client:
+        """Shared client per host, so HTTP connections are reused across turns.
+
+        Streamed generations use a client with an AbortableTransport instead.
+        """
+        clients = cls._stream_clients if stream else cls._clients
+        with cls._clients_lock:
+            client = clients.get(host)
+            if client is None:
+                # Read timeout, so a stalled server can't hold a request forever
+                timeout = config.generation_timeout_seconds or None
+                transport = AbortableTransport() if stream else None
+                client = clients[host] = Client(host=host, timeout=timeout, transport=transport)
+            return client
+
+    def preload(self):
+        """Load the model on every host and keep it loaded for keep_alive."""
+        for host in self.hosts:
+            # A request without a prompt only loads the model
+            self._client(host).generate(model=self.model, keep_alive=self.keep_alive)
+
+    @staticmethod
+    def _options(max_tokens: Optional[int]) -> Optional[Dict[str, int]]:
+        return {"num_predict": max_tokens} if max_tokens else None
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        session_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """Stream response content chunks for a list of chat messages.
+
+        Closing the generator closes the HTTP response, which stops the
+        generation on the server; so does aborting the GenerationGuard
+        reading it, even while a read is blocked.
+        """
+        client = self._client(self.host_for(session_id), stream=True)
+        for chunk in client.chat(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            keep_alive=self.keep_alive,
+            options=self._options(max_tokens),
+        ):
+            content = chunk["message"]["content"]
+            if content:
+                yield content
+
+    def generate_stream(
+        self,
+        prompt: str,
+        session_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """Stream response chunks for a flat prompt (/api/generate); aborts like stream()."""
+        client = self._client(self.host_for(session_id), stream=True)
+        for chunk in client.generate(
+            model=self.model,
+            prompt=prompt,
+            stream=True,
+            keep_alive=self.keep_alive,
+            options=self._options(max_tokens),
+        ):
+            if chunk["response"]:
+                yield chunk["response"]
+
+    def invoke(
+        self,
+        messages: List[Dict[str, str]],
+        session_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Return the full response for a list of chat messages."""
+        client = self._client(self.host_for(session_id))
+        response = client.chat(
+            model=self.model,
+            messages=messages,
+            stream=False,
+            keep_alive=self.keep_alive,
+            options=self._options(max_tokens),
+        )
+        return response["message"]["content"]
@@ -1,7 +1,13 @@
 from typing import List, Dict, Any, Optional, Generator
 from langchain_community.llms import Ollama
+from src.core.ollama_chat import OllamaChatClient
+from src.core.reranker import reranker
 from src.vector_store.chroma_store import vector_store
 from src.utils.config import config
+from src.utils.metrics import observe_llm_stream, observe_llm_call
+from src.utils.scheduler import scheduler
+from src.utils.singleflight import SingleFlight
+from src.utils.tracing import span
 
 
 class RAGEngine:
@@ -11,36 +17,99 @@ class RAGEngine:
         self.llm = Ollama(
             base_url=config.ollama_base_url,
             model=config.ollama_chat_model,
+            timeout=int(config.generation_timeout_seconds) or None,
         )
+        # Streams go through OllamaChatClient so a GenerationGuard can abort them
+        self.stream_client = OllamaChatClient()
         self.vector_store = vector_store
+        self.reranker = reranker if config.rerank_enabled else None
+        self._generation_flights = SingleFlight("rag_generation")
 
     def query(
         self,
         question: str,
         top_k: Optional[int] = None,
         stream: bool = True,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        flow: Optional[str] = None,
+        namespace: Optional[str] = None,
+        retrieved: Optional[List[Dict[str, Any]]] = None,
     ) -> Generator[str, None, None]:
-        """Query documents and generate an answer."""
+        """Query documents and generate an answer.
+
+        filter_dict is a ChromaDB where clause (see build_where_filter) that
+        restricts retrieval to a subset of the indexed documents; namespace
+        picks the collection searched (default namespace if None).
+        max_tokens caps the answer length (default: GENERATION_MAX_TOKENS).
+        flow is the key the scheduler queues generations fairly by (e.g.
+        the client). If a `retrieved` list is given, the chunks the answer
+        is based on are appended to it.
+        """
         # Retrieve relevant chunks
-        results = self.vector_store.query(question, top_k=top_k)
+        with span("retrieval"):
+            results = self.retrieve(question, top_k=top_k, filter_dict=filter_dict, namespace=namespace)
+        if retrieved is not None:
+            retrieved.extend(results)
 
         if not results:
             yield "I couldn't find any relevant information in the documents to answer your question."
             return
 
-        # Build context from retrieved chunks
-        context = self._build_context(results)
+        with span("context"):
+            # Build context from retrieved chunks
+            context = self._build_context(results)
 
-        # Build prompt
-        prompt = self._build_prompt(question, context, results)
+            # Build prompt
+            prompt = self._build_prompt(question, context, results)
 
         # Generate answer
+        max_tokens = max_tokens or config.generation_max_tokens or None
+        options = {"num_predict": max_tokens} if max_tokens else {}
         if stream:
-            for chunk in self.llm.stream(prompt):
-                yield chunk
+            def generate():
+                upstream = observe_llm_stream(self.stream_client.generate_stream(prompt, max_tokens=max_tokens), "rag")
+                return scheduler.stream(upstream, "rag", flow=flow)
+
+            if config.singleflight_generations:
+                # Identical prompts asked together get the same answer streamed
+                yield from self._generation_flights.stream((prompt, max_tokens), generate)
+            else:
+                yield from generate()
         else:
-            response = self.llm.invoke(prompt)
-            yield response
+            def invoke():
+                with scheduler.slot("rag", flow=flow), observe_llm_call("rag"):
+                    return self.llm.invoke(prompt, **options)
+
+            if config.singleflight_generations:
+                yield self._generation_flights.do((prompt, max_tokens), invoke)
+            else:
+                yield invoke()
+
+    def retrieve(
+        self,
+        question: str,
+        top_k: Optional[int] = None,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Chunks to answer from, best first.
+
+        With reranking enabled, RERANK_CANDIDATES chunks are retrieved and
+        the top_k (default RERANK_TOP_K) with the best cross-encoder score
+        are kept; otherwise this is the vector search's top_k.
+        """
+        if self.reranker is None:
+            return self.vector_store.query(question, top_k=top_k, filter_dict=filter_dict, namespace=namespace)
+
+        top_k = top_k or config.rerank_top_k
+        candidates = self.vector_store.query(
+            question,
+            top_k=max(config.rerank_candidates, top_k),
+            filter_dict=filter_dict,
+            namespace=namespace,
+        )
+        return self.reranker.rerank(question, candidates, top_k)
 
     def _build_context(self, results: List[Dict[str, Any]]) -> str:
         """Build context string from retrieved chunks."""
@@ -48,11 +117,13 @@ class RAGEngine:
 
         for i, result in enumerate(results, 1):
             text = result["text"]
-            source = result["metadata"].get("source_file", "Unknown")
-            chunk_idx = result["metadata"].get("chunk_index", 0)
+            metadata = result["metadata"]
+            source = metadata.get("source_file", "Unknown")
+            # The section's heading path says more than a chunk number
+            location = metadata.get("heading_path") or f"chunk {metadata.get('chunk_index', 0)}"
 
             context_parts.append(
-                f"[Source {i}: {source}, chunk {chunk_idx}]\n{text}"
+                f"[Source {i}: {source}, {location}]\n{text}"
             )
 
         return "\n\n".join(context_parts)
@@ -91,10 +162,12 @@ Answer:"""
     def get_relevant_chunks(
         self,
         question: str,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get relevant document chunks without generating an answer."""
-        return self.vector_store.query(question, top_k=top_k)
+        return self.retrieve(question, top_k=top_k, filter_dict=filter_dict, namespace=namespace)
 
 
 # Global RAG engine instance
@@ -0,0 +1,81 @@
+"""
+Cross-encoder reranking of retrieved chunks.
+
+The bi-encoder search ranks chunks by embedding distance alone, which is
+noisy, so RAG has to send 5-10 chunks to the LLM to be sure the right ones
+are among them. With RERANK_ENABLED, RAGEngine retrieves RERANK_CANDIDATES
+chunks instead, scores every (question, chunk) pair with a small
+cross-encoder on CPU, and passes only the best RERANK_TOP_K to the prompt,
+which shortens prefill and generation.
+
+The model is loaded once per process (on first use, or by warmup()) and
+kept; scoring runs in batches through the scheduler's "rerank" queue, so
+SCHEDULER_MODEL_LIMITS can bound how many requests use the CPU at once.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+from src.utils.config import config
+from src.utils.metrics import observe, batch_size_label, RERANK_SECONDS
+from src.utils.scheduler import scheduler
+from src.utils.tracing import span
+
+# Longest (question, chunk) pair the cross-encoder reads, in model tokens;
+# MS MARCO cross-encoders are trained on 512
+MAX_LENGTH = 512
+
+
+class Reranker:
+    """Scores retrieved chunks against the question with a cross-encoder."""
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: Optional[int] = None):
+        self.model_name = model_name or config.rerank_model
+        self.batch_size = batch_size or config.rerank_batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The cross-encoder, loaded on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    with span("rerank_load"):
+                        self._model = CrossEncoder(self.model_name, max_length=MAX_LENGTH, device="cpu")
+        return self._model
+
+    def warmup(self):
+        """Load the model and score one pair, so the first query doesn't pay for it."""
+        self.score("warmup", ["warmup"])
+
+    def score(self, question: str, texts: List[str]) -> List[float]:
+        """Relevance of each text to the question (higher is better)."""
+        if not texts:
+            return []
+        model = self.model
+        with scheduler.slot("rerank"):
+            with span("rerank"), observe(RERANK_SECONDS, batch_size=batch_size_label(len(texts))):
+                scores = model.predict(
+                    [(question, text) for text in texts],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False,
+                )
+        return [float(score) for score in scores]
+
+    def rerank(self, question: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """The top_k results by cross-encoder score, best first.
+
+        Each returned result is a copy with a "rerank_score" key; the input
+        (possibly shared with other callers of a single-flight query) isn't
+        modified.
+        """
+        scores = self.score(question, [result["text"] for result in results])
+        scored = [{**result, "rerank_score": score} for result, score in zip(results, scores)]
+        scored.sort(key=lambda result: result["rerank_score"], reverse=True)
+        return scored[:top_k]
+
+
+# Global reranker instance (the model is loaded on first use)
+reranker = Reranker()
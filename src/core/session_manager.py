@@ -1,37 +1,202 @@
+import fcntl
 import json
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
-from src.models.chat import ChatSession
+from src.core.session_store import BaseSessionStore, create_session_store
+from src.models.chat import ChatSession, ChatMessage
 from src.utils.config import config
 
 
-class SessionManager:
-    """Manage chat session persistence."""
+def _dumps(data: Dict[str, Any]) -> str:
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+class SessionManager(BaseSessionStore):
+    """Manage chat session persistence (the "file" session backend).
+
+    Each session is stored as an append-only JSONL log: a header line
+    followed by one line per message, so saving only writes new messages.
+    A shared index log keeps one summary line per save, so listing sessions
+    never reads message history. The index is compacted once it holds
+    mostly superseded lines.
+
+    Compaction and log rewrites replace files with os.replace, so a line
+    another worker process appended to the old file meanwhile would be
+    lost: every write holds an exclusive flock on a sidecar lock file.
+    """
+
+    INDEX_FILE = "sessions.index.jsonl"
+    LOCK_FILE = "sessions.index.lock"
+    INDEX_COMPACT_MIN_LINES = 1000
 
     def __init__(self):
         self.storage_path = config.session_storage_path
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.storage_path / self.INDEX_FILE
+        self.lock_path = self.storage_path / self.LOCK_FILE
+
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_offset = 0
+        self._index_lines = 0
+        self._index_inode: Optional[int] = None
+        # session_id -> (persisted message count, last persisted timestamp, header)
+        self._persisted: Dict[str, tuple] = {}
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the cross-process lock (callers hold self._lock; nesting is a no-op)."""
+        if self._lock_file is not None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._lock_file = lock_file
+            try:
+                yield
+            finally:
+                # Closing the file releases the lock
+                self._lock_file = None
+
+    def _log_path(self, session_id: str) -> Path:
+        return self.storage_path / f"{session_id}.jsonl"
+
+    def _legacy_path(self, session_id: str) -> Path:
+        return self.storage_path / f"{session_id}.json"
+
+    @staticmethod
+    def _header(session: ChatSession) -> Dict[str, Any]:
+        return {
+            "type": "session",
+            "session_id": session.session_id,
+            "created_at": session.created_at.isoformat(),
+            "context_documents": session.context_documents,
+            "metadata": session.metadata,
+        }
+
+    @staticmethod
+    def _message_line(message: ChatMessage) -> str:
+        return _dumps({
+            "type": "message",
+            "role": message.role,
+            "content": message.content,
+            "timestamp": message.timestamp.isoformat(),
+            "metadata": message.metadata,
+        })
+
+    @staticmethod
+    def _summary(session: ChatSession) -> Dict[str, Any]:
+        return {
+            "session_id": session.session_id,
+            "created_at": session.created_at.isoformat(),
+            "updated_at": session.updated_at.isoformat(),
+            "message_count": len(session.messages),
+        }
+
+    # Session logs
 
     def save_session(self, session: ChatSession):
-        """Save a chat session to disk."""
-        file_path = self.storage_path / f"{session.session_id}.json"
+        """Save a chat session to disk, appending only unsaved messages."""
+        with self._lock, self._file_lock():
+            log_path = self._log_path(session.session_id)
+            header = self._header(session)
+            state = self._persisted.get(session.session_id)
 
-        session_data = session.model_dump()
-        # Convert datetime objects to ISO format strings
-        session_data["created_at"] = session_data["created_at"].isoformat()
-        session_data["updated_at"] = session_data["updated_at"].isoformat()
+            if state and log_path.exists() and self._is_continuation(session, state):
+                count, _, saved_header = state
+                lines = [self._message_line(m) for m in session.messages[count:]]
+                if header != saved_header:
+                    lines.append(_dumps({**header, "type": "meta"}))
+                if lines:
+                    with open(log_path, "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+            else:
+                self._rewrite_log(session, header)
 
-        for msg in session_data["messages"]:
-            msg["timestamp"] = msg["timestamp"].isoformat()
+            self._remember(session, header)
+            self._append_index(self._summary(session))
 
-        with open(file_path, "w") as f:
-            json.dump(session_data, f, indent=2)
+    @staticmethod
+    def _is_continuation(session: ChatSession, state: tuple) -> bool:
+        """Check that the saved messages are still a prefix of the session."""
+        count, last_timestamp, _ = state
+        if len(session.messages) < count:
+            return False
+        return count == 0 or session.messages[count - 1].timestamp == last_timestamp
+
+    def _remember(self, session: ChatSession, header: Dict[str, Any]):
+        last = session.messages[-1].timestamp if session.messages else None
+        self._persisted[session.session_id] = (len(session.messages), last, header)
+
+    def _rewrite_log(self, session: ChatSession, header: Dict[str, Any]):
+        """Write a session's full log (first save or cleared history)."""
+        log_path = self._log_path(session.session_id)
+        tmp_path = log_path.with_suffix(".jsonl.tmp")
+        lines = [_dumps(header)] + [self._message_line(m) for m in session.messages]
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, log_path)
+        self._legacy_path(session.session_id).unlink(missing_ok=True)
 
     def load_session(self, session_id: str) -> Optional[ChatSession]:
         """Load a chat session from disk."""
-        file_path = self.storage_path / f"{session_id}.json"
+        log_path = self._log_path(session_id)
+        if log_path.exists():
+            session = self._read_log(log_path)
+        else:
+            session = self._read_legacy(self._legacy_path(session_id))
+
+        if session is not None:
+            with self._lock:
+                entry = self._index.get(session_id)
+                if entry:
+                    session.updated_at = datetime.fromisoformat(entry["updated_at"])
+                if log_path.exists():
+                    self._remember(session, self._header(session))
+        return session
+
+    @staticmethod
+    def _read_log(log_path: Path) -> Optional[ChatSession]:
+        header: Dict[str, Any] = {}
+        messages: List[ChatMessage] = []
+
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    continue
+                if record.get("type") == "message":
+                    messages.append(ChatMessage(
+                        role=record["role"],
+                        content=record["content"],
+                        timestamp=datetime.fromisoformat(record["timestamp"]),
+                        metadata=record.get("metadata", {}),
+                    ))
+                elif record.get("type") in ("session", "meta"):
+                    header = record
 
+        if not header:
+            return None
+
+        return ChatSession(
+            session_id=header["session_id"],
+            messages=messages,
+            created_at=datetime.fromisoformat(header["created_at"]),
+            updated_at=messages[-1].timestamp if messages else datetime.fromisoformat(header["created_at"]),
+            context_documents=header.get("context_documents", []),
+            metadata=header.get("metadata", {}),
+        )
+
+    @staticmethod
+    def _read_legacy(file_path: Path) -> Optional[ChatSession]:
+        """Read a session saved as a single JSON document by older versions."""
         if not file_path.exists():
             return None
 
@@ -47,37 +212,136 @@ class SessionManager:
 
         return ChatSession(**session_data)
 
-    def list_sessions(self) -> List[Dict]:
-        """List all saved sessions."""
-        sessions = []
+    # Index
+
+    def _apply_index_entry(self, entry: Dict[str, Any]):
+        if entry.get("deleted"):
+            self._index.pop(entry["session_id"], None)
+        else:
+            self._index[entry["session_id"]] = entry
+
+    def _append_index(self, entry: Dict[str, Any]):
+        self._refresh_index()
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(_dumps(entry) + "\n")
+        # Our own line is read back (idempotently) on the next refresh
+        self._apply_index_entry(entry)
+
+        if self._index_lines > max(self.INDEX_COMPACT_MIN_LINES, 2 * len(self._index)):
+            self._refresh_index()
+            self._write_index()
+
+    def _refresh_index(self):
+        """Read index lines appended since the last refresh (by any process)."""
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            with self._file_lock():
+                # Another process may have created it while we waited
+                if not self.index_path.exists():
+                    self._rebuild_index()
+                    return
+            stat = self.index_path.stat()
+
+        if stat.st_ino != self._index_inode or stat.st_size < self._index_offset:
+            # First read, or the index was compacted by another process
+            self._index = {}
+            self._index_offset = 0
+            self._index_lines = 0
+            self._index_inode = stat.st_ino
+
+        if stat.st_size == self._index_offset:
+            return
+
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
 
-        for file_path in self.storage_path.glob("*.json"):
+        # Leave a partially written last line for the next refresh
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
             try:
-                with open(file_path, "r") as f:
-                    session_data = json.load(f)
-
-                sessions.append({
-                    "session_id": session_data["session_id"],
-                    "created_at": session_data["created_at"],
-                    "updated_at": session_data["updated_at"],
-                    "message_count": len(session_data["messages"]),
-                })
+                self._apply_index_entry(json.loads(line))
             except (json.JSONDecodeError, KeyError):
                 continue
+            self._index_lines += 1
+        self._index_offset += end
+
+    def _write_index(self):
+        """Atomically rewrite the index with one line per live session."""
+        tmp_path = self.index_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._index.values():
+                f.write(_dumps(entry) + "\n")
+        os.replace(tmp_path, self.index_path)
+
+        stat = self.index_path.stat()
+        self._index_inode = stat.st_ino
+        self._index_offset = stat.st_size
+        self._index_lines = len(self._index)
+
+    def _rebuild_index(self):
+        """Build the index by scanning session files (first run or lost index)."""
+        self._index = {}
+        for file_path in self.storage_path.glob("*.json*"):
+            if file_path.name == self.INDEX_FILE or file_path.suffix not in (".json", ".jsonl"):
+                continue
+            try:
+                if file_path.suffix == ".jsonl":
+                    session = self._read_log(file_path)
+                else:
+                    session = self._read_legacy(file_path)
+            except (json.JSONDecodeError, KeyError, ValueError):
+                continue
+            if session is None:
+                continue
+            current = self._index.get(session.session_id)
+            # A .jsonl log supersedes a leftover legacy file of the same session
+            if current is None or file_path.suffix == ".jsonl":
+                self._apply_index_entry(self._summary(session))
+        self._write_index()
+
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """List saved sessions, most recently updated first."""
+        with self._lock:
+            self._refresh_index()
+            sessions = sorted(self._index.values(), key=lambda x: x["updated_at"], reverse=True)
+
+        end = offset + limit if limit is not None else None
+        return [dict(s) for s in sessions[offset:end]]
+
+    def get_message_count(self, session_id: str) -> Optional[int]:
+        """Stored message count of a session, or None if it doesn't exist."""
+        with self._lock:
+            self._refresh_index()
+            entry = self._index.get(session_id)
+        return entry["message_count"] if entry else None
 
-        return sorted(sessions, key=lambda x: x["updated_at"], reverse=True)
+    def count_sessions(self) -> int:
+        """Number of saved sessions."""
+        with self._lock:
+            self._refresh_index()
+            return len(self._index)
 
     def delete_session(self, session_id: str):
         """Delete a saved session."""
-        file_path = self.storage_path / f"{session_id}.json"
-        if file_path.exists():
-            file_path.unlink()
+        with self._lock, self._file_lock():
+            self._log_path(session_id).unlink(missing_ok=True)
+            self._legacy_path(session_id).unlink(missing_ok=True)
+            self._persisted.pop(session_id, None)
+            self._append_index({"session_id": session_id, "deleted": True})
 
     def clear_all_sessions(self):
         """Delete all saved sessions."""
-        for file_path in self.storage_path.glob("*.json"):
-            file_path.unlink()
+        with self._lock, self._file_lock():
+            for file_path in self.storage_path.glob("*.json*"):
+                file_path.unlink()
+            self._index = {}
+            self._index_offset = 0
+            self._index_lines = 0
+            self._index_inode = None
+            self._persisted = {}
 
 
-# Global session manager instance
-session_manager = SessionManager()
+# Global session store instance (backend selected by SESSION_BACKEND)
+session_manager = create_session_store()
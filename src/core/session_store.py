@@ -0,0 +1,387 @@
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from src.models.chat import ChatSession, ChatMessage
+from src.utils.config import config
+
+
+class BaseSessionStore(ABC):
+    """Abstract base class for chat session storage backends.
+
+    Backends other than "memory" can be shared by several API worker
+    processes, so a follow-up message can be served by any worker.
+    """
+
+    @abstractmethod
+    def save_session(self, session: ChatSession):
+        """Persist a session, writing only what changed where possible."""
+        pass
+
+    @abstractmethod
+    def load_session(self, session_id: str) -> Optional[ChatSession]:
+        """Load a session, or None if it doesn't exist."""
+        pass
+
+    @abstractmethod
+    def get_message_count(self, session_id: str) -> Optional[int]:
+        """Cheaply return a session's stored message count, or None if missing."""
+        pass
+
+    @abstractmethod
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """List sessions, most recently updated first."""
+        pass
+
+    @abstractmethod
+    def count_sessions(self) -> int:
+        """Number of stored sessions."""
+        pass
+
+    @abstractmethod
+    def delete_session(self, session_id: str):
+        """Delete a session."""
+        pass
+
+    @abstractmethod
+    def clear_all_sessions(self):
+        """Delete all sessions."""
+        pass
+
+
+def _session_summary(session: ChatSession) -> Dict[str, Any]:
+    return {
+        "session_id": session.session_id,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "message_count": len(session.messages),
+    }
+
+
+def _message_to_json(message: ChatMessage) -> str:
+    return json.dumps({
+        "role": message.role,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat(),
+        "metadata": message.metadata,
+    }, separators=(",", ":"), default=str)
+
+
+def _message_from_json(data: str) -> ChatMessage:
+    record = json.loads(data)
+    return ChatMessage(
+        role=record["role"],
+        content=record["content"],
+        timestamp=datetime.fromisoformat(record["timestamp"]),
+        metadata=record.get("metadata", {}),
+    )
+
+
+class MemorySessionStore(BaseSessionStore):
+    """Process-local session storage (single worker only)."""
+
+    def __init__(self):
+        self._sessions: Dict[str, ChatSession] = {}
+        self._lock = threading.Lock()
+
+    def save_session(self, session: ChatSession):
+        with self._lock:
+            self._sessions[session.session_id] = session
+
+    def load_session(self, session_id: str) -> Optional[ChatSession]:
+        return self._sessions.get(session_id)
+
+    def get_message_count(self, session_id: str) -> Optional[int]:
+        session = self._sessions.get(session_id)
+        return len(session.messages) if session else None
+
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        with self._lock:
+            sessions = sorted(self._sessions.values(), key=lambda s: s.updated_at, reverse=True)
+        end = offset + limit if limit is not None else None
+        return [_session_summary(s) for s in sessions[offset:end]]
+
+    def count_sessions(self) -> int:
+        return len(self._sessions)
+
+    def delete_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear_all_sessions(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+class SQLiteSessionStore(BaseSessionStore):
+    """Session storage in a SQLite database in WAL mode.
+
+    WAL lets readers proceed while one writer commits, which is enough for
+    several workers on one host sharing the database file. Each save only
+    inserts the messages added since the last save.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        message_count INTEGER NOT NULL,
+        context_documents TEXT NOT NULL,
+        metadata TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+    CREATE TABLE IF NOT EXISTS messages (
+        session_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        timestamp TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (session_id, seq)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or config.session_sqlite_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save_session(self, session: ChatSession):
+        conn = self._conn()
+        messages = session.messages
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT message_count FROM sessions WHERE session_id = ?", (session.session_id,)
+            ).fetchone()
+            start = row[0] if row else 0
+
+            if start:
+                last = conn.execute(
+                    "SELECT timestamp FROM messages WHERE session_id = ? AND seq = ?",
+                    (session.session_id, start - 1),
+                ).fetchone()
+                # History was cleared or replaced: rewrite the messages
+                if start > len(messages) or not last or last[0] != messages[start - 1].timestamp.isoformat():
+                    conn.execute("DELETE FROM messages WHERE session_id = ?", (session.session_id,))
+                    start = 0
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages (session_id, seq, timestamp, data) VALUES (?, ?, ?, ?)",
+                [
+                    (session.session_id, seq, m.timestamp.isoformat(), _message_to_json(m))
+                    for seq, m in enumerate(messages[start:], start)
+                ],
+            )
+            conn.execute(
+                """INSERT INTO sessions (session_id, created_at, updated_at, message_count, context_documents, metadata)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    updated_at = excluded.updated_at,
+                    message_count = excluded.message_count,
+                    context_documents = excluded.context_documents,
+                    metadata = excluded.metadata""",
+                (
+                    session.session_id,
+                    session.created_at.isoformat(),
+                    session.updated_at.isoformat(),
+                    len(messages),
+                    json.dumps(session.context_documents),
+                    json.dumps(session.metadata, default=str),
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load_session(self, session_id: str) -> Optional[ChatSession]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT created_at, updated_at, context_documents, metadata FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if not row:
+            return None
+
+        messages = [
+            _message_from_json(data)
+            for (data,) in conn.execute(
+                "SELECT data FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            )
+        ]
+        return ChatSession(
+            session_id=session_id,
+            messages=messages,
+            created_at=datetime.fromisoformat(row[0]),
+            updated_at=datetime.fromisoformat(row[1]),
+            context_documents=json.loads(row[2]),
+            metadata=json.loads(row[3]),
+        )
+
+    def get_message_count(self, session_id: str) -> Optional[int]:
+        row = self._conn().execute(
+            "SELECT message_count FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        rows = self._conn().execute(
+            """SELECT session_id, created_at, updated_at, message_count FROM sessions
+            ORDER BY updated_at DESC LIMIT ? OFFSET ?""",
+            (-1 if limit is None else limit, offset),
+        )
+        return [
+            {"session_id": r[0], "created_at": r[1], "updated_at": r[2], "message_count": r[3]}
+            for r in rows
+        ]
+
+    def count_sessions(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def delete_session(self, session_id: str):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.execute("COMMIT")
+
+    def clear_all_sessions(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM messages")
+        conn.execute("DELETE FROM sessions")
+        conn.execute("COMMIT")
+
+
+class RedisSessionStore(BaseSessionStore):
+    """Session storage on a Redis-protocol server.
+
+    Each session is a hash (summary fields) plus a list of JSON messages,
+    and a sorted set scored by update time serves paginated listings. A save
+    appends only new messages, in a WATCH/MULTI/EXEC transaction, so
+    concurrent saves of one session can't append the same messages twice.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "docai:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url or config.session_redis_url, decode_responses=True)
+        self.prefix = prefix
+        self.index_key = f"{prefix}sessions"
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+
+    def save_session(self, session: ChatSession):
+        key = self._key(session.session_id)
+        messages = session.messages
+
+        def write(pipe):
+            count, last_timestamp = pipe.hmget(key, "message_count", "last_timestamp")
+            start = int(count or 0)
+
+            pipe.multi()
+            if start and (start > len(messages) or last_timestamp != messages[start - 1].timestamp.isoformat()):
+                # History was cleared or replaced: rewrite the messages
+                pipe.delete(f"{key}:messages")
+                start = 0
+            if messages[start:]:
+                pipe.rpush(f"{key}:messages", *[_message_to_json(m) for m in messages[start:]])
+
+            pipe.hset(key, mapping={
+                **_session_summary(session),
+                "last_timestamp": messages[-1].timestamp.isoformat() if messages else "",
+                "context_documents": json.dumps(session.context_documents),
+                "metadata": json.dumps(session.metadata, default=str),
+            })
+            pipe.zadd(self.index_key, {session.session_id: session.updated_at.timestamp()})
+
+        # WATCH the summary hash: if another save commits between reading the
+        # message count and EXEC, the transaction is retried with the new count
+        self.client.transaction(write, key)
+
+    def load_session(self, session_id: str) -> Optional[ChatSession]:
+        key = self._key(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(key)
+        pipe.lrange(f"{key}:messages", 0, -1)
+        fields, raw_messages = pipe.execute()
+        if not fields:
+            return None
+
+        return ChatSession(
+            session_id=session_id,
+            messages=[_message_from_json(m) for m in raw_messages],
+            created_at=datetime.fromisoformat(fields["created_at"]),
+            updated_at=datetime.fromisoformat(fields["updated_at"]),
+            context_documents=json.loads(fields.get("context_documents", "[]")),
+            metadata=json.loads(fields.get("metadata", "{}")),
+        )
+
+    def get_message_count(self, session_id: str) -> Optional[int]:
+        count = self.client.hget(self._key(session_id), "message_count")
+        return int(count) if count is not None else None
+
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        end = -1 if limit is None else offset + limit - 1
+        session_ids = self.client.zrevrange(self.index_key, offset, end)
+
+        pipe = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.hmget(self._key(session_id), "created_at", "updated_at", "message_count")
+        rows = pipe.execute() if session_ids else []
+
+        return [
+            {"session_id": sid, "created_at": r[0], "updated_at": r[1], "message_count": int(r[2] or 0)}
+            for sid, r in zip(session_ids, rows)
+            if r[0] is not None
+        ]
+
+    def count_sessions(self) -> int:
+        return self.client.zcard(self.index_key)
+
+    def delete_session(self, session_id: str):
+        key = self._key(session_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(key, f"{key}:messages")
+        pipe.zrem(self.index_key, session_id)
+        pipe.execute()
+
+    def clear_all_sessions(self):
+        session_ids = self.client.zrange(self.index_key, 0, -1)
+        pipe = self.client.pipeline(transaction=True)
+        for session_id in session_ids:
+            pipe.delete(self._key(session_id), f"{self._key(session_id)}:messages")
+        pipe.delete(self.index_key)
+        pipe.execute()
+
+
+def create_session_store(backend: Optional[str] = None) -> BaseSessionStore:
+    """Create the session store selected by SESSION_BACKEND."""
+    backend = (backend or config.session_backend).lower()
+
+    if backend == "file":
+        from src.core.session_manager import SessionManager
+        return SessionManager()
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+
+    raise ValueError(f"Unsupported session backend: {backend}")
@@ -5,6 +5,8 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document as LangchainDocument
 from src.core.document_processor import DocumentProcessor
 from src.utils.config import config
+from src.utils.metrics import observe_llm_call
+from src.utils.scheduler import scheduler
 
 
 class Summarizer:
@@ -16,6 +18,11 @@ class Summarizer:
             model=config.ollama_chat_model,
         )
 
+    def _invoke(self, prompt: str) -> str:
+        """Invoke the LLM (as a batch job) and record generation metrics."""
+        with scheduler.slot("summarizer"), observe_llm_call("summarizer"):
+            return self.llm.invoke(prompt)
+
     def summarize_file(self, file_path: str, summary_type: str = "concise") -> str:
         """Summarize a document file."""
         # Extract text from document
@@ -37,7 +44,7 @@ class Summarizer:
     def _summarize_short(self, text: str, summary_type: str) -> str:
         """Summarize short text directly."""
         prompt = self._get_summary_prompt(text, summary_type)
-        return self.llm.invoke(prompt)
+        return self._invoke(prompt)
 
     def _summarize_long(self, text: str, summary_type: str) -> str:
         """Summarize long text using map-reduce."""
@@ -56,7 +63,7 @@ class Summarizer:
 {chunk}
 
 Summary:"""
-            summary = self.llm.invoke(prompt)
+            summary = self._invoke(prompt)
             chunk_summaries.append(summary)
 
         # Combine summaries
@@ -64,7 +71,7 @@ Summary:"""
 
         # Final summarization
         final_prompt = self._get_summary_prompt(combined_summary, summary_type)
-        return self.llm.invoke(final_prompt)
+        return self._invoke(final_prompt)
 
     def _get_summary_prompt(self, text: str, summary_type: str) -> str:
         """Get the appropriate summary prompt based on type."""
@@ -94,7 +101,7 @@ Text:
 
 Key Points:"""
 
-        return self.llm.invoke(prompt)
+        return self._invoke(prompt)
 
 
 # Global summarizer instance
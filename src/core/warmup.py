@@ -0,0 +1,123 @@
+"""
+API startup warmup and readiness.
+
+A fresh API instance answers its first requests slowly: Ollama loads the
+chat and embedding models on first use (seconds each), ChromaDB reads a
+collection's index into memory on its first query, and in-process models
+(reranker, local embeddings) load on first use. On startup the API warms
+all of these in a background thread. GET /readyz reports ready only once
+warmup has finished and the dependencies answer, so an orchestrator only
+sends traffic to warm instances; GET /livez just says the process serves.
+
+Dependency checks are cached for READINESS_CACHE_SECONDS, so frequent
+probes cost one round of checks per interval however many arrive. They run
+on their own thread, so probes still answer when every worker thread is
+busy waiting for the model.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ollama import Client
+from src.core.ollama_chat import OllamaChatClient
+from src.core.rag_engine import rag_engine
+from src.vector_store.chroma_store import vector_store
+from src.vector_store.embeddings import embedding_service
+from src.utils.config import config
+
+# Seconds a dependency check may take before it counts as failed
+CHECK_TIMEOUT = 2.0
+
+# Not the API's threadpool, which requests waiting for a model slot can fill
+readiness_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readiness")
+
+
+def warm_vector_store():
+    """Open every namespace's collection and run one search in each non-empty one."""
+    for namespace in vector_store.list_namespaces():
+        if vector_store.count(namespace):
+            # The first query reads the index into memory
+            vector_store.query_batch(["warmup"], top_k=1, namespace=namespace)
+
+
+class Readiness:
+    """Startup warmup state and cached dependency checks."""
+
+    def __init__(self, cache_seconds: Optional[float] = None):
+        self.cache_seconds = config.readiness_cache_seconds if cache_seconds is None else cache_seconds
+        self.warm = threading.Event()
+        self.warmup_steps: Dict[str, str] = {}
+        self._checks: Dict[str, str] = {}
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Client] = {}
+
+    def _steps(self) -> List[Tuple[str, Callable[[], Any]]]:
+        steps = [
+            ("chat_model", OllamaChatClient().preload),
+            ("embedding_model", embedding_service.warmup),
+            ("vector_store", warm_vector_store),
+        ]
+        if rag_engine.reranker:
+            steps.append(("reranker", rag_engine.reranker.warmup))
+        return steps
+
+    def warm_up(self):
+        """Load models and indexes, then mark the instance warm.
+
+        A failed step doesn't hold the instance back: it is recorded, and
+        the dependency checks decide readiness.
+        """
+        for name, step in self._steps():
+            start = time.perf_counter()
+            try:
+                step()
+                self.warmup_steps[name] = f"ok ({time.perf_counter() - start:.1f}s)"
+            except Exception as e:
+                self.warmup_steps[name] = f"failed: {e}"
+        self.warm.set()
+
+    def _ollama_hosts(self) -> List[str]:
+        hosts = list(config.ollama_chat_hosts or [config.ollama_base_url])
+        if config.embedding_backend.lower() == "ollama" and config.ollama_base_url not in hosts:
+            hosts.append(config.ollama_base_url)
+        return hosts
+
+    def _run_checks(self) -> Dict[str, str]:
+        checks = {}
+        try:
+            vector_store.count()
+            checks["vector_store"] = "ok"
+        except Exception as e:
+            checks["vector_store"] = f"failed: {e}"
+
+        for host in self._ollama_hosts():
+            client = self._clients.get(host)
+            if client is None:
+                client = self._clients[host] = Client(host=host, timeout=CHECK_TIMEOUT)
+            try:
+                client.list()
+                checks[f"ollama {host}"] = "ok"
+            except Exception as e:
+                checks[f"ollama {host}"] = f"failed: {e}"
+        return checks
+
+    def check(self) -> Tuple[bool, Dict[str, Any]]:
+        """Whether the instance should receive traffic, and why.
+
+        Probes arriving while checks run wait for them and share the result.
+        """
+        with self._lock:
+            if time.monotonic() - self._checked_at > self.cache_seconds:
+                self._checks = self._run_checks()
+                self._checked_at = time.monotonic()
+            checks = self._checks
+
+        warm = self.warm.is_set()
+        ready = warm and all(result == "ok" for result in checks.values())
+        return ready, {"warm": warm, "checks": checks, "warmup": dict(self.warmup_steps)}
+
+
+# Global readiness state of this process
+readiness = Readiness()
@@ -1,8 +1,180 @@
+import posixpath
+import zipfile
 from pathlib import Path
-from docx import Document as DocxDocument
+from typing import Dict, Iterator, List, Optional
+from lxml import etree
 from src.loaders.base_loader import BaseLoader
 from src.models.document import Document
 
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+RELATIONSHIPS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+OFFICE_DOCUMENT = RELATIONSHIPS + "officeDocument"
+STYLES = RELATIONSHIPS + "styles"
+
+# Markdown has six heading levels; Word has nine
+MAX_HEADING_LEVEL = 6
+
+# Run content that contributes text, and what it contributes
+TEXT_TAGS = {W + "t": None, W + "tab": "\t", W + "br": "\n", W + "cr": "\n"}
+
+
+def related_part(archive: zipfile.ZipFile, source: str, rel_type: str) -> Optional[str]:
+    """Name of the part `source` ("" for the package) relates to by `rel_type`."""
+    directory, name = posixpath.split(source)
+    try:
+        rels = etree.fromstring(archive.read(posixpath.join(directory, "_rels", name + ".rels")))
+    except KeyError:
+        return None
+    for rel in rels.iter(REL + "Relationship"):
+        if rel.get("Type") == rel_type:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return posixpath.normpath(target.lstrip("/"))
+            return posixpath.normpath(posixpath.join(directory, target))
+    return None
+
+
+def main_part_name(archive: zipfile.ZipFile) -> str:
+    """Name of the main document part, from the package relationships."""
+    return related_part(archive, "", OFFICE_DOCUMENT) or "word/document.xml"
+
+
+def heading_levels(archive: zipfile.ZipFile, document_part: str) -> Dict[str, int]:
+    """Heading level (1-based) of each paragraph style that is a heading.
+
+    A style is a heading if it is named "heading N" (the built-in names,
+    whatever the display language) or sets an outline level, directly or
+    through the style it is based on.
+    """
+    part = related_part(archive, document_part, STYLES)
+    try:
+        styles = etree.fromstring(archive.read(part or "word/styles.xml"))
+    except KeyError:
+        return {}
+
+    own: Dict[str, Optional[int]] = {}
+    based_on: Dict[str, str] = {}
+    for style in styles.iter(W + "style"):
+        if style.get(W + "type") != "paragraph":
+            continue
+        style_id = style.get(W + "styleId")
+        name = style.find(W + "name")
+        name = (name.get(W + "val") or "").lower() if name is not None else ""
+        outline = style.find(f"{W}pPr/{W}outlineLvl")
+        if name.startswith("heading ") and name[8:].isdigit():
+            own[style_id] = int(name[8:])
+        elif outline is not None:
+            own[style_id] = _outline_level(outline)
+        else:
+            own[style_id] = None
+        parent = style.find(W + "basedOn")
+        if parent is not None:
+            based_on[style_id] = parent.get(W + "val")
+
+    levels = {}
+    for style_id in own:
+        seen = set()
+        current: Optional[str] = style_id
+        while current in own and own[current] is None and current not in seen:
+            seen.add(current)
+            current = based_on.get(current)
+        level = own.get(current)
+        if level:
+            levels[style_id] = min(level, MAX_HEADING_LEVEL)
+    return levels
+
+
+def _outline_level(element: etree._Element) -> Optional[int]:
+    """1-based level of a w:outlineLvl, or None for body text (level 9)."""
+    value = element.get(W + "val")
+    if value is None or not value.isdigit() or int(value) > 8:
+        return None
+    return int(value) + 1
+
+
+def paragraph_heading_level(paragraph: etree._Element, styles: Dict[str, int]) -> Optional[int]:
+    """Heading level of a w:p from its outline level or style, or None."""
+    properties = paragraph.find(W + "pPr")
+    if properties is None:
+        return None
+    outline = properties.find(W + "outlineLvl")
+    if outline is not None:
+        level = _outline_level(outline)
+        return min(level, MAX_HEADING_LEVEL) if level else None
+    style = properties.find(W + "pStyle")
+    return styles.get(style.get(W + "val")) if style is not None else None
+
+
+def paragraph_text(paragraph: etree._Element) -> str:
+    """Text of a w:p element: its runs' text, tabs and line breaks."""
+    parts = []
+    for node in paragraph.iter(*TEXT_TAGS):
+        text = TEXT_TAGS[node.tag]
+        parts.append((node.text or "") if text is None else text)
+    return "".join(parts)
+
+
+def iter_docx_blocks(file_path: Path) -> Iterator[str]:
+    """Stream a DOCX's paragraphs and table rows in document order.
+
+    word/document.xml is parsed incrementally straight from the zip, and
+    each top-level paragraph or table is discarded once emitted, so memory
+    stays flat however long the document is. Table rows are emitted as
+    " | "-joined cells (each cell once, even when merged); nested tables
+    become lines of their enclosing cell. Paragraphs in heading styles are
+    emitted as Markdown headings ("## Title"), so chunking can follow them.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        part = main_part_name(archive)
+        styles = heading_levels(archive, part)
+        with archive.open(part) as xml:
+            # Per open table: the rows' cells, and the current cell's lines
+            cells: List[List[str]] = []
+            lines: List[List[str]] = []
+
+            for event, element in etree.iterparse(
+                xml,
+                events=("start", "end"),
+                tag=(W + "p", W + "tbl", W + "tr", W + "tc"),
+            ):
+                tag = element.tag
+                if event == "start":
+                    if tag == W + "tbl":
+                        cells.append([])
+                    elif tag == W + "tc":
+                        lines.append([])
+                    continue
+
+                if tag == W + "p":
+                    text = paragraph_text(element)
+                    level = None if lines else paragraph_heading_level(element, styles)
+                    element.clear()  # Text boxes nest paragraphs; don't read them twice
+                    if lines:
+                        lines[-1].append(text)
+                    elif text.strip():
+                        yield f"{'#' * level} {text.strip()}" if level else text
+                elif tag == W + "tc":
+                    text = "\n".join(line for line in lines.pop() if line.strip())
+                    if text:
+                        cells[-1].append(text)
+                elif tag == W + "tr":
+                    row = " | ".join(cells[-1])
+                    cells[-1] = []
+                    if lines:
+                        lines[-1].append(row)
+                    elif row:
+                        yield row
+                else:
+                    cells.pop()
+
+                parent = element.getparent()
+                if not cells and parent is not None and parent.tag == W + "body":
+                    # Drop finished top-level blocks
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del parent[0]
+
 
 class DOCXLoader(BaseLoader):
     """Loader for Microsoft Word documents (.docx)."""
@@ -10,27 +182,14 @@ class DOCXLoader(BaseLoader):
     def __init__(self, file_path: Path):
         super().__init__(file_path)
 
+    def iter_blocks(self) -> Iterator[str]:
+        """Paragraphs and table rows in document order."""
+        return iter_docx_blocks(self.file_path)
+
     def extract_text(self) -> str:
         """Extract text from DOCX file."""
         try:
-            doc = DocxDocument(self.file_path)
-            paragraphs = []
-
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    paragraphs.append(paragraph.text)
-
-            # Also extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text)
-                    if row_text:
-                        paragraphs.append(" | ".join(row_text))
-
-            return "\n\n".join(paragraphs)
+            return "\n\n".join(self.iter_blocks())
         except Exception as e:
             raise Exception(f"Failed to extract text from DOCX: {e}")
 
@@ -1,7 +1,101 @@
+import codecs
+import mmap
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, Union
 from src.loaders.base_loader import BaseLoader
 from src.models.document import Document
 
+# Files at least this large are memory-mapped instead of read into a bytes copy
+MMAP_THRESHOLD = 1 << 20
+# Bytes inspected to choose an encoding
+SAMPLE_SIZE = 64 * 1024
+# Characters per slice when counting words, so no full word list is built
+WORD_COUNT_SLICE = 1 << 20
+
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Tried in order when the file isn't valid UTF-8; latin-1 decodes any bytes
+FALLBACK_ENCODINGS = ("cp1252", "latin-1")
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Pick an encoding from a file's first bytes: BOM, then UTF-8, then cp1252/latin-1."""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def decode_text(data: Union[bytes, mmap.mmap]) -> str:
+    """Decode file bytes in one pass, with newlines normalized to \\n.
+
+    If the encoding chosen from the sample fails further into the file, the
+    file is decoded with a fallback encoding instead; a plain-ASCII prefix
+    decodes the same either way, so only the bytes from there on are decoded
+    again.
+    """
+    encoding = detect_encoding(bytes(data[:SAMPLE_SIZE]))
+    with memoryview(data) as view:
+        try:
+            text = str(view, encoding)
+        except UnicodeDecodeError as e:
+            head = bytes(view[:e.start])
+            start = e.start if head.isascii() else 0
+            text = (head.decode("ascii") if start else "") + _decode_fallback(view[start:])
+
+    # Same result as reading in text mode (universal newlines)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+        if "\r" in text:
+            text = text.replace("\r", "\n")
+    return text
+
+
+def _decode_fallback(data: memoryview) -> str:
+    for encoding in FALLBACK_ENCODINGS[:-1]:
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError:
+            continue
+    return str(data, FALLBACK_ENCODINGS[-1])
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words, a slice at a time."""
+    count = 0
+    start = 0
+    while start < len(text):
+        end = start + WORD_COUNT_SLICE
+        if end < len(text):
+            # Cut at whitespace so no word is split across slices
+            space = text.find(" ", end)
+            end = len(text) if space == -1 else space
+        count += len(text[start:end].split())
+        start = end
+    return count
+
 
 class TextLoader(BaseLoader):
     """Loader for text files (.txt, .md)."""
@@ -9,20 +103,26 @@ class TextLoader(BaseLoader):
     def __init__(self, file_path: Path):
         super().__init__(file_path)
 
+    @contextmanager
+    def _read_bytes(self) -> Iterator[Union[bytes, mmap.mmap]]:
+        """The file's bytes: memory-mapped when large, read at once when small."""
+        with open(self.file_path, "rb") as f:
+            size = f.seek(0, 2)
+            if size < MMAP_THRESHOLD:
+                f.seek(0)
+                yield f.read()
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
     def extract_text(self) -> str:
-        """Extract text from text file."""
-        encodings = ["utf-8", "ascii", "latin-1", "cp1252"]
-
-        for encoding in encodings:
-            try:
-                with open(self.file_path, "r", encoding=encoding) as f:
-                    return f.read()
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-
-        raise ValueError(
-            f"Could not decode file {self.file_path} with any of the attempted encodings: {encodings}"
-        )
+        """Extract text from text file.
+
+        The file is read once and decoded in a single pass; the encoding is
+        chosen from a BOM or a sample of the content.
+        """
+        with self._read_bytes() as data:
+            return decode_text(data)
 
     def load(self) -> Document:
         """Load the text document."""
@@ -31,5 +131,5 @@ class TextLoader(BaseLoader):
         return Document.from_file(
             self.file_path,
             content,
-            word_count=len(content.split()),
+            word_count=count_words(content),
         )
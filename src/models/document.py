@@ -1,7 +1,9 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple, Union
+from array import array
 from datetime import datetime
 from pathlib import Path
-from pydantic import BaseModel, Field
+import hashlib
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DocumentMetadata(BaseModel):
@@ -28,20 +30,89 @@ class DocumentChunk(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+def chunk_id(doc_id: str, chunk_index: int) -> str:
+    """Stable id of a document's nth chunk."""
+    return hashlib.md5(f"{doc_id}_{chunk_index}".encode()).hexdigest()
+
+
+class DocumentChunks(Sequence[DocumentChunk]):
+    """A document's chunks, stored as (start, end) offsets into its content.
+
+    Chunk text is sliced from the content when needed rather than copied
+    into every chunk, and ids are derived from the position. Indexing or
+    iterating builds DocumentChunk models for callers that want them;
+    ingestion uses texts() and ids() directly.
+
+    `heading_paths`, from structure-aware chunking, gives each chunk's
+    heading path ("Guide > Core Concepts > Pods"; "" for none).
+    """
+
+    __slots__ = ("content", "doc_id", "source_file", "starts", "ends", "heading_paths")
+
+    def __init__(
+        self,
+        content: str,
+        doc_id: str,
+        source_file: str,
+        spans: Sequence[Tuple[int, int]] = (),
+        heading_paths: Optional[List[str]] = None,
+    ):
+        self.content = content
+        self.doc_id = doc_id
+        self.source_file = source_file
+        self.starts = array("q", (start for start, _ in spans))
+        self.ends = array("q", (end for _, end in spans))
+        self.heading_paths = heading_paths
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        metadata: Dict[str, Any] = {"total_chunks": len(self)}
+        if self.heading_paths and self.heading_paths[index]:
+            metadata["heading_path"] = self.heading_paths[index]
+        return DocumentChunk(
+            chunk_id=chunk_id(self.doc_id, index),
+            text=self.text(index),
+            chunk_index=index,
+            source_file=self.source_file,
+            metadata=metadata,
+        )
+
+    def __iter__(self) -> Iterator[DocumentChunk]:
+        return (self[i] for i in range(len(self)))
+
+    def text(self, index: int) -> str:
+        return self.content[self.starts[index]:self.ends[index]]
+
+    def texts(self) -> List[str]:
+        content = self.content
+        return [content[start:end] for start, end in zip(self.starts, self.ends)]
+
+    def ids(self) -> List[str]:
+        return [chunk_id(self.doc_id, i) for i in range(len(self))]
+
+
 class Document(BaseModel):
     """Represents a processed document."""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     doc_id: str
     content: str
     metadata: DocumentMetadata
-    chunks: List[DocumentChunk] = Field(default_factory=list)
+    chunks: Union[DocumentChunks, List[DocumentChunk]] = Field(default_factory=list)
     processed_at: datetime = Field(default_factory=datetime.now)
 
     @classmethod
     def from_file(cls, file_path: Path, content: str, **kwargs) -> "Document":
         """Create a Document from a file path and content."""
-        import hashlib
-
         doc_id = hashlib.md5(str(file_path).encode()).hexdigest()
         metadata = DocumentMetadata(
             filename=file_path.name,
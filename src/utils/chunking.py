@@ -1,7 +1,22 @@
-from typing import List
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from src.utils.config import config
 
+SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+# For code blocks too long for one chunk: split between lines, never mid-sentence
+CODE_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+# ATX headings ("## Title", optional closing #s) and code fence openers
+HEADING = re.compile(r" {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+LINE = re.compile(r"[^\n]*\n?")
+
+# Separator of heading titles in a heading path
+HEADING_PATH_SEPARATOR = " > "
+
+Span = Tuple[int, int]
+
 
 def create_text_splitter() -> RecursiveCharacterTextSplitter:
     """Create a text splitter with configured chunk size and overlap."""
@@ -9,15 +24,310 @@ def create_text_splitter() -> RecursiveCharacterTextSplitter:
         chunk_size=config.chunk_size,
         chunk_overlap=config.chunk_overlap,
         length_function=len,
-        separators=["\n\n", "\n", ". ", " ", ""],
+        separators=SEPARATORS,
         is_separator_regex=False,
     )
 
 
 def chunk_text(text: str) -> List[str]:
     """Split text into chunks using the configured splitter."""
-    splitter = create_text_splitter()
-    return splitter.split_text(text)
+    return [text[start:end] for start, end in chunk_spans(text)]
+
+
+def chunk_spans(
+    text: str,
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    separators: Sequence[str] = SEPARATORS,
+) -> List[Span]:
+    """Split text into chunks, returned as (start, end) offsets into `text`.
+
+    Produces the same chunks as create_text_splitter() (recursive splitting
+    that keeps separators, with whitespace stripped), but works on offsets,
+    so no substring is copied while splitting and merging.
+    """
+    splitter = _SpanSplitter(
+        config.chunk_size if chunk_size is None else chunk_size,
+        config.chunk_overlap if chunk_overlap is None else chunk_overlap,
+    )
+    return splitter.split(text, 0, len(text), _compile(separators))
+
+
+class Section(NamedTuple):
+    start: int
+    end: int
+    path: Tuple[str, ...]  # Titles of the enclosing headings, outermost first
+    fences: List[Span]  # Fenced code blocks, including the fence lines
+
+
+def markdown_sections(text: str) -> List[Section]:
+    """Split Markdown into sections at ATX headings.
+
+    Each section runs from its heading line to the next heading of any
+    level; text before the first heading is a section with an empty path.
+    Lines inside fenced code blocks are never headings, so a shell comment
+    in a ```bash block doesn't start a section.
+    """
+    sections: List[Section] = []
+    stack: List[Tuple[int, str]] = []  # (level, title) of the open headings
+    start = 0
+    fences: List[Span] = []
+    fence: Optional[str] = None  # Marker of the open fence
+    fence_start = 0
+
+    for match in LINE.finditer(text):
+        line_start, line_end = match.span()
+        if line_start == line_end:
+            break
+        line = match.group().rstrip("\n")
+
+        if fence is not None:
+            # A closing fence uses the same character, at least as many, and no info string
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fences.append((fence_start, line_end))
+                fence = None
+            continue
+        opener = FENCE.match(line)
+        if opener:
+            fence, fence_start = opener.group(1), line_start
+            continue
+
+        heading = HEADING.match(line)
+        if heading:
+            if line_start > start:
+                sections.append(Section(start, line_start, tuple(title for _, title in stack), fences))
+            level = len(heading.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, heading.group(2)))
+            start = line_start
+            fences = []
+
+    if fence is not None:
+        # An unclosed fence runs to the end of the document
+        fences.append((fence_start, len(text)))
+    if len(text) > start:
+        sections.append(Section(start, len(text), tuple(title for _, title in stack), fences))
+    return sections
+
+
+def chunk_sections(
+    text: str,
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+) -> Tuple[List[Span], List[str]]:
+    """Split Markdown into chunks that follow its heading structure.
+
+    Returns chunk spans and, for each chunk, its heading path
+    ("Guide > Core Concepts > Pods"). A heading with everything under it
+    becomes one chunk when it fits; otherwise its own text and its
+    subsections are packed in order into chunks that stay under that
+    heading. Sections too long for one chunk are split on their own, with
+    fenced code blocks kept whole when they fit.
+    """
+    return _SectionChunker(
+        text,
+        config.chunk_size if chunk_size is None else chunk_size,
+        config.chunk_overlap if chunk_overlap is None else chunk_overlap,
+    ).chunk()
+
+
+class _SectionChunker:
+    """Packs a Markdown document's heading tree into chunks."""
+
+    def __init__(self, text: str, chunk_size: int, chunk_overlap: int):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.sections = markdown_sections(text)
+        self.splitter = _SpanSplitter(chunk_size, chunk_overlap)
+        self.splitter.text = text
+        self.prose = _compile(SEPARATORS)
+        self.code = _compile(CODE_SEPARATORS)
+        self.spans: List[Span] = []
+        self.paths: List[Tuple[str, ...]] = []
+        # Whether the last chunk holds whole subtrees and may take another
+        self.open = False
+
+    def chunk(self) -> Tuple[List[Span], List[str]]:
+        self._pack(0, len(self.sections), None)
+        return self.spans, [HEADING_PATH_SEPARATOR.join(path) for path in self.paths]
+
+    def _subtree_end(self, index: int) -> int:
+        """Index of the first section after `index` that isn't below its heading."""
+        path = self.sections[index].path
+        end = index + 1
+        while end < len(self.sections):
+            other = self.sections[end].path
+            if len(other) <= len(path) or other[:len(path)] != path:
+                break
+            end += 1
+        return end
+
+    def _pack(self, first: int, stop: int, lead: Optional[Section]):
+        """Chunk sibling subtrees sections[first:stop], after their parent's own text `lead`."""
+        self.open = False
+        if lead is not None:
+            whole = _strip(self.text, lead.start, lead.end)
+            if whole is not None and whole[1] - whole[0] <= self.chunk_size:
+                self._add_whole(whole, lead.path)
+            elif whole is not None:
+                self._split(lead)
+
+        index = first
+        while index < stop:
+            end = self._subtree_end(index)
+            section = self.sections[index]
+            whole = _strip(self.text, section.start, self.sections[end - 1].end)
+            if whole is not None and whole[1] - whole[0] <= self.chunk_size:
+                self._add_whole(whole, section.path)
+            elif whole is not None:
+                self._pack(index + 1, end, section)
+                self.open = False
+            index = end
+
+    def _add_whole(self, span: Span, path: Tuple[str, ...]):
+        if self.open and span[1] - self.spans[-1][0] <= self.chunk_size:
+            self.spans[-1] = (self.spans[-1][0], span[1])
+            self.paths[-1] = _common_prefix(self.paths[-1], path)
+        else:
+            self.spans.append(span)
+            self.paths.append(path)
+            self.open = True
+
+    def _split(self, section: Section):
+        """Chunk a section too long for one chunk: prose and code blocks apart,
+        then neighbouring pieces that fit packed together."""
+        self.open = False
+        text = self.text
+        pieces: List[Span] = []
+        position = section.start
+        for fence_start, fence_end in section.fences + [(section.end, section.end)]:
+            pieces.extend(self.splitter._split(position, fence_start, self.prose))
+            block = _strip(text, fence_start, fence_end)
+            if block is not None:
+                if block[1] - block[0] <= self.chunk_size:
+                    pieces.append(block)
+                else:
+                    pieces.extend(self.splitter._split(fence_start, fence_end, self.code))
+            position = fence_end
+
+        first = len(self.spans)
+        for piece in pieces:
+            last = self.spans[-1] if len(self.spans) > first else None
+            if last and piece[0] >= last[1] and piece[1] - last[0] <= self.chunk_size:
+                self.spans[-1] = (last[0], piece[1])
+            else:
+                self.spans.append(piece)
+                self.paths.append(section.path)
+
+        # A heading line left on its own adds nothing the heading path doesn't
+        line_end = text.find("\n", section.start, section.end)
+        heading = _strip(text, section.start, section.end if line_end == -1 else line_end)
+        if section.path and len(self.spans) > first + 1 and self.spans[first] == heading:
+            del self.spans[first]
+            del self.paths[first]
+
+
+def with_heading_path(text: str, heading_path: str) -> str:
+    """Chunk text as embedded: its heading path on the first line, when it has one."""
+    return f"{heading_path}\n{text}" if heading_path else text
+
+
+def _compile(separators: Sequence[str]):
+    return [(sep, re.compile(re.escape(sep)) if sep else None) for sep in separators]
+
+
+def _common_prefix(a: Tuple[str, ...], b: Tuple[str, ...]) -> Tuple[str, ...]:
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return a[:n]
+
+
+def _strip(text: str, start: int, end: int) -> Optional[Span]:
+    """The span without surrounding whitespace, or None if it is only whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if end > start else None
+
+
+class _SpanSplitter:
+    """RecursiveCharacterTextSplitter's algorithm on (start, end) spans."""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.text = ""
+
+    def split(self, text: str, start: int, end: int, patterns) -> List[Span]:
+        self.text = text
+        return self._split(start, end, patterns)
+
+    def _split(self, start: int, end: int, patterns) -> List[Span]:
+        # Use the first separator that occurs in this span
+        pattern = None
+        remaining = []
+        for i, (sep, compiled) in enumerate(patterns):
+            if not sep:
+                break
+            if compiled.search(self.text, start, end):
+                pattern = compiled
+                remaining = patterns[i + 1:]
+                break
+
+        chunks: List[Span] = []
+        good: List[Span] = []
+        for piece_start, piece_end in self._pieces(start, end, pattern):
+            if piece_end - piece_start < self.chunk_size:
+                good.append((piece_start, piece_end))
+                continue
+            if good:
+                chunks.extend(self._merge(good))
+                good = []
+            if remaining:
+                chunks.extend(self._split(piece_start, piece_end, remaining))
+            else:
+                chunks.append((piece_start, piece_end))
+        if good:
+            chunks.extend(self._merge(good))
+        return chunks
+
+    def _pieces(self, start: int, end: int, pattern) -> List[Span]:
+        """Split a span before each separator (separators stay with the next piece)."""
+        if pattern is None:
+            return [(i, i + 1) for i in range(start, end)]
+        bounds = [start]
+        bounds.extend(m.start() for m in pattern.finditer(self.text, start, end))
+        bounds.append(end)
+        return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+    def _merge(self, pieces: List[Span]) -> List[Span]:
+        """Combine consecutive pieces into chunks of up to chunk_size, with overlap."""
+        chunks = []
+        current: List[Span] = []
+        first = 0  # index into current of the first piece still in the window
+        total = 0
+        for piece_start, piece_end in pieces:
+            length = piece_end - piece_start
+            if total + length > self.chunk_size and len(current) > first:
+                self._emit(current[first][0], current[-1][1], chunks)
+                while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                    total -= current[first][1] - current[first][0]
+                    first += 1
+            current.append((piece_start, piece_end))
+            total += length
+        if len(current) > first:
+            self._emit(current[first][0], current[-1][1], chunks)
+        return chunks
+
+    def _emit(self, start: int, end: int, chunks: List[Span]):
+        # Strip surrounding whitespace; drop chunks that are only whitespace
+        span = _strip(self.text, start, end)
+        if span is not None:
+            chunks.append(span)
 
 
 def chunk_documents(documents: List[str]) -> List[str]:
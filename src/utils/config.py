@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -14,6 +14,12 @@ class Config(BaseModel):
     ollama_base_url: str = Field(default="http://localhost:11434")
     ollama_chat_model: str = Field(default="llama3.1:8b")
     ollama_embedding_model: str = Field(default="nomic-embed-text")
+    ollama_keep_alive: str = Field(default="30m")
+
+    # Chat settings ("chat" uses Ollama's /api/chat, "generate" a flat prompt)
+    chat_api: str = Field(default="chat")
+    chat_system_prompt: str = Field(default="You are a helpful AI assistant.")
+    ollama_chat_hosts: List[str] = Field(default_factory=list)
 
     # Vector store settings
     vector_store_path: Path = Field(default=Path("./data/vector_db"))
@@ -22,21 +28,74 @@ class Config(BaseModel):
     # ChromaDB server settings (optional, for server mode)
     chroma_host: Optional[str] = Field(default=None)
     chroma_port: int = Field(default=8000)
+    vector_store_socket: Optional[Path] = Field(default=None)
+    # Compact storage: index the first N embedding dimensions, rescore with full ones (0 = off)
+    embedding_index_dimensions: int = Field(default=0)
+    embedding_rescore_factor: int = Field(default=4)
+    # Persistent cache of document embeddings (0 MB = off)
+    embedding_cache_path: Path = Field(default=Path("./data/embedding_cache.sqlite"))
+    embedding_cache_max_mb: float = Field(default=2048.0)
+    # Embedding backend: "ollama" or "sentence-transformers" (in-process on CPU)
+    embedding_backend: str = Field(default="ollama")
+    local_embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2")
+    embedding_batch_size: int = Field(default=32)
+    embedding_workers: int = Field(default=0)
 
     # Chunking settings
     chunk_size: int = Field(default=800)
     chunk_overlap: int = Field(default=150)
+    structured_chunking: bool = Field(default=True)
 
     # RAG settings
     retrieval_top_k: int = Field(default=5)
     similarity_threshold: float = Field(default=0.7)
+    # Cross-encoder reranking: score rerank_candidates chunks, keep rerank_top_k
+    rerank_enabled: bool = Field(default=False)
+    rerank_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    rerank_candidates: int = Field(default=20)
+    rerank_top_k: int = Field(default=3)
+    rerank_batch_size: int = Field(default=32)
 
     # Session settings
+    session_backend: str = Field(default="file")
     session_storage_path: Path = Field(default=Path("./data/sessions"))
+    session_sqlite_path: Path = Field(default=Path("./data/sessions.db"))
+    session_redis_url: str = Field(default="redis://localhost:6379/0")
     max_session_history: int = Field(default=50)
+    history_token_budget: int = Field(default=2048)
+    history_summary_enabled: bool = Field(default=True)
 
     # Document processing
     max_file_size_mb: int = Field(default=100)
+    sync_manifest_path: Path = Field(default=Path("./data/sync_manifest.json"))
+    watch_debounce_seconds: float = Field(default=2.0)
+
+    # Streaming settings
+    stream_flush_interval_ms: float = Field(default=50.0)
+    stream_flush_max_chars: int = Field(default=512)
+
+    # Generation limits (0 = unlimited); requests may ask for less, not more
+    generation_timeout_seconds: float = Field(default=300.0)
+    generation_max_tokens: int = Field(default=0)
+    # Let identical concurrent RAG questions share one generation
+    singleflight_generations: bool = Field(default=False)
+
+    # LLM scheduler: concurrent calls per model (0 = unlimited), per-model
+    # overrides, and the queue wait above which interactive requests get 429
+    scheduler_max_inflight: int = Field(default=4)
+    scheduler_model_limits: Dict[str, int] = Field(default_factory=dict)
+    scheduler_queue_budget_seconds: float = Field(default=30.0)
+    scheduler_max_wait_seconds: float = Field(default=120.0)
+
+    # API startup: warm models and indexes before reporting ready
+    warmup_on_startup: bool = Field(default=True)
+    readiness_cache_seconds: float = Field(default=5.0)
+
+    # Tracing settings
+    tracing_enabled: bool = Field(default=True)
+    trace_log_path: Optional[Path] = Field(default=None)
+    trace_log_max_mb: int = Field(default=10)
+    trace_log_backups: int = Field(default=5)
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -45,19 +104,72 @@ class Config(BaseModel):
             ollama_base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
             ollama_chat_model=os.getenv("OLLAMA_CHAT_MODEL", "llama3.1:8b"),
             ollama_embedding_model=os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text"),
+            ollama_keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+            chat_api=os.getenv("CHAT_API", "chat"),
+            chat_system_prompt=os.getenv("CHAT_SYSTEM_PROMPT", "You are a helpful AI assistant."),
+            ollama_chat_hosts=[h.strip() for h in os.getenv("OLLAMA_CHAT_HOSTS", "").split(",") if h.strip()],
             vector_store_path=Path(os.getenv("VECTOR_STORE_PATH", "./data/vector_db")),
             collection_name=os.getenv("COLLECTION_NAME", "documents"),
             chroma_host=os.getenv("CHROMA_HOST"),
             chroma_port=int(os.getenv("CHROMA_PORT", "8000")),
+            vector_store_socket=Path(os.environ["VECTOR_STORE_SOCKET"]) if os.getenv("VECTOR_STORE_SOCKET") else None,
+            embedding_index_dimensions=int(os.getenv("EMBEDDING_INDEX_DIMENSIONS", "0")),
+            embedding_rescore_factor=int(os.getenv("EMBEDDING_RESCORE_FACTOR", "4")),
+            embedding_cache_path=Path(os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.sqlite")),
+            embedding_cache_max_mb=float(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048")),
+            embedding_backend=os.getenv("EMBEDDING_BACKEND", "ollama"),
+            local_embedding_model=os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+            embedding_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+            embedding_workers=int(os.getenv("EMBEDDING_WORKERS", "0")),
             chunk_size=int(os.getenv("CHUNK_SIZE", "800")),
             chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "150")),
+            structured_chunking=os.getenv("STRUCTURED_CHUNKING", "true").lower() in ("1", "true", "yes"),
             retrieval_top_k=int(os.getenv("RETRIEVAL_TOP_K", "5")),
             similarity_threshold=float(os.getenv("SIMILARITY_THRESHOLD", "0.7")),
+            rerank_enabled=os.getenv("RERANK_ENABLED", "false").lower() in ("1", "true", "yes"),
+            rerank_model=os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            rerank_candidates=int(os.getenv("RERANK_CANDIDATES", "20")),
+            rerank_top_k=int(os.getenv("RERANK_TOP_K", "3")),
+            rerank_batch_size=int(os.getenv("RERANK_BATCH_SIZE", "32")),
+            session_backend=os.getenv("SESSION_BACKEND", "file"),
             session_storage_path=Path(os.getenv("SESSION_STORAGE_PATH", "./data/sessions")),
+            session_sqlite_path=Path(os.getenv("SESSION_SQLITE_PATH", "./data/sessions.db")),
+            session_redis_url=os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0"),
             max_session_history=int(os.getenv("MAX_SESSION_HISTORY", "50")),
+            history_token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "2048")),
+            history_summary_enabled=os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() in ("1", "true", "yes"),
             max_file_size_mb=int(os.getenv("MAX_FILE_SIZE_MB", "100")),
+            sync_manifest_path=Path(os.getenv("SYNC_MANIFEST_PATH", "./data/sync_manifest.json")),
+            watch_debounce_seconds=float(os.getenv("WATCH_DEBOUNCE_SECONDS", "2.0")),
+            stream_flush_interval_ms=float(os.getenv("STREAM_FLUSH_INTERVAL_MS", "50")),
+            stream_flush_max_chars=int(os.getenv("STREAM_FLUSH_MAX_CHARS", "512")),
+            generation_timeout_seconds=float(os.getenv("GENERATION_TIMEOUT_SECONDS", "300")),
+            generation_max_tokens=int(os.getenv("GENERATION_MAX_TOKENS", "0")),
+            singleflight_generations=os.getenv("SINGLEFLIGHT_GENERATIONS", "false").lower() in ("1", "true", "yes"),
+            scheduler_max_inflight=int(os.getenv("SCHEDULER_MAX_INFLIGHT", "4")),
+            scheduler_model_limits={
+                model.strip(): int(limit)
+                for model, _, limit in (
+                    item.rpartition("=") for item in os.getenv("SCHEDULER_MODEL_LIMITS", "").split(",") if item.strip()
+                )
+            },
+            scheduler_queue_budget_seconds=float(os.getenv("SCHEDULER_QUEUE_BUDGET_SECONDS", "30")),
+            scheduler_max_wait_seconds=float(os.getenv("SCHEDULER_MAX_WAIT_SECONDS", "120")),
+            warmup_on_startup=os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes"),
+            readiness_cache_seconds=float(os.getenv("READINESS_CACHE_SECONDS", "5")),
+            tracing_enabled=os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes"),
+            trace_log_path=Path(os.environ["TRACE_LOG_PATH"]) if os.getenv("TRACE_LOG_PATH") else None,
+            trace_log_max_mb=int(os.getenv("TRACE_LOG_MAX_MB", "10")),
+            trace_log_backups=int(os.getenv("TRACE_LOG_BACKUPS", "5")),
         )
 
+    @property
+    def embedding_model(self) -> str:
+        """Name of the embedding model of the selected backend."""
+        if self.embedding_backend.lower() == "ollama":
+            return self.ollama_embedding_model
+        return self.local_embedding_model
+
     def ensure_directories(self):
         """Create necessary directories if they don't exist."""
         self.vector_store_path.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,230 @@
+import time
+from contextlib import contextmanager
+from typing import Generator, Iterable, Iterator, TypeVar
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from src.utils.tracing import record_span
+
+T = TypeVar("T")
+
+# Buckets in seconds, from fast local operations up to long generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+RATE_BUCKETS = (1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 400)
+
+
+# Document processing
+LOADER_PARSE_SECONDS = Histogram(
+    "docai_loader_parse_seconds",
+    "Time spent extracting text from a document",
+    ["file_type"],
+    buckets=LATENCY_BUCKETS,
+)
+CHUNKING_SECONDS = Histogram(
+    "docai_chunking_seconds",
+    "Time spent splitting document text into chunks",
+    buckets=LATENCY_BUCKETS,
+)
+CHUNKS_CREATED = Counter(
+    "docai_chunks_created_total",
+    "Number of chunks produced by the document processor",
+)
+
+# Embeddings
+EMBEDDING_SECONDS = Histogram(
+    "docai_embedding_seconds",
+    "Time spent generating embeddings",
+    ["operation", "batch_size"],
+    buckets=LATENCY_BUCKETS,
+)
+EMBEDDED_TEXTS = Counter(
+    "docai_embedded_texts_total",
+    "Number of texts sent for embedding",
+    ["operation"],
+)
+
+# Vector store
+VECTOR_STORE_SECONDS = Histogram(
+    "docai_vector_store_seconds",
+    "Time spent in ChromaDB operations (excluding embedding), per namespace",
+    ["operation", "namespace"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Reranking
+RERANK_SECONDS = Histogram(
+    "docai_rerank_seconds",
+    "Time spent scoring retrieved chunks with the cross-encoder",
+    ["batch_size"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# LLM generation
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "docai_llm_time_to_first_token_seconds",
+    "Time from sending a prompt to receiving the first streamed token",
+    ["component"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_GENERATION_SECONDS = Histogram(
+    "docai_llm_generation_seconds",
+    "Total time of an LLM generation",
+    ["component"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "docai_llm_tokens_per_second",
+    "Streamed tokens per second after the first token",
+    ["component"],
+    buckets=RATE_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "docai_llm_tokens_total",
+    "Number of streamed tokens received from the LLM",
+    ["component"],
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "docai_llm_prompt_tokens",
+    "Estimated prompt size in tokens",
+    ["component"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384),
+)
+LLM_REQUESTS = Counter(
+    "docai_llm_requests_total",
+    "Number of LLM generations by outcome",
+    ["component", "status"],
+)
+LLM_GENERATION_ABORTS = Counter(
+    "docai_llm_generation_aborts_total",
+    "Streamed generations stopped early, by reason (disconnect or timeout)",
+    ["component", "reason"],
+)
+
+# LLM scheduler
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "docai_scheduler_wait_seconds",
+    "Time spent queued for an LLM or embedding slot",
+    ["model", "priority"],
+    buckets=LATENCY_BUCKETS,
+)
+SCHEDULER_IN_FLIGHT = Gauge(
+    "docai_scheduler_in_flight",
+    "LLM and embedding calls holding a slot",
+    ["model"],
+)
+SCHEDULER_REJECTED = Counter(
+    "docai_scheduler_rejected_total",
+    "Requests rejected with 429 because the queue exceeded its latency budget",
+    ["component"],
+)
+
+# Sessions and caches
+ACTIVE_SESSIONS = Gauge(
+    "docai_active_sessions",
+    "Number of chat sessions in the session store",
+)
+CACHE_REQUESTS = Counter(
+    "docai_cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss)",
+    ["cache", "result"],
+)
+EMBEDDING_CACHE_BYTES = Gauge(
+    "docai_embedding_cache_bytes",
+    "Approximate size of the persistent embedding cache",
+)
+EMBEDDING_CACHE_EVICTIONS = Counter(
+    "docai_embedding_cache_evictions_total",
+    "Entries evicted from the persistent embedding cache to stay under its size limit",
+)
+SINGLEFLIGHT_REQUESTS = Counter(
+    "docai_singleflight_requests_total",
+    "Calls that ran a computation (leader) or joined an identical one in flight (shared)",
+    ["operation", "result"],
+)
+
+
+def batch_size_label(size: int) -> str:
+    """Bucket a batch size into a low-cardinality label."""
+    if size <= 1:
+        return "1"
+    if size <= 8:
+        return "2-8"
+    if size <= 32:
+        return "9-32"
+    if size <= 128:
+        return "33-128"
+    return "129+"
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Record a cache hit or miss."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels) -> Iterator[None]:
+    """Time the enclosed block into a histogram."""
+    metric = histogram.labels(**labels) if labels else histogram
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_llm_call(component: str) -> Iterator[None]:
+    """Time a blocking (non-streaming) LLM call."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LLM_REQUESTS.labels(component=component, status="error").inc()
+        raise
+    duration = time.perf_counter() - start
+    LLM_GENERATION_SECONDS.labels(component=component).observe(duration)
+    record_span("llm_completion", start, duration)
+    LLM_REQUESTS.labels(component=component, status="ok").inc()
+
+
+def observe_llm_stream(stream: Iterable[T], component: str) -> Generator[T, None, None]:
+    """Wrap an LLM token stream and record TTFT, tokens/s and total time."""
+    start = time.perf_counter()
+    first_token_at = None
+    tokens = 0
+    status = "ok"
+
+    try:
+        for token in stream:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(component=component).observe(
+                    first_token_at - start
+                )
+                record_span("llm_first_token", start, first_token_at - start)
+            tokens += 1
+            yield token
+    except GeneratorExit:
+        status = "cancelled"
+        # Close the upstream now rather than on garbage collection, so the
+        # HTTP response is closed and Ollama stops generating
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+        raise
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        end = time.perf_counter()
+        LLM_GENERATION_SECONDS.labels(component=component).observe(end - start)
+        record_span("llm_completion", start, end - start)
+        LLM_REQUESTS.labels(component=component, status=status).inc()
+        LLM_TOKENS.labels(component=component).inc(tokens)
+        if first_token_at is not None and tokens > 1 and end > first_token_at:
+            LLM_TOKENS_PER_SECOND.labels(component=component).observe(
+                (tokens - 1) / (end - first_token_at)
+            )
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text exposition format."""
+    return generate_latest(), CONTENT_TYPE_LATEST
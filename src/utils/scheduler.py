@@ -0,0 +1,214 @@
+"""
+Admission control and priority scheduling for LLM and embedding calls.
+
+Every call to Ollama takes a slot from its model's queue first. Each model
+allows a limited number of calls in flight; waiting calls are served by
+priority class (interactive > ingest > batch) and, within a class, round-robin
+across flows (chat sessions, clients), so one long summarization can't hold
+up chat users and one busy session can't hold up the others.
+
+The API asks for admission before starting interactive work: when the
+estimated queue wait exceeds SCHEDULER_QUEUE_BUDGET_SECONDS it answers 429
+with Retry-After instead of letting the request wait. A call that still
+waits longer than SCHEDULER_MAX_WAIT_SECONDS for its slot gives up with
+SchedulerBusy, so a wedged queue can't hold a worker thread forever.
+
+Waiting blocks the calling thread: never take a slot on the event loop.
+
+Queues are per process; with several API workers each one enforces its own
+limits.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from src.utils.config import config
+from src.utils.metrics import SCHEDULER_IN_FLIGHT, SCHEDULER_REJECTED, SCHEDULER_WAIT_SECONDS
+from src.utils.tracing import span
+
+T = TypeVar("T")
+
+INTERACTIVE = 0
+INGEST = 1
+BATCH = 2
+PRIORITY_NAMES = ("interactive", "ingest", "batch")
+
+# Component -> (model setting, priority class)
+COMPONENTS: Dict[str, Tuple[str, int]] = {
+    "chat": ("ollama_chat_model", INTERACTIVE),
+    "rag": ("ollama_chat_model", INTERACTIVE),
+    "embed_query": ("embedding_model", INTERACTIVE),
+    "embed_documents": ("embedding_model", INGEST),
+    "rerank": ("rerank_model", INTERACTIVE),
+    "summarizer": ("ollama_chat_model", BATCH),
+    "extractor": ("ollama_chat_model", BATCH),
+    "history_summary": ("ollama_chat_model", BATCH),
+}
+
+# Weight of the latest call in the moving average of slot hold time
+EWMA_ALPHA = 0.2
+
+
+class SchedulerBusy(Exception):
+    """The queue is over its latency budget; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ModelQueue:
+    """Slots for one model: a concurrency limit and a queue per priority class."""
+
+    def __init__(self, model: str, limit: int):
+        self.model = model
+        self.limit = limit
+        self.in_flight = 0
+        self.avg_seconds: Optional[float] = None
+        # Per priority: flow -> waiting calls, in round-robin order
+        self._waiting: List["OrderedDict[Optional[str], Deque[threading.Event]]"] = [
+            OrderedDict() for _ in PRIORITY_NAMES
+        ]
+        self._queued = [0] * len(PRIORITY_NAMES)
+        self._lock = threading.Lock()
+
+    def estimated_wait(self, priority: int) -> float:
+        """Seconds a new call of this priority would wait, from the average hold time."""
+        with self._lock:
+            ahead = self.in_flight + sum(self._queued[:priority + 1])
+            if self.limit <= 0 or ahead < self.limit or not self.avg_seconds:
+                return 0.0
+            return (ahead - self.limit + 1) / self.limit * self.avg_seconds
+
+    def acquire(self, priority: int, flow: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Block until a slot is free and it is this call's turn.
+
+        Returns False, without a slot, if that takes longer than `timeout`
+        seconds (None waits forever).
+        """
+        with self._lock:
+            if self.limit <= 0 or (self.in_flight < self.limit and not any(self._queued[:priority + 1])):
+                self.in_flight += 1
+                return True
+            turn = threading.Event()
+            self._waiting[priority].setdefault(flow, deque()).append(turn)
+            self._queued[priority] += 1
+        # in_flight is incremented on our behalf before the event is set
+        if turn.wait(timeout):
+            return True
+
+        with self._lock:
+            if turn.is_set():
+                return True  # Dispatched just as the wait timed out
+            turns = self._waiting[priority][flow]
+            turns.remove(turn)
+            if not turns:
+                del self._waiting[priority][flow]
+            self._queued[priority] -= 1
+        return False
+
+    def release(self, held_seconds: float):
+        with self._lock:
+            self.in_flight -= 1
+            if self.avg_seconds is None:
+                self.avg_seconds = held_seconds
+            else:
+                self.avg_seconds += EWMA_ALPHA * (held_seconds - self.avg_seconds)
+            self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to waiting calls: highest priority first, flows in turn."""
+        while self.in_flight < self.limit:
+            for priority, flows in enumerate(self._waiting):
+                if flows:
+                    break
+            else:
+                return
+
+            flow, turns = next(iter(flows.items()))
+            turn = turns.popleft()
+            if turns:
+                flows.move_to_end(flow)
+            else:
+                del flows[flow]
+            self._queued[priority] -= 1
+            self.in_flight += 1
+            turn.set()
+
+
+class LLMScheduler:
+    """Routes every LLM and embedding call through its model's queue."""
+
+    def __init__(
+        self,
+        max_inflight: Optional[int] = None,
+        model_limits: Optional[Dict[str, int]] = None,
+        queue_budget: Optional[float] = None,
+        max_wait: Optional[float] = None,
+    ):
+        self.max_inflight = config.scheduler_max_inflight if max_inflight is None else max_inflight
+        self.model_limits = config.scheduler_model_limits if model_limits is None else model_limits
+        self.queue_budget = config.scheduler_queue_budget_seconds if queue_budget is None else queue_budget
+        self.max_wait = config.scheduler_max_wait_seconds if max_wait is None else max_wait
+        self._queues: Dict[str, ModelQueue] = {}
+        self._lock = threading.Lock()
+
+    def queue(self, model: str) -> ModelQueue:
+        with self._lock:
+            queue = self._queues.get(model)
+            if queue is None:
+                limit = self.model_limits.get(model, self.max_inflight)
+                queue = self._queues[model] = ModelQueue(model, limit)
+            return queue
+
+    def _resolve(self, component: str) -> Tuple[ModelQueue, int]:
+        setting, priority = COMPONENTS[component]
+        return self.queue(getattr(config, setting)), priority
+
+    def admit(self, component: str):
+        """Raise SchedulerBusy if the queue for `component` is over its latency budget."""
+        if self.queue_budget <= 0:
+            return
+        queue, priority = self._resolve(component)
+        wait = queue.estimated_wait(priority)
+        if wait > self.queue_budget:
+            SCHEDULER_REJECTED.labels(component=component).inc()
+            raise SchedulerBusy(max(1, math.ceil(wait - self.queue_budget)))
+
+    @contextmanager
+    def slot(self, component: str, flow: Optional[str] = None) -> Iterator[None]:
+        """Hold a slot for the model used by `component` while the block runs.
+
+        Raises SchedulerBusy after waiting SCHEDULER_MAX_WAIT_SECONDS.
+        """
+        queue, priority = self._resolve(component)
+        start = time.perf_counter()
+        with span("queue"):
+            acquired = queue.acquire(priority, flow, timeout=self.max_wait or None)
+        if not acquired:
+            SCHEDULER_REJECTED.labels(component=component).inc()
+            raise SchedulerBusy(max(1, math.ceil(queue.estimated_wait(priority))))
+        acquired = time.perf_counter()
+        SCHEDULER_WAIT_SECONDS.labels(model=queue.model, priority=PRIORITY_NAMES[priority]).observe(acquired - start)
+        SCHEDULER_IN_FLIGHT.labels(model=queue.model).inc()
+        try:
+            yield
+        finally:
+            SCHEDULER_IN_FLIGHT.labels(model=queue.model).dec()
+            queue.release(time.perf_counter() - acquired)
+
+    def stream(self, chunks: Iterable[T], component: str, flow: Optional[str] = None) -> Generator[T, None, None]:
+        """Hold a slot while a token stream is consumed.
+
+        The slot is taken when the first chunk is requested, so pass a lazy
+        stream (the request to Ollama is sent on first iteration).
+        """
+        with self.slot(component, flow):
+            yield from chunks
+
+
+# Global scheduler instance
+scheduler = LLMScheduler()
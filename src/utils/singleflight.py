@@ -0,0 +1,179 @@
+"""
+Single-flight deduplication: concurrent identical calls share one in-flight
+computation.
+
+Nothing is kept once the computation finishes, so a call never sees a result
+computed before it started unless it joined while that computation was
+still running. Shared results are the same object for every caller; treat
+them as read-only.
+"""
+
+import threading
+from typing import Callable, Dict, Generator, Generic, Hashable, Iterator, List, Optional, TypeVar
+from src.utils.metrics import SINGLEFLIGHT_REQUESTS
+from src.utils.streaming import AbortScope, abort_scope, on_abort
+
+T = TypeVar("T")
+
+_END = object()
+
+
+class _Call(Generic[T]):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class _Broadcast(Generic[T]):
+    """One upstream stream replayed to every subscriber.
+
+    Subscribers take turns pulling the next chunk from the upstream, so no
+    extra thread is needed; chunks are buffered so late joiners start from
+    the beginning. The upstream's blocking I/O is aborted only once every
+    subscriber's generation has been aborted (see GenerationGuard).
+    """
+
+    def __init__(self, start: Callable[[], Iterator[T]]):
+        self.upstream = start()
+        self.chunks: List[T] = []
+        self.subscribers = 0
+        self.cancelled = 0
+        self.scope = AbortScope()
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._pulling = False
+        self._cond = threading.Condition()
+
+    def get(self, index: int, cancelled: Optional[List[bool]] = None):
+        """Chunk number `index`, or _END; blocks while another subscriber pulls.
+
+        A subscriber whose `cancelled` flag is set gets _END instead of waiting.
+        """
+        with self._cond:
+            while True:
+                if cancelled and cancelled[0]:
+                    return _END
+                if index < len(self.chunks):
+                    return self.chunks[index]
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return _END
+                if not self._pulling:
+                    self._pulling = True
+                    break
+                self._cond.wait()
+
+        try:
+            # The shared upstream answers to the broadcast's scope, not the puller's
+            with abort_scope(self.scope):
+                chunk = next(self.upstream)
+        except StopIteration:
+            self._finish()
+            return _END
+        except BaseException as e:
+            self._finish(e)
+            raise
+
+        with self._cond:
+            self.chunks.append(chunk)
+            self._pulling = False
+            self._cond.notify_all()
+        return chunk
+
+    def _finish(self, error: Optional[BaseException] = None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._pulling = False
+            self._cond.notify_all()
+
+
+class SingleFlight:
+    """Deduplicate concurrent identical calls by key."""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return fn(), or the result of an identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        SINGLEFLIGHT_REQUESTS.labels(operation=self.operation, result="leader" if leader else "shared").inc()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stream(self, key: Hashable, start: Callable[[], Iterator[T]]) -> Generator[T, None, None]:
+        """Stream start()'s chunks, sharing one upstream among identical streams.
+
+        The upstream is closed (e.g. aborting generation) only when every
+        subscriber has stopped reading.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast(start)
+            broadcast.subscribers += 1
+        SINGLEFLIGHT_REQUESTS.labels(operation=self.operation, result="leader" if leader else "shared").inc()
+
+        cancelled = [False]
+
+        def cancel():
+            with self._lock:
+                cancelled[0] = True
+                broadcast.cancelled += 1
+                everyone = broadcast.cancelled >= broadcast.subscribers
+            if everyone:
+                broadcast.scope.abort()
+            with broadcast._cond:
+                broadcast._cond.notify_all()
+
+        # Runs when this subscriber's GenerationGuard is aborted
+        on_abort(cancel)
+
+        index = 0
+        try:
+            while True:
+                chunk = broadcast.get(index, cancelled)
+                if chunk is _END:
+                    return
+                index += 1
+                yield chunk
+        finally:
+            with self._lock:
+                broadcast.subscribers -= 1
+                if cancelled[0]:
+                    broadcast.cancelled -= 1
+                abandoned = broadcast.subscribers == 0 and not broadcast.done
+                if (broadcast.done or abandoned) and self._streams.get(key) is broadcast:
+                    del self._streams[key]
+            if abandoned:
+                broadcast._finish()
+                close = getattr(broadcast.upstream, "close", None)
+                if close:
+                    close()
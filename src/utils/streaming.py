@@ -0,0 +1,252 @@
+import contextvars
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import orjson
+from src.utils.config import config
+from src.utils.metrics import LLM_GENERATION_ABORTS
+
+
+class _Failure:
+    """An exception raised by the upstream, passed to the consumer."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def coalesce(
+    chunks: Iterable[str],
+    interval_ms: Optional[float] = None,
+    max_chars: Optional[int] = None,
+) -> Iterator[str]:
+    """Merge token chunks arriving within a time window into one chunk.
+
+    The first chunk is passed through immediately so time to first token is
+    unchanged; after that, chunks are buffered until `interval_ms` has
+    passed since the last flush or the buffer reaches `max_chars`. Fewer,
+    larger chunks mean fewer SSE events and terminal writes per answer.
+
+    The upstream is read on its own thread, so buffered text is flushed on
+    time even while the upstream is stalled.
+    """
+    interval = (config.stream_flush_interval_ms if interval_ms is None else interval_ms) / 1000
+    max_chars = config.stream_flush_max_chars if max_chars is None else max_chars
+
+    if interval <= 0:
+        yield from chunks
+        return
+
+    pending: "queue.Queue[Any]" = queue.Queue()
+    stop = threading.Event()
+
+    def read():
+        iterator = iter(chunks)
+        try:
+            for chunk in iterator:
+                pending.put(chunk)
+                if stop.is_set():
+                    break
+        except BaseException as e:
+            pending.put(_Failure(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+            pending.put(_END)
+
+    # The reader runs in this context, so upstream spans land in the request's trace
+    threading.Thread(
+        target=contextvars.copy_context().run, args=(read,), name="stream-coalesce", daemon=True
+    ).start()
+
+    buffer: List[str] = []
+    size = 0
+    last_flush = float("-inf")
+    try:
+        while True:
+            try:
+                timeout = max(last_flush + interval - time.monotonic(), 0) if buffer else None
+                item = pending.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _END:
+                break
+            if isinstance(item, _Failure):
+                if buffer:
+                    yield "".join(buffer)
+                raise item.error
+            if item is not None:
+                buffer.append(item)
+                size += len(item)
+                if time.monotonic() - last_flush < interval and size < max_chars:
+                    continue
+
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+            last_flush = time.monotonic()
+    finally:
+        # Stop reading once the consumer is gone
+        stop.set()
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def sse_event(data: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def resolve_limit(requested: Optional[float], configured: float) -> Optional[float]:
+    """Apply a per-request limit, capped by the configured one (0 = unlimited)."""
+    if requested and configured > 0:
+        return min(requested, configured)
+    return requested or configured or None
+
+
+class AbortScope:
+    """Callbacks that abort the blocking I/O of one generation.
+
+    Code that starts a blocking upstream call (e.g. the Ollama HTTP client
+    opening a connection) registers a callback with on_abort(); abort()
+    runs them from any thread, which makes the blocked read return at once.
+    A callback registered after abort() runs immediately.
+    """
+
+    def __init__(self):
+        self.aborted = False
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def add(self, callback: Callable[[], None]):
+        with self._lock:
+            if not self.aborted:
+                self._callbacks.append(callback)
+                return
+        self._run(callback)
+
+    def abort(self):
+        with self._lock:
+            self.aborted = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run(callback)
+
+    @staticmethod
+    def _run(callback: Callable[[], None]):
+        try:
+            callback()
+        except OSError:
+            # The connection was already closed
+            pass
+
+
+_abort_scope: contextvars.ContextVar[Optional[AbortScope]] = contextvars.ContextVar("abort_scope", default=None)
+
+
+def on_abort(callback: Callable[[], None]):
+    """Register a callback that aborts the current generation's blocking I/O, if guarded."""
+    scope = _abort_scope.get()
+    if scope is not None:
+        scope.add(callback)
+
+
+@contextmanager
+def abort_scope(scope: AbortScope):
+    """Make on_abort() calls in this block register with scope."""
+    token = _abort_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _abort_scope.reset(token)
+
+
+class GenerationGuard:
+    """Token stream that stops when cancelled or after a timeout.
+
+    The API reads streams in a worker thread while the event loop watches
+    the client connection, so cancel() is called from another thread when
+    the client disconnects. Cancelling, or reaching the deadline (on a
+    timer), aborts the upstream's HTTP connection right away, even while
+    a read is blocked on a long prefill or a stalled server: Ollama sees
+    the disconnect and stops, and the blocked read returns. The upstream
+    generator is closed by whichever thread isn't reading it at the time.
+    """
+
+    def __init__(self, chunks: Iterable[str], component: str, timeout: Optional[float] = None):
+        self.component = component
+        self._chunks = iter(chunks)
+        timeout = config.generation_timeout_seconds if timeout is None else timeout
+        self._timeout = timeout if timeout and timeout > 0 else None
+        self._timer: Optional[threading.Timer] = None
+        self._scope = AbortScope()
+        self._lock = threading.Lock()
+        # Held while reading, since a running generator can't be closed
+        self._read_lock = threading.Lock()
+        self._done = False
+        self._reason: Optional[str] = None
+        if self._timeout is not None:
+            self._timer = threading.Timer(self._timeout, self._stop, args=("timeout",))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def __iter__(self) -> "GenerationGuard":
+        return self
+
+    def __next__(self) -> str:
+        with self._read_lock:
+            if self._reason is None and not self._done:
+                try:
+                    with abort_scope(self._scope):
+                        return next(self._chunks)
+                except StopIteration:
+                    self._finish()
+                    raise
+                except BaseException:
+                    if self._reason is None:
+                        # Failed upstream (e.g. no model slot): not an abort
+                        self._finish()
+                        raise
+
+            # Stopped (the aborted read may have raised)
+            self._finish()
+            self._close()
+            raise StopIteration
+
+    def cancel(self):
+        """Stop the stream; safe to call from any thread, and after it ended."""
+        self._stop("disconnect")
+
+    def _stop(self, reason: str):
+        with self._lock:
+            if self._done or self._reason is not None:
+                return
+            self._reason = reason
+        LLM_GENERATION_ABORTS.labels(component=self.component, reason=reason).inc()
+        self._scope.abort()
+        # Nobody is reading: close the upstream now (else the reader does)
+        if self._read_lock.acquire(blocking=False):
+            try:
+                self._close()
+            finally:
+                self._read_lock.release()
+
+    def _close(self):
+        close = getattr(self._chunks, "close", None)
+        if close:
+            close()
+
+    def _finish(self):
+        with self._lock:
+            self._done = True
+        if self._timer is not None:
+            self._timer.cancel()
@@ -0,0 +1,9 @@
+def estimate_tokens(text: str) -> int:
+    """Cheaply estimate the token count of text.
+
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for budgeting prompts without loading the model's tokenizer.
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
@@ -0,0 +1,142 @@
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional
+from src.utils.config import config
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("docai_trace", default=None)
+_trace_logger: Optional[logging.Logger] = None
+
+
+class Trace:
+    """Span timings collected for a single API request or CLI command."""
+
+    __slots__ = ("trace_id", "name", "started_at", "spans", "_start", "_finished")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._finished = False
+
+    def add_span(self, name: str, start: float, duration: float):
+        """Record a span from a perf_counter start time and duration in seconds."""
+        self.spans.append({
+            "name": name,
+            "start_ms": round((start - self._start) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+        })
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+    def totals(self) -> Dict[str, float]:
+        """Total duration per span name in milliseconds, plus the overall total."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span["name"]] = round(totals.get(span["name"], 0.0) + span["duration_ms"], 3)
+        totals["total"] = self.elapsed_ms()
+        return totals
+
+    def server_timing(self) -> str:
+        """Format span totals as a Server-Timing header value."""
+        return ", ".join(f"{name};dur={duration}" for name, duration in self.totals().items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "total_ms": self.elapsed_ms(),
+            "spans": self.spans,
+        }
+
+    def finish(self):
+        """Mark the trace complete and append it to the trace log if configured."""
+        if self._finished:
+            return
+        self._finished = True
+        logger = _get_trace_logger()
+        if logger:
+            logger.info(json.dumps(self.to_dict()))
+
+
+def _get_trace_logger() -> Optional[logging.Logger]:
+    """Lazily create the rotating JSONL trace logger."""
+    global _trace_logger
+    if _trace_logger is None and config.trace_log_path:
+        config.trace_log_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            config.trace_log_path,
+            maxBytes=config.trace_log_max_mb * 1024 * 1024,
+            backupCount=config.trace_log_backups,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("docai.trace")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _trace_logger = logger
+    return _trace_logger
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace active in this context, if any."""
+    return _current_trace.get()
+
+
+def begin_trace(name: str, trace_id: Optional[str] = None):
+    """Activate a new trace and return (trace, token), or (None, None) if disabled.
+
+    Use when the trace outlives the current block (e.g. streamed responses);
+    call reset_trace(token) and trace.finish() yourself.
+    """
+    if not config.tracing_enabled:
+        return None, None
+    trace = Trace(name, trace_id)
+    return trace, _current_trace.set(trace)
+
+
+def reset_trace(token):
+    """Deactivate a trace started with begin_trace."""
+    if token is not None:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None) -> Iterator[Optional[Trace]]:
+    """Trace the enclosed block; yields None when tracing is disabled."""
+    trace, token = begin_trace(name, trace_id)
+    try:
+        yield trace
+    finally:
+        reset_trace(token)
+        if trace:
+            trace.finish()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Record a span on the active trace; a no-op when no trace is active."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter() - start)
+
+
+def record_span(name: str, start: float, duration: float):
+    """Record a span measured elsewhere (perf_counter start, seconds)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, start, duration)
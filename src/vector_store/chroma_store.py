@@ -1,17 +1,49 @@
 from typing import List, Dict, Any, Optional
+import json
+import threading
+import time
 import chromadb
 from chromadb.config import Settings
-from src.models.document import Document, DocumentChunk
+from src.models.document import Document, DocumentChunks
+from src.vector_store.compact import CompactIndex
 from src.vector_store.embeddings import embedding_service
+from src.vector_store.filters import normalize_file_type
+from src.vector_store.namespaces import DEFAULT_NAMESPACE, collection_name, namespace_of, resolve_namespace
+from src.vector_store.service import VectorServiceClient
+from src.utils.chunking import with_heading_path
 from src.utils.config import config
+from src.utils.metrics import observe, VECTOR_STORE_SECONDS
+from src.utils.singleflight import SingleFlight
+from src.utils.tracing import span
+
+
+COLLECTION_METADATA = {"description": "Document chunks for RAG"}
+
+
+class _Namespace:
+    """Open handles for one namespace: its collection and compact index."""
+
+    def __init__(self, client, name: str):
+        self.name = name
+        self.collection = client.get_or_create_collection(name=collection_name(name), metadata=COLLECTION_METADATA)
+        # Truncated index with full-precision rescoring (EMBEDDING_INDEX_DIMENSIONS)
+        self.compact = CompactIndex(collection=collection_name(name)) if config.embedding_index_dimensions else None
 
 
 class ChromaVectorStore:
-    """Vector store using ChromaDB for document retrieval."""
+    """Vector store using ChromaDB for document retrieval.
+
+    Every method takes an optional namespace (see namespaces.py); None is
+    the default namespace. Collection handles are opened on first use and
+    kept.
+    """
 
     def __init__(self):
-        # Check if we should use server mode or embedded mode
-        if config.chroma_host:
+        # Check if we should use service, server or embedded mode
+        if config.vector_store_socket:
+            # Service mode (one local index process shared by all API workers)
+            self.client = VectorServiceClient(config.vector_store_socket)
+        elif config.chroma_host:
             # Server mode (Docker/production)
             self.client = chromadb.HttpClient(
                 host=config.chroma_host,
@@ -25,86 +57,219 @@ class ChromaVectorStore:
                 settings=Settings(anonymized_telemetry=False),
             )
 
-        self.collection = self.client.get_or_create_collection(
-            name=config.collection_name,
-            metadata={"description": "Document chunks for RAG"},
-        )
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        self._query_flights = SingleFlight("vector_query")
+        self._namespace(None)
 
-    def add_document(self, document: Document):
-        """Add a document's chunks to the vector store."""
+    def _namespace(self, namespace: Optional[str]) -> _Namespace:
+        """Handles for a namespace, opened (and its collection created) on first use."""
+        name = resolve_namespace(namespace)
+        handles = self._namespaces.get(name)
+        if handles is None:
+            with self._lock:
+                handles = self._namespaces.get(name)
+                if handles is None:
+                    handles = self._namespaces[name] = _Namespace(self.client, name)
+        return handles
+
+    @property
+    def collection(self):
+        """The default namespace's collection."""
+        return self._namespace(None).collection
+
+    def _chunk_records(self, document: Document, handles: _Namespace) -> Dict[str, Any]:
+        """Ids, texts, metadata and embeddings for a document's chunks."""
         if not document.chunks:
             raise ValueError("Document has no chunks to add")
 
-        texts = [chunk.text for chunk in document.chunks]
-        ids = [chunk.chunk_id for chunk in document.chunks]
+        chunks = document.chunks
+        if isinstance(chunks, DocumentChunks):
+            texts = chunks.texts()
+            ids = chunks.ids()
+            indexes = range(len(chunks))
+            source_files = [chunks.source_file] * len(chunks)
+            heading_paths = chunks.heading_paths or [""] * len(chunks)
+        else:
+            texts = [chunk.text for chunk in chunks]
+            ids = [chunk.chunk_id for chunk in chunks]
+            indexes = [chunk.chunk_index for chunk in chunks]
+            source_files = [chunk.source_file for chunk in chunks]
+            heading_paths = [chunk.metadata.get("heading_path", "") for chunk in chunks]
+        # Scope fields are stored on every chunk so filtered queries can be
+        # narrowed by the metadata index before vector scoring
+        file_type = normalize_file_type(document.metadata.file_type)
+        ingested_at = int(time.time())
         metadatas = [
             {
-                "source_file": chunk.source_file,
-                "chunk_index": chunk.chunk_index,
+                "source_file": source_file,
+                "chunk_index": index,
                 "doc_id": document.doc_id,
+                "file_type": file_type,
+                "ingested_at": ingested_at,
             }
-            for chunk in document.chunks
+            for index, source_file in zip(indexes, source_files)
         ]
+        for metadata, heading_path in zip(metadatas, heading_paths):
+            if heading_path:
+                metadata["heading_path"] = heading_path
+
+        # Generate embeddings; each chunk is embedded with its heading path
+        # so a section's chunks match queries about the section's topic.
+        # Namespaces take turns for the embedding model during bulk ingests.
+        embeddings = embedding_service.embed_documents(
+            [with_heading_path(text, heading_path) for text, heading_path in zip(texts, heading_paths)],
+            flow=handles.name,
+        )
+        if handles.compact:
+            embeddings = handles.compact.index_vectors(ids, embeddings)
 
-        # Generate embeddings
-        embeddings = embedding_service.embed_documents(texts)
+        return {"ids": ids, "embeddings": embeddings, "documents": texts, "metadatas": metadatas}
+
+    def add_document(self, document: Document, namespace: Optional[str] = None):
+        """Add a document's chunks to the vector store."""
+        handles = self._namespace(namespace)
+        records = self._chunk_records(document, handles)
 
         # Add to ChromaDB
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-        )
+        with span("vector_store_add"), observe(VECTOR_STORE_SECONDS, operation="add", namespace=handles.name):
+            handles.collection.add(**records)
+
+    def upsert_document(self, document: Document, namespace: Optional[str] = None) -> int:
+        """Add or replace a document's chunks.
+
+        Chunks are written with upsert, so the previous version stays
+        searchable until the new one is in place, then chunk ids the new
+        version no longer has are removed. Returns the number removed.
+        """
+        handles = self._namespace(namespace)
+        records = self._chunk_records(document, handles)
+
+        with span("vector_store_add"), observe(VECTOR_STORE_SECONDS, operation="upsert", namespace=handles.name):
+            handles.collection.upsert(**records)
+            surplus = set(self.get_chunk_ids(document.doc_id, namespace)) - set(records["ids"])
+            if surplus:
+                handles.collection.delete(ids=sorted(surplus))
+                if handles.compact:
+                    handles.compact.delete(sorted(surplus))
+
+        return len(surplus)
+
+    def get_chunk_ids(self, doc_id: str, namespace: Optional[str] = None) -> List[str]:
+        """Ids of all stored chunks of a document."""
+        return self._namespace(namespace).collection.get(where={"doc_id": doc_id}, include=[])["ids"]
 
     def query(
         self,
         query_text: str,
         top_k: Optional[int] = None,
         filter_dict: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """Query the vector store for similar documents."""
+        """Query the vector store for similar documents.
+
+        Concurrent identical queries share one search (and one embedding).
+        """
+        key = (
+            resolve_namespace(namespace),
+            query_text,
+            top_k or config.retrieval_top_k,
+            json.dumps(filter_dict, sort_keys=True),
+        )
+        return self._query_flights.do(
+            key, lambda: self.query_batch([query_text], top_k, filter_dict, namespace)[0]
+        )
+
+    def query_batch(
+        self,
+        query_texts: List[str],
+        top_k: Optional[int] = None,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Query the vector store for several questions in one search call."""
         k = top_k or config.retrieval_top_k
+        handles = self._namespace(namespace)
+        compact = handles.compact
 
-        # Generate query embedding
-        query_embedding = embedding_service.embed_text(query_text)
+        # Generate query embeddings
+        query_embeddings = [embedding_service.embed_text(text) for text in query_texts]
 
-        # Query ChromaDB
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=k,
-            where=filter_dict,
-        )
+        # Query ChromaDB (a compact index is searched for extra candidates to rescore)
+        with span("vector_search"), observe(VECTOR_STORE_SECONDS, operation="query", namespace=handles.name):
+            results = handles.collection.query(
+                query_embeddings=(
+                    [compact.query_vector(e) for e in query_embeddings] if compact else query_embeddings
+                ),
+                n_results=compact.candidates(k) if compact else k,
+                where=filter_dict,
+            )
 
         # Format results
         formatted_results = []
-        if results["ids"] and len(results["ids"]) > 0:
-            for i in range(len(results["ids"][0])):
-                result = {
-                    "id": results["ids"][0][i],
-                    "text": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i] if "distances" in results else None,
-                }
-                formatted_results.append(result)
+        for q in range(len(query_texts)):
+            matches = []
+            if results["ids"] and len(results["ids"]) > q:
+                ids = results["ids"][q]
+                distances = list(results["distances"][q]) if results.get("distances") else [None] * len(ids)
+                order = range(len(ids))
+                if compact and ids:
+                    with span("rescore"):
+                        order = compact.rescore(query_embeddings[q], ids, distances, k)
+                for i in order:
+                    matches.append({
+                        "id": ids[i],
+                        "text": results["documents"][q][i],
+                        "metadata": results["metadatas"][q][i],
+                        "distance": distances[i],
+                    })
+            formatted_results.append(matches)
 
         return formatted_results
 
-    def delete_document(self, doc_id: str):
-        """Delete all chunks of a document from the vector store."""
-        self.collection.delete(where={"doc_id": doc_id})
+    def delete_document(self, doc_id: str, namespace: Optional[str] = None) -> int:
+        """Delete all chunks of a document; returns the number deleted."""
+        handles = self._namespace(namespace)
+        with observe(VECTOR_STORE_SECONDS, operation="delete", namespace=handles.name):
+            ids = self.get_chunk_ids(doc_id, namespace)
+            if ids:
+                handles.collection.delete(ids=ids)
+                if handles.compact:
+                    handles.compact.delete(ids)
+        return len(ids)
 
-    def clear_all(self):
-        """Clear all documents from the vector store."""
-        self.client.delete_collection(config.collection_name)
-        self.collection = self.client.get_or_create_collection(
-            name=config.collection_name,
-            metadata={"description": "Document chunks for RAG"},
-        )
+    def clear_all(self, namespace: Optional[str] = None):
+        """Clear all documents from a namespace."""
+        # Opening it first creates the collection, so there is one to delete
+        handles = self._namespace(namespace)
+        with self._lock:
+            self._namespaces.pop(handles.name, None)
+            self.client.delete_collection(collection_name(handles.name))
+        if handles.compact:
+            handles.compact.clear()
+        self._namespace(handles.name)
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        """Number of chunks stored in a namespace."""
+        return self._namespace(namespace).collection.count()
+
+    def list_namespaces(self) -> List[str]:
+        """Namespaces that have a collection, the default one first."""
+        names = []
+        for collection in self.client.list_collections():
+            # ChromaDB 0.5 returns collections, later versions their names
+            namespace = namespace_of(getattr(collection, "name", collection))
+            if namespace:
+                names.append(namespace)
+        return sorted(names, key=lambda name: (name != DEFAULT_NAMESPACE, name))
+
+    def namespace_stats(self) -> List[Dict[str, Any]]:
+        """Chunk count of every namespace."""
+        return [{"namespace": name, "chunks": self.count(name)} for name in self.list_namespaces()]
 
-    def list_documents(self) -> List[str]:
-        """List all unique document IDs in the store."""
-        results = self.collection.get()
+    def list_documents(self, namespace: Optional[str] = None) -> List[str]:
+        """List all unique document IDs in a namespace."""
+        results = self._namespace(namespace).collection.get(include=["metadatas"])
         if not results["metadatas"]:
             return []
 
@@ -115,22 +280,35 @@ class ChromaVectorStore:
 
         return list(doc_ids)
 
-    def get_document_info(self) -> Dict[str, Any]:
-        """Get information about stored documents."""
-        results = self.collection.get()
+    def get_document_info(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Get information about the documents stored in a namespace."""
+        results = self._namespace(namespace).collection.get(include=["metadatas"])
         doc_files = set()
+        documents: Dict[str, Dict[str, Any]] = {}
         chunk_count = 0
+        unscoped = 0
 
         if results["metadatas"]:
             chunk_count = len(results["metadatas"])
             for metadata in results["metadatas"]:
+                # Indexed before chunks carried scope metadata
+                if "file_type" not in metadata or "ingested_at" not in metadata:
+                    unscoped += 1
                 if "source_file" in metadata:
                     doc_files.add(metadata["source_file"])
+                if "doc_id" in metadata:
+                    entry = documents.setdefault(
+                        metadata["doc_id"],
+                        {"doc_id": metadata["doc_id"], "source_file": metadata.get("source_file"), "chunks": 0},
+                    )
+                    entry["chunks"] += 1
 
         return {
             "total_chunks": chunk_count,
             "unique_documents": len(doc_files),
             "document_files": list(doc_files),
+            "documents": sorted(documents.values(), key=lambda d: d["source_file"] or ""),
+            "unscoped_chunks": unscoped,
         }
 
 
@@ -0,0 +1,177 @@
+"""
+Compact embedding storage: a truncated vector index with full-precision
+rescoring.
+
+With EMBEDDING_INDEX_DIMENSIONS set, ChromaDB indexes only the first N
+dimensions of each embedding (renormalized), which shrinks the in-memory
+HNSW index by dim/N. This suits Matryoshka-trained models (e.g.
+nomic-embed-text), whose leading dimensions carry most of the signal.
+The full embeddings are kept on disk in a SQLite side store; a query
+fetches EMBEDDING_RESCORE_FACTOR times more candidates from the index and
+reorders them by their full-precision distance, so results and distances
+match full-precision search as long as the true neighbours are among the
+candidates.
+
+ChromaDB's index only stores float32, so the dimension count is the knob;
+benchmarks/bench_compact_embeddings.py also reports int8 quantization for
+comparison.
+
+The side store is local to the process's host: with a shared Chroma
+server, each API host keeps its own copy, filled by its own ingestion.
+Changing the dimension count needs an empty collection (`docai clear` and
+re-ingest), since a ChromaDB collection has a fixed dimensionality.
+"""
+
+import math
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from src.utils.config import config
+
+
+def truncate(vector: Sequence[float], dimensions: int) -> List[float]:
+    """The first `dimensions` components, scaled back to unit length."""
+    head = vector[:dimensions]
+    norm = math.sqrt(math.fsum(x * x for x in head))
+    return [x / norm for x in head] if norm else list(head)
+
+
+def squared_l2(a: Sequence[float], b: Sequence[float]) -> float:
+    """Squared Euclidean distance, as ChromaDB's default "l2" space reports it."""
+    return math.dist(a, b) ** 2
+
+
+def full_embeddings_path(collection: Optional[str] = None) -> Path:
+    """Side store of a collection's full embeddings (default: COLLECTION_NAME)."""
+    if not collection or collection == config.collection_name:
+        return config.vector_store_path / "full_embeddings.sqlite"
+    return config.vector_store_path / f"full_embeddings-{collection}.sqlite"
+
+
+class FullEmbeddingStore:
+    """Full-precision embeddings by chunk id, as float32 blobs in SQLite."""
+
+    # A rowid table: WITHOUT ROWID stores rows of kilobytes poorly
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS embeddings (
+        id TEXT PRIMARY KEY,
+        vector BLOB NOT NULL
+    );
+    """
+
+    # SQLite's default limit on bound parameters is 999
+    BATCH = 500
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Pages hold several 3 KB vectors instead of one (applies to a new database)
+            conn.execute("PRAGMA page_size=16384")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (id, vector) VALUES (?, ?)",
+                ((id_, array("f", vector).tobytes()) for id_, vector in zip(ids, vectors)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, ids: Sequence[str]) -> Dict[str, array]:
+        """Stored vectors of those ids that have one."""
+        conn = self._conn()
+        vectors = {}
+        for start in range(0, len(ids), self.BATCH):
+            batch = ids[start:start + self.BATCH]
+            rows = conn.execute(
+                f"SELECT id, vector FROM embeddings WHERE id IN ({','.join('?' * len(batch))})", batch
+            )
+            for id_, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                vectors[id_] = vector
+        return vectors
+
+    def delete(self, ids: Sequence[str]):
+        conn = self._conn()
+        for start in range(0, len(ids), self.BATCH):
+            batch = ids[start:start + self.BATCH]
+            conn.execute(f"DELETE FROM embeddings WHERE id IN ({','.join('?' * len(batch))})", batch)
+
+    def clear(self):
+        self._conn().execute("DELETE FROM embeddings")
+
+
+class CompactIndex:
+    """Truncates embeddings for the index and rescores candidates at full precision."""
+
+    def __init__(
+        self,
+        dimensions: Optional[int] = None,
+        rescore_factor: Optional[int] = None,
+        store: Optional[FullEmbeddingStore] = None,
+        collection: Optional[str] = None,
+    ):
+        self.dimensions = config.embedding_index_dimensions if dimensions is None else dimensions
+        self.rescore_factor = config.embedding_rescore_factor if rescore_factor is None else rescore_factor
+        self.store = store or FullEmbeddingStore(full_embeddings_path(collection))
+
+    def index_vectors(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]]) -> List[List[float]]:
+        """Keep the full embeddings and return the truncated ones to index.
+
+        The full ones are written first, so a chunk is never searchable
+        without them.
+        """
+        self.store.put(ids, embeddings)
+        return [truncate(embedding, self.dimensions) for embedding in embeddings]
+
+    def query_vector(self, embedding: Sequence[float]) -> List[float]:
+        return truncate(embedding, self.dimensions)
+
+    def candidates(self, k: int) -> int:
+        """Number of index results to fetch for k final results."""
+        return k * max(self.rescore_factor, 1)
+
+    def rescore(self, embedding: Sequence[float], ids: List[str], distances: List[float], k: int) -> List[int]:
+        """Positions of the best k candidates by full-precision distance, best first.
+
+        `distances` is updated in place with the full-precision distances.
+        Candidates without a stored full embedding rank after the others,
+        in index order.
+        """
+        full = self.store.get(ids)
+        scored = []
+        missing = []
+        for position, id_ in enumerate(ids):
+            vector = full.get(id_)
+            if vector is None or len(vector) != len(embedding):
+                missing.append(position)
+                continue
+            distances[position] = squared_l2(embedding, vector)
+            scored.append(position)
+        scored.sort(key=distances.__getitem__)
+        return (scored + missing)[:k]
+
+    def delete(self, ids: Sequence[str]):
+        self.store.delete(ids)
+
+    def clear(self):
+        self.store.clear()
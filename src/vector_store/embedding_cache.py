@@ -0,0 +1,174 @@
+"""
+Persistent embedding cache.
+
+Document embeddings are kept on disk, keyed by embedding model and a hash
+of the embedded text, independently of the vector store: clearing or
+rebuilding the index (new chunk settings, a migration, recovery) then only
+re-embeds text that has actually changed. Vectors are stored as float32
+blobs in SQLite in WAL mode, so several workers on one host can share the
+file.
+
+The cache is bounded by EMBEDDING_CACHE_MAX_MB; when it grows past that,
+the least recently used entries are evicted down to 90% of the limit.
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.utils.config import config
+from src.utils.metrics import EMBEDDING_CACHE_BYTES, EMBEDDING_CACHE_EVICTIONS, record_cache_lookup
+
+# Fraction of the limit the cache is trimmed to when it overflows, so
+# eviction runs once per batch of new entries, not on every insert
+EVICT_TO = 0.9
+# Approximate per-entry storage besides the vector: key, hash, row header
+ENTRY_OVERHEAD = 64
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """Embeddings by (model, text hash) in SQLite, with LRU eviction."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS embeddings (
+        model TEXT NOT NULL,
+        hash BLOB NOT NULL,
+        vector BLOB NOT NULL,
+        accessed INTEGER NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS embeddings_key ON embeddings (model, hash);
+    CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed);
+    """
+
+    # SQLite's default limit on bound parameters is 999
+    BATCH = 500
+
+    def __init__(self, path: Optional[Path] = None, max_mb: Optional[float] = None):
+        self.path = Path(path or config.embedding_cache_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int((config.embedding_cache_max_mb if max_mb is None else max_mb) * 2**20)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+        self._size_lock = threading.Lock()
+        self.entries, self.size_bytes = self._measure()
+        EMBEDDING_CACHE_BYTES.set(self.size_bytes)
+        # Lookups by this process
+        self.hits = 0
+        self.misses = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Pages hold several 3 KB vectors instead of one (applies to a new database)
+            conn.execute("PRAGMA page_size=16384")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _measure(self) -> Tuple[int, int]:
+        """Number of entries and their approximate size, from the database."""
+        count, vector_bytes = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()
+        return count, vector_bytes + count * ENTRY_OVERHEAD
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached embedding of each text, or None where there is none."""
+        conn = self._conn()
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), self.BATCH):
+            batch = unique[start:start + self.BATCH]
+            rows = conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                [model, *batch],
+            )
+            for key, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+
+        if found:
+            # Mark hits as recently used, for eviction
+            now = int(time.time())
+            conn.executemany(
+                "UPDATE embeddings SET accessed = ? WHERE model = ? AND hash = ?",
+                [(now, model, key) for key in found],
+            )
+
+        vectors = [found.get(key) for key in hashes]
+        for vector in vectors:
+            record_cache_lookup("embeddings", vector is not None)
+        hits = sum(vector is not None for vector in vectors)
+        with self._size_lock:
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        conn = self._conn()
+        now = int(time.time())
+        rows = [(model, text_hash(text), array("f", vector).tobytes(), now) for text, vector in zip(texts, vectors)]
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, hash, vector, accessed) VALUES (?, ?, ?, ?)", rows
+        )
+
+        added = sum(len(row[2]) + ENTRY_OVERHEAD for row in rows)
+        with self._size_lock:
+            self.entries += len(rows)
+            self.size_bytes += added
+            overflowing = self.size_bytes > self.max_bytes
+        if overflowing:
+            self.evict()
+        else:
+            EMBEDDING_CACHE_BYTES.set(self.size_bytes)
+
+    def evict(self):
+        """Drop least recently used entries until the cache is under EVICT_TO of its limit."""
+        target = self.max_bytes * EVICT_TO
+        conn = self._conn()
+        with self._size_lock:
+            # Other workers share the file: go by its actual size
+            self.entries, self.size_bytes = self._measure()
+            while self.entries and self.size_bytes > target:
+                excess = math.ceil((self.size_bytes - target) / (self.size_bytes / self.entries))
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY accessed LIMIT ?)",
+                    (excess,),
+                )
+                EMBEDDING_CACHE_EVICTIONS.inc(min(excess, self.entries))
+                self.entries, self.size_bytes = self._measure()
+            EMBEDDING_CACHE_BYTES.set(self.size_bytes)
+
+    def stats(self) -> Dict[str, float]:
+        """Size of the cache and this process's hit rate."""
+        with self._size_lock:
+            self.entries, self.size_bytes = self._measure()
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.entries,
+            "size_mb": self.size_bytes / 2**20,
+            "max_mb": self.max_bytes / 2**20,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._size_lock:
+            self._conn().execute("DELETE FROM embeddings")
+            self.entries = self.size_bytes = 0
+        EMBEDDING_CACHE_BYTES.set(0)
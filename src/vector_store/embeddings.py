@@ -1,24 +1,88 @@
-from typing import List
+from typing import List, Optional
 from langchain_community.embeddings import OllamaEmbeddings
+from ollama import Client
 from src.utils.config import config
+from src.utils.metrics import observe, batch_size_label, EMBEDDING_SECONDS, EMBEDDED_TEXTS
+from src.utils.scheduler import scheduler
+from src.utils.singleflight import SingleFlight
+from src.utils.tracing import span
+from src.vector_store.embedding_cache import EmbeddingCache
 
 
-class EmbeddingService:
-    """Service for generating embeddings using Ollama."""
+def create_embeddings(backend: Optional[str] = None):
+    """Create the embedding backend selected by EMBEDDING_BACKEND."""
+    backend = (backend or config.embedding_backend).lower()
 
-    def __init__(self):
-        self.embeddings = OllamaEmbeddings(
+    if backend == "ollama":
+        return OllamaEmbeddings(
             base_url=config.ollama_base_url,
             model=config.ollama_embedding_model,
         )
+    if backend == "sentence-transformers":
+        from src.vector_store.local_embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings()
+
+    raise ValueError(f"Unsupported embedding backend: {backend}")
+
+
+class EmbeddingService:
+    """Service for generating embeddings with Ollama or an in-process model."""
+
+    def __init__(self):
+        self.embeddings = create_embeddings()
+        self._query_flights = SingleFlight("embed_query")
+        # Document embeddings persist across index rebuilds (EMBEDDING_CACHE_MAX_MB=0 disables)
+        self.cache: Optional[EmbeddingCache] = EmbeddingCache() if config.embedding_cache_max_mb > 0 else None
+
+    def warmup(self):
+        """Load the embedding model, so the first request doesn't wait for it."""
+        if config.embedding_backend.lower() == "ollama":
+            # The Ollama client can ask for the model to stay loaded
+            Client(host=config.ollama_base_url).embed(
+                model=config.ollama_embedding_model,
+                input="warmup",
+                keep_alive=config.ollama_keep_alive,
+            )
+        else:
+            self.embeddings.embed_query("warmup")
 
     def embed_text(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
-        return self.embeddings.embed_query(text)
+        """Generate embedding for a single text.
+
+        Concurrent requests for the same text share one embedding call.
+        """
+        return self._query_flights.do(text, lambda: self._embed_text(text))
+
+    def _embed_text(self, text: str) -> List[float]:
+        EMBEDDED_TEXTS.labels(operation="query").inc()
+        with scheduler.slot("embed_query"):
+            with span("embedding"), observe(EMBEDDING_SECONDS, operation="query", batch_size=batch_size_label(1)):
+                return self.embeddings.embed_query(text)
+
+    def embed_documents(self, texts: List[str], flow: Optional[str] = None) -> List[List[float]]:
+        """Generate embeddings for multiple texts.
+
+        Texts already in the embedding cache aren't sent to Ollama again,
+        and repeated texts in the batch are embedded once. flow is the key
+        the scheduler queues ingests fairly by (e.g. the namespace).
+        """
+        if self.cache is None:
+            return self._embed_documents(texts, flow)
+
+        model = config.embedding_model
+        vectors = self.cache.get_many(model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            embedded = dict(zip(missing, self._embed_documents(missing, flow)))
+            self.cache.put_many(model, missing, [embedded[text] for text in missing])
+            vectors = [embedded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return vectors
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts."""
-        return self.embeddings.embed_documents(texts)
+    def _embed_documents(self, texts: List[str], flow: Optional[str] = None) -> List[List[float]]:
+        EMBEDDED_TEXTS.labels(operation="documents").inc(len(texts))
+        with scheduler.slot("embed_documents", flow=flow):
+            with span("embedding"), observe(EMBEDDING_SECONDS, operation="documents", batch_size=batch_size_label(len(texts))):
+                return self.embeddings.embed_documents(texts)
 
 
 # Global embedding service instance
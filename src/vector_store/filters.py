@@ -0,0 +1,70 @@
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional
+
+
+def normalize_file_type(file_type: str) -> str:
+    """Normalize a file type to the stored form (lowercase with leading dot)."""
+    file_type = file_type.strip().lower()
+    if file_type and not file_type.startswith("."):
+        file_type = f".{file_type}"
+    return file_type
+
+
+def end_of_day(value: Any) -> Any:
+    """Turn a date-only upper bound into the last moment of that day.
+
+    "Until 2024-05-01" includes May 1st, while the datetime 2024-05-01 is
+    midnight and would exclude it. Other values are returned unchanged.
+    """
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value.strip())
+        except ValueError:
+            return value
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.max)
+    return value
+
+
+def _in_condition(field: str, values: List[str]) -> Dict[str, Any]:
+    """Build an equality or membership condition for a metadata field."""
+    if len(values) == 1:
+        return {field: values[0]}
+    return {field: {"$in": values}}
+
+
+def build_where_filter(
+    doc_ids: Optional[List[str]] = None,
+    source_files: Optional[List[str]] = None,
+    file_types: Optional[List[str]] = None,
+    ingested_after: Optional[datetime] = None,
+    ingested_before: Optional[datetime] = None,
+) -> Optional[Dict[str, Any]]:
+    """Build a ChromaDB where clause that scopes a query to matching chunks.
+
+    Returns None when no scope is given so the whole collection is searched.
+    """
+    conditions: List[Dict[str, Any]] = []
+
+    if doc_ids:
+        conditions.append(_in_condition("doc_id", list(doc_ids)))
+
+    if source_files:
+        conditions.append(_in_condition("source_file", list(source_files)))
+
+    if file_types:
+        types = sorted({normalize_file_type(t) for t in file_types if t.strip()})
+        if types:
+            conditions.append(_in_condition("file_type", types))
+
+    if ingested_after:
+        conditions.append({"ingested_at": {"$gte": int(ingested_after.timestamp())}})
+
+    if ingested_before:
+        conditions.append({"ingested_at": {"$lte": int(ingested_before.timestamp())}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
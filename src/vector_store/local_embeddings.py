@@ -0,0 +1,86 @@
+"""
+In-process embedding backend using sentence-transformers on CPU.
+
+With EMBEDDING_BACKEND=sentence-transformers, embeddings are computed in
+the API/CLI process instead of by Ollama: retrieval skips an HTTP round
+trip and Ollama is left to generation. Texts are encoded in batches of
+EMBEDDING_BATCH_SIZE (torch spreads each batch over the CPU cores). With
+EMBEDDING_WORKERS > 1, large document batches are split across a pool of
+that many worker processes, started on first use and kept; queries are
+always encoded in-process, since a round trip to a worker would cost more
+than the encoding.
+
+Switching backend or model changes the embeddings' dimensionality and
+meaning, so it needs an empty collection (`docai clear` and re-ingest).
+"""
+
+import atexit
+import threading
+from typing import List, Optional
+from src.utils.config import config
+from src.utils.tracing import span
+
+
+class SentenceTransformerEmbeddings:
+    """Embeddings from a sentence-transformers model, shaped like LangChain's."""
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: Optional[int] = None, workers: Optional[int] = None):
+        self.model_name = model_name or config.local_embedding_model
+        self.batch_size = batch_size or config.embedding_batch_size
+        self.workers = config.embedding_workers if workers is None else workers
+        self._model = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The model, loaded on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    with span("embedding_load"):
+                        self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def _worker_pool(self):
+        """Worker processes for large batches, started on first use."""
+        model = self.model
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = model.start_multi_process_pool(["cpu"] * self.workers)
+                    atexit.register(self.close)
+        return self._pool
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.encode(
+            text,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.workers > 1 and len(texts) > self.batch_size:
+            import numpy as np
+
+            embeddings = self.model.encode_multi_process(texts, self._worker_pool(), batch_size=self.batch_size)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            return (embeddings / np.maximum(norms, 1e-12)).tolist()
+
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).tolist()
+
+    def close(self):
+        """Stop the worker processes, if started."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            from sentence_transformers import SentenceTransformer
+
+            SentenceTransformer.stop_multi_process_pool(pool)
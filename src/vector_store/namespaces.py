@@ -0,0 +1,52 @@
+"""
+Namespaces: separate document collections, e.g. one per team.
+
+Each namespace is its own ChromaDB collection with its own index, so a
+query only searches the namespace it names and ingesting into one
+namespace doesn't slow searches in another. The default namespace is the
+COLLECTION_NAME collection, so existing indexes keep working; namespace
+"x" is stored as the collection "<COLLECTION_NAME>-x".
+"""
+
+import re
+from typing import Optional
+from src.utils.config import config
+
+DEFAULT_NAMESPACE = "default"
+
+# ChromaDB collection names allow at most 63 characters
+NAMESPACE_PATTERN = re.compile(r"[a-z0-9](?:[a-z0-9_-]{0,30}[a-z0-9])?")
+
+
+class InvalidNamespace(ValueError):
+    """A namespace name that can't be used (see NAMESPACE_PATTERN)."""
+
+
+def resolve_namespace(namespace: Optional[str]) -> str:
+    """Validated namespace name; None or "" means the default namespace."""
+    if not namespace:
+        return DEFAULT_NAMESPACE
+    if not NAMESPACE_PATTERN.fullmatch(namespace):
+        raise InvalidNamespace(
+            f"Invalid namespace {namespace!r}: use 1-32 lowercase letters, digits, '-' or '_', "
+            "starting and ending with a letter or digit"
+        )
+    return namespace
+
+
+def collection_name(namespace: Optional[str]) -> str:
+    """ChromaDB collection that stores a namespace."""
+    namespace = resolve_namespace(namespace)
+    if namespace == DEFAULT_NAMESPACE:
+        return config.collection_name
+    return f"{config.collection_name}-{namespace}"
+
+
+def namespace_of(name: str) -> Optional[str]:
+    """Namespace stored in collection `name`, or None if it isn't one of ours."""
+    if name == config.collection_name:
+        return DEFAULT_NAMESPACE
+    prefix = f"{config.collection_name}-"
+    if name.startswith(prefix) and NAMESPACE_PATTERN.fullmatch(name[len(prefix):]):
+        return name[len(prefix):]
+    return None
@@ -0,0 +1,303 @@
+"""
+Vector store service: one local process owns the ChromaDB index and API
+workers talk to it over a Unix socket.
+
+Running several API workers in embedded mode means several processes
+opening the same SQLite/HNSW files, each with its own copy of the index in
+memory. With ``VECTOR_STORE_SOCKET`` set, ``ChromaVectorStore`` instead
+sends its requests to this service (``docai index-server``).
+
+Protocol: every request and response is one frame
+
+    header   little-endian (code: u8, json_length: u32, vector_count: u32, dim: u32)
+    json     UTF-8 JSON payload (ids, documents, metadata, filters, results)
+    vectors  vector_count * dim float32 values
+
+Embeddings travel as raw float32 instead of JSON numbers, which keeps
+frames about 4x smaller and avoids float parsing. Requests carry whole
+batches (all chunks of a document, several query embeddings), so one round
+trip serves many items. In responses the code field is the status.
+"""
+
+import itertools
+import json
+import socket
+import socketserver
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+import chromadb
+from chromadb.config import Settings
+from src.utils.config import config
+
+OP_PING = 1
+OP_ADD = 2
+OP_QUERY = 3
+OP_GET = 4
+OP_DELETE = 5
+OP_COUNT = 6
+OP_DROP_COLLECTION = 7
+OP_UPSERT = 8
+OP_LIST_COLLECTIONS = 9
+
+# Read-only ops, safe to resend when the connection drops mid-request
+IDEMPOTENT_OPS = {OP_PING, OP_QUERY, OP_GET, OP_COUNT, OP_LIST_COLLECTIONS}
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+HEADER = struct.Struct("<BIII")
+FLOAT_SIZE = array("f").itemsize
+
+RESULT_KEYS = ("ids", "documents", "metadatas", "distances")
+
+
+def encode_frame(code: int, payload: Dict[str, Any], vectors: Optional[Sequence[Sequence[float]]] = None) -> bytes:
+    """Serialize one protocol frame."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    count = len(vectors) if vectors else 0
+    dim = len(vectors[0]) if count else 0
+    if count and any(len(v) != dim for v in vectors):
+        raise ValueError("All vectors in a frame must have the same dimension")
+
+    data = array("f", itertools.chain.from_iterable(vectors)) if count else array("f")
+    return HEADER.pack(code, len(body), count, dim) + body + data.tobytes()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("Connection closed mid-frame")
+    return data
+
+
+def read_frame(stream: BinaryIO) -> Tuple[int, Dict[str, Any], List[List[float]]]:
+    """Read one protocol frame, returning (code, payload, vectors)."""
+    header = stream.read(HEADER.size)
+    if not header:
+        raise EOFError("Connection closed")
+    if len(header) != HEADER.size:
+        raise EOFError("Connection closed mid-frame")
+
+    code, json_length, count, dim = HEADER.unpack(header)
+    payload = json.loads(_read_exact(stream, json_length)) if json_length else {}
+
+    vectors = []
+    if count:
+        data = array("f")
+        data.frombytes(_read_exact(stream, count * dim * FLOAT_SIZE))
+        vectors = [data[i * dim:(i + 1) * dim].tolist() for i in range(count)]
+    return code, payload, vectors
+
+
+class VectorStoreService:
+    """Owns the embedded ChromaDB client and executes requests from all workers."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.client = chromadb.PersistentClient(
+            path=str(path or config.vector_store_path),
+            settings=Settings(anonymized_telemetry=False),
+        )
+        self._collections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self.client.get_or_create_collection(name=name, metadata=metadata)
+                self._collections[name] = collection
+            return collection
+
+    def handle(self, op: int, payload: Dict[str, Any], vectors: List[List[float]]) -> Dict[str, Any]:
+        """Execute one request and return its JSON result."""
+        if op == OP_PING:
+            return {}
+        if op == OP_LIST_COLLECTIONS:
+            return {"names": [getattr(c, "name", c) for c in self.client.list_collections()]}
+
+        name = payload["collection"]
+        if op == OP_DROP_COLLECTION:
+            with self._lock:
+                self._collections.pop(name, None)
+                try:
+                    self.client.delete_collection(name)
+                except ValueError:
+                    pass  # Already gone
+            return {}
+
+        collection = self._collection(name, payload.get("metadata"))
+
+        if op in (OP_ADD, OP_UPSERT):
+            write = collection.add if op == OP_ADD else collection.upsert
+            write(
+                ids=payload["ids"],
+                embeddings=vectors,
+                documents=payload.get("documents"),
+                metadatas=payload.get("metadatas"),
+            )
+            return {}
+
+        if op == OP_QUERY:
+            kwargs = {"include": payload["include"]} if payload.get("include") is not None else {}
+            results = collection.query(
+                query_embeddings=vectors,
+                n_results=payload["n_results"],
+                where=payload.get("where"),
+                **kwargs,
+            )
+            return {key: results[key] for key in RESULT_KEYS if results.get(key) is not None}
+
+        if op == OP_GET:
+            kwargs = {"include": payload["include"]} if payload.get("include") is not None else {}
+            results = collection.get(ids=payload.get("ids"), where=payload.get("where"), **kwargs)
+            return {key: results[key] for key in RESULT_KEYS if results.get(key) is not None}
+
+        if op == OP_DELETE:
+            collection.delete(ids=payload.get("ids"), where=payload.get("where"))
+            return {}
+
+        if op == OP_COUNT:
+            return {"count": collection.count()}
+
+        raise ValueError(f"Unknown opcode: {op}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                op, payload, vectors = read_frame(self.rfile)
+            except EOFError:
+                return
+
+            try:
+                frame = encode_frame(STATUS_OK, self.server.service.handle(op, payload, vectors))
+            except Exception as e:
+                frame = encode_frame(STATUS_ERROR, {"error": f"{type(e).__name__}: {e}"})
+            self.wfile.write(frame)
+
+
+class VectorStoreServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server in front of a VectorStoreService."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Optional[Path] = None, path: Optional[Path] = None):
+        self.socket_path = Path(socket_path or config.vector_store_socket)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.socket_path.exists():
+            try:
+                VectorServiceClient(self.socket_path).ping()
+            except OSError:
+                self.socket_path.unlink()  # Stale socket from a previous run
+            else:
+                raise RuntimeError(f"A vector store service is already listening on {self.socket_path}")
+
+        self.service = VectorStoreService(path)
+        super().__init__(str(self.socket_path), _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class ServiceCollection:
+    """Collection proxy with the subset of the ChromaDB collection API we use."""
+
+    def __init__(self, client: "VectorServiceClient", name: str, metadata: Optional[Dict[str, Any]] = None):
+        self.client = client
+        self.name = name
+        self.metadata = metadata
+
+    def _payload(self, **fields) -> Dict[str, Any]:
+        return {"collection": self.name, "metadata": self.metadata, **fields}
+
+    def add(self, ids: List[str], embeddings: List[List[float]], documents=None, metadatas=None):
+        self.client.request(OP_ADD, self._payload(ids=ids, documents=documents, metadatas=metadatas), embeddings)
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents=None, metadatas=None):
+        self.client.request(OP_UPSERT, self._payload(ids=ids, documents=documents, metadatas=metadatas), embeddings)
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10, where=None, include=None) -> Dict[str, Any]:
+        payload = self._payload(n_results=n_results, where=where, include=include)
+        return self.client.request(OP_QUERY, payload, query_embeddings)
+
+    def get(self, ids=None, where=None, include=None) -> Dict[str, Any]:
+        results = self.client.request(OP_GET, self._payload(ids=ids, where=where, include=include))
+        results.setdefault("metadatas", None)
+        results.setdefault("documents", None)
+        return results
+
+    def delete(self, ids=None, where=None):
+        self.client.request(OP_DELETE, self._payload(ids=ids, where=where))
+
+    def count(self) -> int:
+        return self.client.request(OP_COUNT, self._payload())["count"]
+
+
+class VectorServiceClient:
+    """Client for the vector store service, shaped like a ChromaDB client.
+
+    Each thread keeps its own connection, so concurrent requests from an
+    API worker's thread pool don't wait on each other.
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None):
+        self.socket_path = str(socket_path or config.vector_store_socket)
+        self._local = threading.local()
+
+    def _connection(self) -> Tuple[socket.socket, BinaryIO]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+            self._local.conn = None
+
+    def request(self, op: int, payload: Dict[str, Any], vectors: Optional[Sequence[Sequence[float]]] = None) -> Dict[str, Any]:
+        """Send one request and return its result payload.
+
+        A read-only request is retried once on a fresh connection (e.g. after
+        the service restarted). A write is not: the service may have applied
+        it before the connection dropped, so the error is raised instead.
+        """
+        frame = encode_frame(op, payload, vectors)
+        attempts = 2 if op in IDEMPOTENT_OPS else 1
+        for attempt in range(attempts):
+            try:
+                sock, stream = self._connection()
+                sock.sendall(frame)
+                status, result, _ = read_frame(stream)
+                break
+            except (OSError, EOFError):
+                self._close()
+                if attempt == attempts - 1:
+                    raise
+
+        if status != STATUS_OK:
+            raise RuntimeError(f"Vector store service error: {result.get('error')}")
+        return result
+
+    def ping(self):
+        self.request(OP_PING, {})
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> ServiceCollection:
+        # Created lazily by the service on first use
+        return ServiceCollection(self, name, metadata)
+
+    def delete_collection(self, name: str):
+        self.request(OP_DROP_COLLECTION, {"collection": name})
+
+    def list_collections(self) -> List[str]:
+        return self.request(OP_LIST_COLLECTIONS, {})["names"]
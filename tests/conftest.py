@@ -0,0 +1,37 @@
+"""
+Test environment: a fake Ollama server and a temporary data directory.
+
+Configuration is read once when ``src`` is first imported, so the
+environment is set up here, before any test module imports it.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.fake_ollama import FakeOllamaServer, FakeOllamaSettings
+
+TEST_ROOT = Path(tempfile.mkdtemp(prefix="docai-tests-"))
+ollama = FakeOllamaServer(FakeOllamaSettings(latency=0.0, token_rate=0.0)).start()
+
+os.environ.update({
+    "OLLAMA_BASE_URL": ollama.url,
+    "CHROMA_HOST": "",
+    "VECTOR_STORE_SOCKET": "",
+    "VECTOR_STORE_PATH": str(TEST_ROOT / "vector_db"),
+    "EMBEDDING_CACHE_PATH": str(TEST_ROOT / "embedding_cache.sqlite"),
+    "SESSION_BACKEND": "memory",
+    "SESSION_STORAGE_PATH": str(TEST_ROOT / "sessions"),
+    "SESSION_SQLITE_PATH": str(TEST_ROOT / "sessions.db"),
+    "SYNC_MANIFEST_PATH": str(TEST_ROOT / "sync_manifest.json"),
+    "TRACE_LOG_PATH": str(TEST_ROOT / "trace.jsonl"),
+    "COLLECTION_NAME": "tests",
+})
+
+
+@atexit.register
+def _cleanup():
+    ollama.stop()
+    shutil.rmtree(TEST_ROOT, ignore_errors=True)
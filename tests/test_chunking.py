@@ -0,0 +1,111 @@
+import random
+
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from src.utils.chunking import SEPARATORS, chunk_sections, chunk_spans, markdown_sections
+
+WORDS = ["alpha", "beta", "gamma", "delta", "kubernetes", "pod", "a", "supercalifragilistic" * 3]
+
+
+def random_text(seed: int, paragraphs: int = 20) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(paragraphs):
+        sentences = []
+        for _ in range(rng.randint(1, 6)):
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25)))
+            sentences.append(words + rng.choice([".", "", "!"]))
+        parts.append(rng.choice([". ", "\n", "  "]).join(sentences))
+    return rng.choice(["\n\n", "\n\n\n", "\n"]).join(parts)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(200, 40), (500, 0), (64, 16)])
+def test_chunk_spans_match_the_langchain_splitter(seed, chunk_size, chunk_overlap):
+    text = random_text(seed)
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=SEPARATORS,
+        is_separator_regex=False,
+    )
+    spans = chunk_spans(text, chunk_size, chunk_overlap)
+    assert [text[start:end] for start, end in spans] == splitter.split_text(text)
+
+
+def test_chunk_spans_of_empty_and_blank_text():
+    assert chunk_spans("", 100, 10) == []
+    assert chunk_spans(" \n\n ", 100, 10) == []
+
+
+GUIDE = """Intro text.
+
+# Guide
+
+Guide text.
+
+## Install
+
+```bash
+# not a heading
+pip install docai
+```
+
+## Usage ##
+
+### Query
+Ask questions.
+
+# Appendix
+"""
+
+
+def test_markdown_sections_follow_headings():
+    sections = markdown_sections(GUIDE)
+    assert [section.path for section in sections] == [
+        (),
+        ("Guide",),
+        ("Guide", "Install"),
+        ("Guide", "Usage"),
+        ("Guide", "Usage", "Query"),
+        ("Appendix",),
+    ]
+    # Sections tile the document
+    assert sections[0].start == 0 and sections[-1].end == len(GUIDE)
+    assert all(a.end == b.start for a, b in zip(sections, sections[1:]))
+
+
+def test_markdown_sections_ignore_headings_in_code_fences():
+    install = markdown_sections(GUIDE)[2]
+    (fence_start, fence_end), = install.fences
+    assert GUIDE[fence_start:fence_end].startswith("```bash")
+    assert GUIDE[fence_start:fence_end].rstrip().endswith("```")
+
+
+def test_markdown_sections_unclosed_fence_runs_to_the_end():
+    text = "# Title\n~~~\n# still code\n"
+    sections = markdown_sections(text)
+    assert [section.path for section in sections] == [("Title",)]
+    assert sections[0].fences == [(text.index("~~~"), len(text))]
+
+
+def test_markdown_sections_without_headings():
+    assert [section.path for section in markdown_sections("plain text\n")] == [()]
+    assert markdown_sections("") == []
+
+
+def test_chunk_sections_keeps_small_subtrees_whole():
+    spans, paths = chunk_sections(GUIDE, chunk_size=1000, chunk_overlap=0)
+    assert len(spans) == 1
+    assert paths == [""]
+
+    spans, paths = chunk_sections(GUIDE, chunk_size=80, chunk_overlap=0)
+    assert all(end - start <= 80 for start, end in spans)
+    chunks = [GUIDE[start:end] for start, end in spans]
+    # Packed subtrees take the heading path they share; the code block stays whole
+    code = next(i for i, chunk in enumerate(chunks) if "pip install docai" in chunk)
+    assert "# not a heading" in chunks[code]
+    assert paths[code] == "Guide"
+    assert chunks[paths.index("Guide > Usage")] == "## Usage ##\n\n### Query\nAsk questions."
@@ -0,0 +1,47 @@
+from datetime import date, datetime, time
+
+from src.vector_store.filters import build_where_filter, end_of_day, normalize_file_type
+
+
+def test_no_scope_searches_everything():
+    assert build_where_filter() is None
+    assert build_where_filter(doc_ids=[], source_files=[], file_types=[" "]) is None
+
+
+def test_single_condition_is_not_wrapped():
+    assert build_where_filter(doc_ids=["a"]) == {"doc_id": "a"}
+    assert build_where_filter(doc_ids=["a", "b"]) == {"doc_id": {"$in": ["a", "b"]}}
+
+
+def test_file_types_are_normalized_and_deduplicated():
+    assert normalize_file_type(" PDF ") == ".pdf"
+    assert build_where_filter(file_types=["PDF", ".pdf", "md"]) == {"file_type": {"$in": [".md", ".pdf"]}}
+
+
+def test_conditions_are_combined_with_and():
+    after = datetime(2024, 5, 1)
+    before = datetime(2024, 6, 1)
+    where = build_where_filter(source_files=["a.md"], ingested_after=after, ingested_before=before)
+    assert where == {"$and": [
+        {"source_file": "a.md"},
+        {"ingested_at": {"$gte": int(after.timestamp())}},
+        {"ingested_at": {"$lte": int(before.timestamp())}},
+    ]}
+
+
+def test_end_of_day_includes_the_whole_day():
+    assert end_of_day(date(2024, 5, 1)) == datetime.combine(date(2024, 5, 1), time.max)
+    assert end_of_day(" 2024-05-01 ") == datetime.combine(date(2024, 5, 1), time.max)
+
+
+def test_end_of_day_keeps_datetimes_and_other_values():
+    moment = datetime(2024, 5, 1, 12, 30)
+    assert end_of_day(moment) is moment
+    assert end_of_day("2024-05-01T12:30:00") == "2024-05-01T12:30:00"
+    assert end_of_day(None) is None
+
+
+def test_date_only_upper_bound_matches_chunks_ingested_that_day():
+    ingested = int(datetime(2024, 5, 1, 18, 0).timestamp())
+    where = build_where_filter(ingested_before=end_of_day("2024-05-01"))
+    assert ingested <= where["ingested_at"]["$lte"]
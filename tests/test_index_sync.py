@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from src.core.index_sync import IndexManifest, IndexSync, is_under
+from src.vector_store.chroma_store import vector_store
+
+NAMESPACE = "sync-tests"
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    vector_store.clear_all(NAMESPACE)
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    (directory / "a.md").write_text("# Alpha\n\nAlpha is the first document.\n")
+    (directory / "b.txt").write_text("Beta is the second document.\n")
+    (directory / ".hidden.txt").write_text("Never indexed.\n")
+    (directory / "image.png").write_bytes(b"\x89PNG")
+    yield directory
+    vector_store.clear_all(NAMESPACE)
+
+
+def make_sync(corpus) -> IndexSync:
+    manifest = IndexManifest(corpus.parent / "manifest.json")
+    return IndexSync(str(corpus), manifest=manifest, namespace=NAMESPACE)
+
+
+def doc_id(sync: IndexSync, path) -> str:
+    return sync.manifest.files[str(path.resolve())]["doc_id"]
+
+
+def test_initial_sync_adds_supported_files(corpus):
+    result = make_sync(corpus).sync()
+    assert (result.added, result.updated, result.removed) == (2, 0, 0)
+    assert not result.failed
+    assert vector_store.count(NAMESPACE) == result.chunks_added > 0
+
+
+def test_unchanged_and_touched_files_are_not_reingested(corpus):
+    sync = make_sync(corpus)
+    sync.sync()
+    assert make_sync(corpus).sync().unchanged == 2
+
+    os.utime(corpus / "a.md", ns=(0, 10**18))
+    result = sync.sync()
+    assert (result.added, result.updated, result.unchanged) == (0, 0, 2)
+    # The new mtime is recorded, so the next sync doesn't hash the file again
+    assert sync.manifest.files[str((corpus / "a.md").resolve())]["mtime_ns"] == 10**18
+
+
+def test_modified_file_is_updated_in_place(corpus):
+    sync = make_sync(corpus)
+    sync.sync()
+    before = doc_id(sync, corpus / "a.md")
+
+    (corpus / "a.md").write_text("# Alpha\n\nAlpha was rewritten with new content.\n")
+    result = sync.sync()
+    assert (result.added, result.updated, result.unchanged) == (0, 1, 1)
+    assert doc_id(sync, corpus / "a.md") == before
+    documents = vector_store._namespace(NAMESPACE).collection.get(where={"doc_id": before})["documents"]
+    assert any("rewritten" in document for document in documents)
+
+
+def test_removed_file_loses_its_chunks(corpus):
+    sync = make_sync(corpus)
+    sync.sync()
+    removed = doc_id(sync, corpus / "b.txt")
+
+    (corpus / "b.txt").unlink()
+    result = sync.sync()
+    assert result.removed == 1
+    assert vector_store.get_chunk_ids(removed, NAMESPACE) == []
+    assert str((corpus / "b.txt").resolve()) not in sync.manifest.files
+
+
+def test_manifest_is_persisted(corpus):
+    make_sync(corpus).sync()
+    manifest = IndexManifest(corpus.parent / "manifest.json")
+    assert sorted(os.path.basename(path) for path in manifest.files) == ["a.md", "b.txt"]
+
+
+def test_is_under_matches_sidecar_files():
+    assert is_under("/data/sessions.db-wal", ["/data/sessions.db"])
+    assert is_under("/data/vector_db/index.bin", ["/data/vector_db"])
+    assert not is_under("/data/vector_db2/index.bin", ["/data/vector_db"])
@@ -0,0 +1,150 @@
+import multiprocessing
+from datetime import datetime
+
+import pytest
+
+from benchmarks.fake_redis import FakeRedisServer
+from src.core.session_manager import SessionManager
+from src.core.session_store import MemorySessionStore, RedisSessionStore, SQLiteSessionStore
+from src.models.chat import ChatSession
+from src.utils.config import config
+
+
+@pytest.fixture
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "session_storage_path", tmp_path / "sessions")
+    return tmp_path / "sessions"
+
+
+@pytest.fixture(scope="module")
+def redis_server():
+    with FakeRedisServer() as server:
+        yield server
+
+
+@pytest.fixture(params=["memory", "file", "sqlite", "redis"])
+def store(request, tmp_path, session_dir):
+    if request.param == "memory":
+        store = MemorySessionStore()
+    elif request.param == "file":
+        store = SessionManager()
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(tmp_path / "sessions.db")
+    else:
+        store = RedisSessionStore(request.getfixturevalue("redis_server").url, prefix=f"{tmp_path.name}:")
+    yield store
+    store.clear_all_sessions()
+
+
+def make_session(session_id: str, messages: int = 2) -> ChatSession:
+    session = ChatSession(session_id=session_id)
+    for i in range(messages):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"message {i}")
+    return session
+
+
+def test_round_trip_with_metadata(store):
+    session = make_session("s1", 4)
+    session.metadata = {"history_summary": {"text": "earlier turns", "upto": 2}}
+    session.context_documents = ["doc-1"]
+    store.save_session(session)
+
+    loaded = store.load_session("s1")
+    assert [m.content for m in loaded.messages] == [m.content for m in session.messages]
+    assert loaded.metadata == session.metadata
+    assert loaded.context_documents == ["doc-1"]
+    assert store.get_message_count("s1") == 4
+    assert store.get_message_count("missing") is None
+    assert store.load_session("missing") is None
+
+
+def test_saves_append_new_messages_and_metadata_changes(store):
+    session = make_session("s1", 2)
+    store.save_session(session)
+    session.add_message("user", "follow-up")
+    session.metadata = {"history_summary": {"text": "summary", "upto": 1}}
+    store.save_session(session)
+
+    loaded = store.load_session("s1")
+    assert [m.content for m in loaded.messages] == ["message 0", "message 1", "follow-up"]
+    assert loaded.metadata == {"history_summary": {"text": "summary", "upto": 1}}
+
+
+def test_cleared_history_replaces_stored_messages(store):
+    session = make_session("s1", 4)
+    store.save_session(session)
+    session.clear_history()
+    session.add_message("user", "fresh start")
+    store.save_session(session)
+
+    assert [m.content for m in store.load_session("s1").messages] == ["fresh start"]
+    assert store.get_message_count("s1") == 1
+
+
+def test_list_count_and_delete(store):
+    for i in range(3):
+        session = make_session(f"s{i}")
+        session.updated_at = datetime(2024, 1, 1 + i)
+        store.save_session(session)
+
+    assert store.count_sessions() == 3
+    assert [s["session_id"] for s in store.list_sessions(limit=2)] == ["s2", "s1"]
+    assert [s["session_id"] for s in store.list_sessions(offset=2)] == ["s0"]
+
+    store.delete_session("s1")
+    assert store.load_session("s1") is None
+    assert store.count_sessions() == 2
+
+    store.clear_all_sessions()
+    assert store.count_sessions() == 0
+
+
+def test_file_index_is_compacted(session_dir, monkeypatch):
+    monkeypatch.setattr(SessionManager, "INDEX_COMPACT_MIN_LINES", 10)
+    store = SessionManager()
+    session = make_session("s1")
+    for i in range(30):
+        session.add_message("user", f"more {i}")
+        store.save_session(session)
+    store.save_session(make_session("s2"))
+
+    lines = (session_dir / SessionManager.INDEX_FILE).read_text().splitlines()
+    assert len(lines) <= 10
+    assert store.get_message_count("s1") == 32
+
+
+def test_file_index_follows_compaction_by_another_process(session_dir, monkeypatch):
+    monkeypatch.setattr(SessionManager, "INDEX_COMPACT_MIN_LINES", 10)
+    reader, writer = SessionManager(), SessionManager()
+    writer.save_session(make_session("s0"))
+    assert reader.count_sessions() == 1
+
+    for i in range(1, 40):
+        writer.save_session(make_session(f"s{i}"))
+        writer.delete_session(f"s{i - 1}")
+
+    assert reader.count_sessions() == 1
+    assert reader.get_message_count("s39") == 2
+    # A fresh store rebuilds the index from the session logs
+    (session_dir / SessionManager.INDEX_FILE).unlink()
+    assert SessionManager().count_sessions() == 1
+
+
+def _save_sessions(worker: int, count: int):
+    SessionManager.INDEX_COMPACT_MIN_LINES = 10
+    store = SessionManager()
+    for i in range(count):
+        store.save_session(make_session(f"w{worker}-{i}"))
+
+
+def test_file_store_keeps_concurrent_saves_from_several_processes(session_dir):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_save_sessions, args=(w, 50)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    # Compactions rewrote the index while others appended to it: no line may be lost
+    assert SessionManager().count_sessions() == 200
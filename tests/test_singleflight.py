@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.singleflight import SingleFlight
+from src.utils.streaming import GenerationGuard, on_abort
+
+
+def run_concurrently(fn, count: int):
+    """Call fn() from `count` threads at once; return results (or exceptions)."""
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        try:
+            return fn()
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(lambda _: call(), range(count)))
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"answer": 42}
+
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(lambda: flight.do("key", compute), 4)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_error_reaches_every_caller_and_is_not_cached():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(lambda: flight.do("key", fail), 3)
+    assert all(isinstance(result, ValueError) for result in results)
+
+    # The failed call is forgotten, so the next one runs again
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_sequential_calls_do_not_share_results():
+    flight = SingleFlight("test")
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+
+
+def test_streams_share_one_upstream():
+    flight = SingleFlight("test")
+    starts = []
+    release = threading.Event()
+
+    def start():
+        starts.append(1)
+        release.wait(5)
+        yield from ["a", "b", "c"]
+
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(lambda: list(flight.stream("key", start)), 3)
+    assert len(starts) == 1
+    assert results == [["a", "b", "c"]] * 3
+
+
+def test_stream_error_reaches_every_subscriber():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def start():
+        yield "a"
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(lambda: list(flight.stream("key", start)), 3)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert list(flight.stream("key", lambda: iter(["fresh"]))) == ["fresh"]
+
+
+def test_abandoned_stream_closes_the_upstream():
+    flight = SingleFlight("test")
+    closed = threading.Event()
+
+    def start():
+        try:
+            yield from ["a", "b"]
+        finally:
+            closed.set()
+
+    stream = flight.stream("key", start)
+    assert next(stream) == "a"
+    stream.close()
+    assert closed.is_set()
+
+
+def blocking_upstream(aborted: threading.Event):
+    """Upstream that blocks on its read until its generation is aborted."""
+    woken = threading.Event()
+    yield "a"
+    on_abort(woken.set)
+    woken.wait(10)
+    aborted.set()
+    raise OSError("connection shut down")
+
+
+def test_cancelling_one_subscriber_keeps_the_shared_generation():
+    flight = SingleFlight("test")
+    aborted = threading.Event()
+    first = GenerationGuard(flight.stream("key", lambda: blocking_upstream(aborted)), "test", timeout=0)
+    second = GenerationGuard(flight.stream("key", lambda: blocking_upstream(aborted)), "test", timeout=0)
+    assert next(first) == "a"
+    assert next(second) == "a"
+
+    reader = ThreadPoolExecutor(1).submit(list, second)
+    first.cancel()
+    assert not aborted.wait(0.3)
+
+    second.cancel()
+    assert aborted.wait(2)
+    # The aborted read ends the cancelled stream instead of raising
+    assert reader.result(timeout=2) == []
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_ollama import FakeOllamaServer, FakeOllamaSettings
+from src.core.ollama_chat import OllamaChatClient
+from src.utils.metrics import LLM_GENERATION_ABORTS
+from src.utils.streaming import GenerationGuard, coalesce, on_abort
+
+
+def timed(chunks, delays):
+    """Yield chunks, sleeping delays[i] seconds before chunk i."""
+    for chunk, delay in zip(chunks, delays):
+        time.sleep(delay)
+        yield chunk
+
+
+def collect(stream):
+    """Read a stream, recording (chunk, seconds since start) pairs."""
+    start = time.monotonic()
+    return [(chunk, time.monotonic() - start) for chunk in stream]
+
+
+def aborts(component: str, reason: str) -> float:
+    return LLM_GENERATION_ABORTS.labels(component=component, reason=reason)._value.get()
+
+
+def blocked_read(chunks_before=()):
+    """Upstream whose next read blocks until its generation is aborted."""
+    woken = threading.Event()
+    yield from chunks_before
+    on_abort(woken.set)
+    woken.wait(10)
+    raise OSError("connection shut down")
+
+
+# coalesce
+
+
+def test_coalesce_passes_first_chunk_through_and_merges_the_rest():
+    out = collect(coalesce(timed("abcd", [0, 0, 0, 0]), interval_ms=200, max_chars=100))
+    assert out[0][0] == "a"
+    assert "".join(chunk for chunk, _ in out) == "abcd"
+    assert len(out) == 2
+
+
+def test_coalesce_flushes_at_max_chars():
+    out = [chunk for chunk in coalesce(iter(["a"] + ["xx"] * 6), interval_ms=10_000, max_chars=4)]
+    assert out == ["a", "xxxx", "xxxx", "xxxx"]
+
+
+def test_coalesce_flushes_on_a_timer_while_the_upstream_stalls():
+    out = collect(coalesce(timed("abc", [0, 0.01, 1.0]), interval_ms=100, max_chars=100))
+    assert [chunk for chunk, _ in out] == ["a", "b", "c"]
+    # "b" didn't wait for "c"
+    assert out[1][1] < 0.5
+
+
+def test_coalesce_with_zero_interval_is_a_passthrough():
+    assert list(coalesce(iter(["a", "b"]), interval_ms=0)) == ["a", "b"]
+
+
+def test_coalesce_flushes_buffered_text_before_an_upstream_error():
+    def failing():
+        yield "a"
+        yield "b"
+        raise ValueError("upstream failed")
+
+    stream = coalesce(failing(), interval_ms=10_000, max_chars=100)
+    assert next(stream) == "a"
+    assert next(stream) == "b"
+    with pytest.raises(ValueError):
+        next(stream)
+
+
+def test_coalesce_closes_the_upstream_when_the_consumer_stops():
+    closed = threading.Event()
+
+    def upstream():
+        try:
+            while True:
+                yield "x"
+                time.sleep(0.01)
+        finally:
+            closed.set()
+
+    stream = coalesce(upstream(), interval_ms=50, max_chars=100)
+    next(stream)
+    stream.close()
+    assert closed.wait(2)
+
+
+# GenerationGuard
+
+
+def test_guard_passes_chunks_through():
+    guard = GenerationGuard(iter(["a", "b"]), "test", timeout=5)
+    assert list(guard) == ["a", "b"]
+    # Cancelling after the end is a no-op and not counted
+    before = aborts("test", "disconnect")
+    guard.cancel()
+    assert aborts("test", "disconnect") == before
+
+
+def test_guard_timeout_aborts_a_blocked_read():
+    before = aborts("test", "timeout")
+    start = time.monotonic()
+    assert list(GenerationGuard(blocked_read(["a"]), "test", timeout=0.3)) == ["a"]
+    assert time.monotonic() - start < 2
+    assert aborts("test", "timeout") == before + 1
+
+
+def test_guard_cancel_aborts_a_blocked_read_from_another_thread():
+    guard = GenerationGuard(blocked_read(), "test", timeout=0)
+    threading.Timer(0.2, guard.cancel).start()
+    start = time.monotonic()
+    assert list(guard) == []
+    assert time.monotonic() - start < 2
+
+
+def test_guard_cancel_before_reading_closes_the_upstream():
+    closed = threading.Event()
+
+    def upstream():
+        try:
+            yield "a"
+        finally:
+            closed.set()
+
+    chunks = upstream()
+    next(chunks)
+    guard = GenerationGuard(chunks, "test", timeout=0)
+    guard.cancel()
+    assert closed.is_set()
+    assert list(guard) == []
+
+
+def test_guard_upstream_error_is_raised_and_not_counted_as_an_abort():
+    def failing():
+        raise RuntimeError("no model slot")
+        yield
+
+    before = aborts("test", "disconnect")
+    guard = GenerationGuard(failing(), "test", timeout=5)
+    with pytest.raises(RuntimeError):
+        next(guard)
+    guard.cancel()
+    assert aborts("test", "disconnect") == before
+
+
+def test_guard_aborts_a_slow_ollama_prefill():
+    server = FakeOllamaServer(FakeOllamaSettings(latency=3.0)).start()
+    try:
+        client = OllamaChatClient()
+        client.hosts = [server.url]
+        start = time.monotonic()
+        guard = GenerationGuard(client.generate_stream("hello"), "test", timeout=0.5)
+        assert list(guard) == []
+        assert time.monotonic() - start < 2
+    finally:
+        server.stop()
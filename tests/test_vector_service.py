@@ -0,0 +1,103 @@
+import io
+import socketserver
+import threading
+
+import pytest
+
+from src.vector_store.service import (
+    OP_ADD,
+    OP_COUNT,
+    OP_QUERY,
+    STATUS_ERROR,
+    STATUS_OK,
+    VectorServiceClient,
+    encode_frame,
+    read_frame,
+)
+
+
+def test_frame_round_trip():
+    vectors = [[0.5, -1.0, 2.25], [0.0, 1.5, -0.125]]
+    payload = {"collection": "docs", "ids": ["a", "b"], "where": {"doc_id": "x"}}
+    frame = encode_frame(OP_ADD, payload, vectors)
+    assert read_frame(io.BytesIO(frame)) == (OP_ADD, payload, vectors)
+
+
+def test_frame_without_vectors():
+    stream = io.BytesIO(encode_frame(OP_COUNT, {"collection": "docs"}) + encode_frame(STATUS_OK, {}))
+    assert read_frame(stream) == (OP_COUNT, {"collection": "docs"}, [])
+    assert read_frame(stream) == (STATUS_OK, {}, [])
+
+
+def test_frame_vectors_must_share_a_dimension():
+    with pytest.raises(ValueError):
+        encode_frame(OP_ADD, {}, [[1.0, 2.0], [1.0]])
+
+
+def test_truncated_frames_raise_eof():
+    frame = encode_frame(OP_QUERY, {"n_results": 3}, [[1.0, 2.0]])
+    with pytest.raises(EOFError):
+        read_frame(io.BytesIO(b""))
+    for cut in (5, len(frame) - 4):
+        with pytest.raises(EOFError):
+            read_frame(io.BytesIO(frame[:cut]))
+
+
+class FlakyService(socketserver.ThreadingUnixStreamServer):
+    """Drops the first connection after reading a request; answers later ones."""
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        self.requests = []
+        self.dropped = False
+        super().__init__(str(path), FlakyHandler)
+
+
+class FlakyHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                op, payload, _ = read_frame(self.rfile)
+            except EOFError:
+                return
+            self.server.requests.append(op)
+            if not self.server.dropped:
+                self.server.dropped = True
+                return
+            if op == OP_ADD:
+                self.wfile.write(encode_frame(STATUS_ERROR, {"error": "ValueError: bad ids"}))
+            else:
+                self.wfile.write(encode_frame(STATUS_OK, {"count": 7}))
+
+
+@pytest.fixture
+def service(tmp_path):
+    server = FlakyService(tmp_path / "vector.sock")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_read_is_retried_on_a_fresh_connection(service):
+    client = VectorServiceClient(service.server_address)
+    assert client.request(OP_COUNT, {"collection": "docs"}) == {"count": 7}
+    assert service.requests == [OP_COUNT, OP_COUNT]
+
+
+def test_write_is_not_retried(service):
+    client = VectorServiceClient(service.server_address)
+    with pytest.raises((OSError, EOFError)):
+        client.request(OP_ADD, {"collection": "docs", "ids": ["a"]}, [[1.0]])
+    assert service.requests == [OP_ADD]
+
+    # The next request opens a new connection
+    assert client.request(OP_COUNT, {"collection": "docs"}) == {"count": 7}
+
+
+def test_service_errors_are_raised(service):
+    service.dropped = True
+    client = VectorServiceClient(service.server_address)
+    with pytest.raises(RuntimeError, match="bad ids"):
+        client.request(OP_ADD, {"collection": "docs", "ids": ["a"]}, [[1.0]])